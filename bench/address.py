@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+
+import argparse
+import os
+import struct
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bench.generator import BIAS, encode, encodeBC, encodeJump
+from duk.groups.groups import DukGroup
+from duk.instructions.block import DukInstructionBlock
+from util.logger import Logger, Verbosity
+
+def generateWords(count):
+    # Repeating statements: a method call with an argument followed by an if/else
+    words = []
+    while len(words) < count:
+        address = len(words)
+        words += [
+            encodeBC(11, 2, 0),             # GETVAR r2, c0
+            encodeBC(0, 4, 2),              # LDREG r4, r2
+            encode(110, 5, 4, 1),           # GETPROP r5, r4, c1
+            encodeBC(4, 7, BIAS >> 8),      # LDINT r7, 0
+            encodeBC(176, 1, 5),            # CALL 1, r5
+            encodeBC(48, 0, 3),             # IF r3
+            encodeJump(address + 6, address + 9),
+            encodeBC(4, 1, BIAS >> 8),      # LDINT r1, 0
+            encodeJump(address + 8, address + 10),
+            encodeBC(4, 1, BIAS >> 8),      # LDINT r1, 0
+            encodeBC(4, 2, BIAS >> 8),      # LDINT r2, 0
+        ]
+    return words[:count - (count % 11)]
+
+def linearIndexFromAddress(self, address):
+    for i in range(0, len(self.items)):
+        if self.items[i].containsAddress(address):
+            return i
+    return None
+
+def decompile(words):
+    instructions = list(DukInstructionBlock(struct.pack(f'>{len(words)}I', *words)))
+    group = DukGroup(0, instructions)
+    disableGrouping = {
+        'call': False, 'jump': False, 'if_else': False, 'if_condition': False, 'try_catch_finally': False, 'for': False,
+        'while': False, 'init_array': False, 'init_object': False, 'get_prop': False, 'join_operator': False, 'double_return': False,
+    }
+
+    start = time.perf_counter()
+    group.decompile(['a', 'b'], [], {}, [], disableGrouping)
+    return time.perf_counter() - start, group.toString(['a', 'b'], [], {}, [])
+
+def main(args):
+    Logger.VERBOSITY = Verbosity.NONE
+    words = generateWords(args.count)
+
+    indexed, indexedText = decompile(words)
+    DukGroup.getIndexFromAddress = linearIndexFromAddress
+    linear, linearText = decompile(words)
+
+    print(f'Instructions:         {len(words)}')
+    print(f'Linear scan:          {linear:8.2f} s')
+    print(f'Address index:        {indexed:8.2f} s')
+    print(f'Speedup:              {linear / indexed:8.2f} x')
+    print(f'Identical output:     {indexedText == linearText!s:>8}')
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Group address lookup benchmark')
+    parser.add_argument('-c', '--count', type=int, default=20000, help='The number of instructions in the function. (Default 20000)')
+    main(parser.parse_args())
@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+
+import argparse
+import os
+import random
+import struct
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from duk.groups.groups import *
+from duk.groups.items import DukItems
+from duk.instructions.block import DukInstructionBlock
+from duk.instructions.lookup import DUK_OP_CLASSES
+
+# Chains tried by the grouping rules at every index, as instruction classes
+CLASS_CHAINS = [
+    [(DukInstructionIfTrueR, DukInstructionIfFalseR), DukInstructionJump],
+    [DukInstructionLabel, DukInstructionJump, DukInstructionJump],
+    [DukInstructionLabel, DukInstructionJump, DukInstructionJump, DukInstructionJump],
+    [DukInstructionLabel, DukInstructionJump, DukInstructionJump, DukInstructionLdInt, DukInstructionComparison, DukInstructionIfR, DukInstructionJump, DukInstructionJump, DukInstructionIncDec, DukInstructionJump],
+    [DukInstructionLabel, DukInstructionJump, DukInstructionJump, DukInstructionComparison, DukInstructionIfR, DukInstructionJump],
+    [DukInstructionLdConst, DukInstructionTryCatch, DukInstructionJump, DukInstructionJump],
+    [DukInstructionComparison, DukGroupIfR],
+    [DukInstructionGetVar, DukInstructionLdReg, DukGroupCall],
+    [(DukInstructionGetVar, DukInstructionLdReg), DukInstructionGetProp],
+    [(DukInstructionOperator, DukGroupJoinOperator), DukInstructionOperator],
+    [(DukInstructionRetReg, DukInstructionRetConst), DukInstructionRetUndef],
+]
+
+# Chain check before the matcher, every chain slices the items and walks them with isinstance
+def isChain(instructions, chain):
+    if len(instructions) < len(chain):
+        return False
+
+    for i in range(0, len(chain)):
+        if not isinstance(instructions[i], chain[i]):
+            return False
+    return True
+
+def generateWords(count, seed):
+    # Random instructions with the opcodes the chains start with mixed in
+    rng = random.Random(seed)
+    opcodes = sorted(DUK_OP_CLASSES)
+    common = [0, 2, 3, 4, 11, 16, 48, 52]
+    return [rng.choice(opcodes if rng.random() < 0.5 else common) | (rng.getrandbits(24) << 8) for i in range(count)]
+
+def matchSliced(items):
+    matched = []
+    for index in range(0, len(items)):
+        chains = 0
+        for chain in range(0, len(CLASS_CHAINS)):
+            if isChain(items[index:], CLASS_CHAINS[chain]):
+                chains |= 1 << chain
+        matched.append(chains)
+    return matched
+
+def matchCompiled(items):
+    return [DukGroup.CHAINS.match(items, index) for index in range(0, len(items))]
+
+def measure(match, items):
+    start = time.perf_counter()
+    matched = match(items)
+    return time.perf_counter() - start, matched
+
+def main(args):
+    words = generateWords(args.count, args.seed)
+    instructions = list(DukInstructionBlock(struct.pack(f'>{len(words)}I', *words)))
+
+    sliced, slicedMatched = measure(matchSliced, instructions)
+    compiled, compiledMatched = measure(matchCompiled, instructions)
+    chunked, chunkedMatched = measure(matchCompiled, DukItems(instructions))
+
+    print(f'Items:                {len(instructions)}')
+    print(f'isChain slices:       {sliced:8.2f} s')
+    print(f'Matcher (list):       {compiled:8.2f} s')
+    print(f'Matcher (DukItems):   {chunked:8.2f} s')
+    print(f'Speedup (list):       {sliced / compiled:8.2f} x')
+    print(f'Identical matches:    {slicedMatched == compiledMatched == chunkedMatched!s:>8}')
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Item chain matching benchmark')
+    parser.add_argument('-c', '--count', type=int, default=5000, help='The number of items to match. (Default 5000)')
+    parser.add_argument('-s', '--seed', type=int, default=0, help='The random seed for the instruction words. (Default 0)')
+    main(parser.parse_args())
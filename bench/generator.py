@@ -0,0 +1,339 @@
+#!/usr/bin/env python3
+
+import argparse
+import random
+import struct
+
+BIAS = 1 << 23
+
+# Control flow shapes, their bodies can hold further shapes
+SHAPES = ('If', 'For', 'While', 'Try')
+
+# Printable literal characters with the quotes and control characters the constant escaping handles
+LITERAL = b'abcdefghijklmnopqrstuvwxyz_ABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789 '
+LITERAL_ESCAPES = b'\'"\\\n\t\x00\x7f\x80\xff'
+
+def encode(opcode, a = 0, b = 0, c = 0):
+    return opcode | (a << 8) | (b << 16) | (c << 24)
+
+def encodeBC(opcode, a, bc):
+    return opcode | (a << 8) | (bc << 16)
+
+def encodeJump(address, destination):
+    return 2 | (((destination - (address + 1) + BIAS) & 0xFFFFFF) << 8)
+
+def packString(data):
+    return struct.pack('>I', len(data)) + data
+
+class Label:
+    def __init__(self):
+        self.address = None
+
+class FunctionBuilder:
+    # Emits well formed statement and control flow shapes, jumps are resolved once every label is placed
+    def __init__(self, rng, constantCount, functionCount, nesting = 0):
+        self.rng = rng
+        self.constantCount = constantCount
+        self.functionCount = functionCount
+        self.nesting = nesting
+        self.words = []
+        self.lines = []
+        self.line = 1
+        self.labelId = 0
+
+    def here(self):
+        return len(self.words)
+
+    def emit(self, word):
+        self.words.append(word)
+        self.lines.append(self.line)
+        self.line += self.rng.choice([0, 0, 1, 1, 2])
+
+    def jump(self, label):
+        self.emit(label)
+
+    def mark(self, label):
+        label.address = self.here()
+
+    def constant(self):
+        return self.rng.randrange(self.constantCount)
+
+    def register(self):
+        return self.rng.randrange(0, 16)
+
+    def load(self, register):
+        kind = self.rng.randrange(5)
+        if kind == 0:
+            return encodeBC(0, register, self.register())                          # LDREG
+        if kind == 1:
+            return encodeBC(3, register, self.constant())                          # LDCONST
+        if kind == 2:
+            return encodeBC(4, register, self.rng.randrange(65536))                # LDINT
+        if kind == 3:
+            return encodeBC(11, register, self.constant())                         # GETVAR
+        return encode(52, register, self.register(), self.register())              # ADD_RR
+
+    def comparison(self, register):
+        return encode(self.rng.choice(range(16, 48, 4)), register, self.register(), self.register())
+
+    def statement(self):
+        kind = self.rng.randrange(7)
+        if kind == 0:
+            # Method call on a variable
+            base = self.rng.randrange(0, 8)
+            self.emit(encodeBC(11, 2, self.constant()))                            # GETVAR
+            self.emit(encodeBC(0, 4, 2))                                           # LDREG
+            self.emit(encode(110, base, 4, self.constant()))                       # GETPROP_RC
+            count = self.rng.randrange(0, 4)
+            for i in range(count):
+                self.emit(self.load(base + 2 + i))
+            self.emit(encodeBC(176, count, base))                                  # CALL
+        elif kind == 1:
+            # Property read
+            register = self.register()
+            self.emit(encodeBC(11, register, self.constant()))                     # GETVAR
+            self.emit(encode(110, register, register, self.constant()))            # GETPROP_RC
+        elif kind == 2:
+            # Object literal
+            pairs = self.rng.randrange(0, 4)
+            obj = self.rng.randrange(0, 4)
+            self.emit(encode(192, pairs, obj, 0))                                  # NEWOBJ
+            for i in range(pairs * 2):
+                self.emit(self.load(obj + 1 + i))
+            self.emit(encode(194, obj, obj + 1, 2 * pairs))                        # MPUTOBJ
+        elif kind == 3:
+            # Array literal
+            count = self.rng.randrange(0, 4)
+            arr = self.rng.randrange(0, 4)
+            self.emit(encode(193, count, arr, 0))                                  # NEWARR
+            self.emit(encodeBC(4, arr + 1, BIAS >> 8))                             # LDINT
+            for i in range(count):
+                self.emit(self.load(arr + 2 + i))
+            self.emit(encode(198, arr, arr + 1, count + 1))                        # MPUTARR
+        elif kind == 4:
+            # Joined operators
+            self.emit(encode(52, 4, self.register(), self.register()))            # ADD_RR
+            for i in range(self.rng.randrange(1, 4)):
+                self.emit(encode(self.rng.choice([52, 56, 60]), 4, 4, self.register()))
+        elif kind == 5:
+            # Variable assignment
+            register = self.register()
+            self.emit(self.load(register))
+            self.emit(encodeBC(155, register, self.constant()))                    # PUTVAR
+        else:
+            self.emit(self.load(self.register()))
+
+    def statements(self, count):
+        for i in range(count):
+            self.statement()
+
+    def body(self, size, level):
+        # Statements of a shape at the given nesting level, half of them are shapes while the level is below the nesting
+        if level >= self.nesting:
+            self.statements(size)
+            return
+        for i in range(size):
+            if self.rng.random() < 0.5:
+                self.shape(self.rng.choice(SHAPES), self.rng.randrange(1, 4), level + 1)
+            else:
+                self.statement()
+
+    def shape(self, name, size, level = 0):
+        getattr(self, 'shape' + name)(size, level)
+
+    def shapeIf(self, size, level = 0):
+        register = self.register()
+        elseLabel = Label()
+        endLabel = Label()
+        self.emit(self.comparison(register))
+        self.emit(encodeBC(self.rng.choice([48, 50]), 0, register))                 # IFTRUE_R / IFFALSE_R
+        self.jump(elseLabel)
+        self.body(size, level)
+        if self.rng.random() < 0.5:
+            self.jump(endLabel)
+            self.mark(elseLabel)
+            self.body(size, level)
+            self.mark(endLabel)
+        else:
+            self.mark(elseLabel)
+            self.mark(endLabel)
+        self.statement()
+
+    def shapeFor(self, size, level = 0):
+        labelId = self.nextLabelId()
+        endLabel = Label()
+        incrementLabel = Label()
+        comparisonLabel = Label()
+        bodyLabel = Label()
+        self.emit(encodeBC(161, 0, labelId))                                       # LABEL
+        self.jump(endLabel)
+        self.jump(incrementLabel)
+        self.emit(encodeBC(4, 1, self.rng.randrange(65536)))                       # LDINT
+        self.mark(comparisonLabel)
+        self.emit(self.comparison(2))
+        self.emit(encodeBC(self.rng.choice([48, 50]), 0, 2))
+        self.jump(bodyLabel)
+        self.jump(endLabel)
+        self.mark(incrementLabel)
+        self.emit(encodeBC(self.rng.randrange(120, 124), 2, 1))                    # PREINCR..POSTDECR
+        self.jump(comparisonLabel)
+        self.mark(bodyLabel)
+        self.body(size, level)
+        self.jump(incrementLabel)
+        self.mark(endLabel)
+        self.emit(encodeBC(162, 0, labelId))                                       # ENDLABEL
+
+    def shapeWhile(self, size, level = 0):
+        labelId = self.nextLabelId()
+        endLabel = Label()
+        comparisonLabel = Label()
+        self.emit(encodeBC(161, 0, labelId))                                       # LABEL
+        self.jump(endLabel)
+        self.jump(comparisonLabel)
+        self.mark(comparisonLabel)
+        self.emit(self.comparison(3))
+        self.emit(encodeBC(self.rng.choice([48, 50]), 0, 3))
+        self.jump(endLabel)
+        self.body(size, level)
+        self.jump(comparisonLabel)
+        self.mark(endLabel)
+        self.emit(encodeBC(162, 0, labelId))                                       # ENDLABEL
+
+    def shapeTry(self, size, level = 0):
+        register = self.rng.randrange(0, 8)
+        catchLabel = Label()
+        afterLabel = Label()
+        self.emit(encodeBC(3, register, self.constant()))                          # LDCONST
+        self.emit(encodeBC(165, 3, register))                                      # TRYCATCH
+        self.jump(catchLabel)
+        self.jump(afterLabel)
+        self.body(size, level)
+        self.emit(encodeBC(166, 0, 0))                                             # ENDTRY
+        self.mark(catchLabel)
+        self.emit(encodeBC(155, register, self.constant()))                        # PUTVAR
+        self.body(size, level)
+        self.emit(encodeBC(167, 0, 0))                                             # ENDCATCH
+        self.mark(afterLabel)
+
+    def nextLabelId(self):
+        self.labelId += 1
+        return self.labelId - 1
+
+    def build(self, instructionCount, shapes):
+        # Closures of the inner functions, then the shapes spread evenly between plain statements
+        for i in range(self.functionCount):
+            self.emit(encodeBC(152, self.register(), i))                          # CLOSURE
+            self.emit(encodeBC(155, self.register(), self.constant()))            # PUTVAR
+
+        self.rng.shuffle(shapes)
+        for i in range(0, len(shapes)):
+            while self.here() < instructionCount * (i + 1) // (len(shapes) + 1):
+                self.statement()
+            self.shape(shapes[i], self.rng.randrange(1, 4))
+        while self.here() < instructionCount - 1:
+            self.statement()
+        self.emit(encodeBC(158, 0, 0))                                             # RETUNDEF
+
+        words = []
+        for address in range(0, len(self.words)):
+            word = self.words[address]
+            if isinstance(word, Label):
+                word = encodeJump(address, word.address)
+            words.append(word)
+        return words
+
+def encodePc2line(lines):
+    # Per 64 instructions a (line, offset) header entry followed by an MSB first bitstream of line differences
+    length = len(lines)
+    chunks = (length + 63) // 64
+    header = [length] + [0] * (chunks * 2)
+    data = bytearray()
+    offset = 4 + chunks * 8
+    for chunk in range(0, chunks):
+        start = chunk * 64
+        header[1 + chunk * 2] = lines[start]
+        header[2 + chunk * 2] = offset + len(data)
+
+        bits = 0
+        bitCount = 0
+        for pc in range(start + 1, min(start + 64, length)):
+            diff = lines[pc] - lines[pc - 1]
+            if diff == 0:
+                value, size = 0, 1
+            elif diff >= 1 and diff <= 4:
+                value, size = (0x02 << 2) | (diff - 1), 4
+            elif diff >= -0x80 and diff <= 0x7f:
+                value, size = (0x06 << 8) | (diff + 0x80), 11
+            else:
+                value, size = (0x07 << 32) | lines[pc], 35
+            bits = (bits << size) | value
+            bitCount += size
+        if bitCount % 8 != 0:
+            bits <<= 8 - bitCount % 8
+            bitCount += 8 - bitCount % 8
+        data += bits.to_bytes(bitCount // 8, 'big')
+    return struct.pack(f'<{len(header)}I', *header) + bytes(data)
+
+def generateLiteral(rng, size):
+    literal = bytearray()
+    for i in range(size):
+        literal.append(rng.choice(LITERAL_ESCAPES if rng.random() < 0.05 else LITERAL))
+    return bytes(literal)
+
+def generateFunction(rng, options, depth = 0):
+    functionCount = options['fanout'] if depth < options['depth'] else 0
+    functions = [generateFunction(rng, options, depth + 1) for i in range(functionCount)]
+
+    shapes = ['If'] * options['ifs'] + ['For'] * options['fors'] + ['While'] * options['whiles'] + ['Try'] * options['tries']
+    builder = FunctionBuilder(rng, options['constants'], functionCount, options['nesting'])
+    words = builder.build(options['instructions'], shapes)
+
+    data = bytearray()
+    data += struct.pack('>IIIHHIII', len(words), options['constants'], functionCount, 16, 2, 1, builder.line, 0)
+    data += struct.pack(f'>{len(words)}I', *words)
+    for i in range(options['constants']):
+        if i % 4 == 3:
+            data += b'\x01' + struct.pack('>d', rng.randrange(100000) / 8)
+        else:
+            data += b'\x00' + packString(generateLiteral(rng, options['literal']))
+    for function in functions:
+        data += function
+    data += struct.pack('>I', 2)
+    data += packString(b'' if depth == 0 else f'func{rng.randrange(1 << 16):04x}'.encode())
+    data += packString(b'bench.js')
+    data += packString(encodePc2line(builder.lines))
+    for i in range(4):
+        data += packString(f'var{i}'.encode()) + struct.pack('>I', i)
+    data += packString(b'')
+    data += struct.pack('>I', 2) + packString(b'a') + packString(b'b')
+    return bytes(data)
+
+def generate(seed = 0, instructions = 1000, depth = 1, fanout = 2, ifs = 10, fors = 5, whiles = 5, tries = 5, constants = 64, literal = 16, nesting = 0):
+    # A Duktape 2.7 JSE file, the marker byte followed by the global function
+    options = {
+        'instructions': instructions, 'depth': depth, 'fanout': fanout, 'ifs': ifs, 'fors': fors,
+        'whiles': whiles, 'tries': tries, 'constants': max(constants, 1), 'literal': literal, 'nesting': nesting,
+    }
+    return b'\xbf' + generateFunction(random.Random(seed), options)
+
+def main(args):
+    data = generate(args.seed, args.instructions, args.depth, args.fanout, args.ifs, args.fors, args.whiles, args.tries, args.constants, args.literal, args.nesting)
+    with open(args.output, 'wb') as file:
+        file.write(data)
+    print(f'Wrote {len(data)} bytes to {args.output}')
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Synthetic Duktape JSE bytecode generator')
+    parser.add_argument('output', help='The generated JSE file.')
+    parser.add_argument('-s', '--seed', type=int, default=0, help='The random seed. (Default 0)')
+    parser.add_argument('-i', '--instructions', type=int, default=1000, help='The number of instructions in each function. (Default 1000)')
+    parser.add_argument('-d', '--depth', type=int, default=1, help='The nesting depth of inner functions. (Default 1)')
+    parser.add_argument('-f', '--fanout', type=int, default=2, help='The number of inner functions of each function above the depth. (Default 2)')
+    parser.add_argument('--ifs', type=int, default=10, help='The number of if/else shapes in each function. (Default 10)')
+    parser.add_argument('--fors', type=int, default=5, help='The number of for loop shapes in each function. (Default 5)')
+    parser.add_argument('--whiles', type=int, default=5, help='The number of while loop shapes in each function. (Default 5)')
+    parser.add_argument('--tries', type=int, default=5, help='The number of try/catch shapes in each function. (Default 5)')
+    parser.add_argument('-c', '--constants', type=int, default=64, help='The size of the constant pool of each function. (Default 64)')
+    parser.add_argument('-l', '--literal', type=int, default=16, help='The length of the string constants. (Default 16)')
+    parser.add_argument('-n', '--nesting', type=int, default=0, help='The number of levels of shapes nested in the body of a shape. (Default 0)')
+    main(parser.parse_args())
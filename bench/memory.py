@@ -0,0 +1,58 @@
+#!/usr/bin/env python3
+
+import argparse
+import os
+import random
+import struct
+import sys
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from duk.constants import DukConstants
+from duk.instructions.block import DukInstructionBlock
+from duk.instructions.lookup import DUK_OP_CLASSES
+
+# Instruction layout before __slots__, every field stored in the instance __dict__
+class DictInstruction:
+    def __init__(self, address, encoded):
+        self.address = address
+        self.opcode = encoded & 0xFF
+        self.a = (encoded >> 8) & 0xFF
+        self.b = (encoded >> 16) & 0xFF
+        self.c = (encoded >> 24) & 0xFF
+        self.bc = (encoded >> 16) & 0xFFFF
+        self.abc = (encoded >> 8) & 0xFFFFFF
+        self.name = DukConstants.DUK_OP[self.opcode]
+
+def generateWords(count, seed):
+    rng = random.Random(seed)
+    opcodes = sorted(DUK_OP_CLASSES)
+    return [rng.choice(opcodes) | (rng.getrandbits(24) << 8) for i in range(count)]
+
+def measure(create):
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    instructions = create()
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return after - before, len(instructions)
+
+def main(args):
+    words = generateWords(args.count, args.seed)
+    data = struct.pack(f'>{len(words)}I', *words)
+
+    dictSize, count = measure(lambda: [DictInstruction(i, word) for i, word in enumerate(words)])
+    slotSize, count = measure(lambda: DukInstructionBlock(data).materialize())
+
+    scale = 100000 / count
+    print(f'Instructions:         {count}')
+    print(f'__dict__ layout:      {dictSize * scale / 1024 / 1024:8.2f} MiB per 100k')
+    print(f'__slots__ layout:     {slotSize * scale / 1024 / 1024:8.2f} MiB per 100k')
+    print(f'Reduction:            {100 - (slotSize * 100 / dictSize):8.2f} %')
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Instruction memory benchmark')
+    parser.add_argument('-c', '--count', type=int, default=100000, help='The number of instructions to create. (Default 100000)')
+    parser.add_argument('-s', '--seed', type=int, default=0, help='The random seed for the instruction words. (Default 0)')
+    main(parser.parse_args())
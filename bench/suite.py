@@ -0,0 +1,156 @@
+#!/usr/bin/env python3
+
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bench.generator import generate
+from decompiler import Decompiler
+from duk.function import DukFunction
+from util.filereader import FileReader
+from util.logger import Logger, Verbosity
+
+DISABLE_GROUPING = {
+    'call': False, 'jump': False, 'if_else': False, 'if_condition': False, 'try_catch_finally': False, 'for': False,
+    'while': False, 'init_array': False, 'init_object': False, 'get_prop': False, 'join_operator': False, 'double_return': False,
+}
+
+def parse(filepath):
+    # Index the file and parse the instructions and constants of every function
+    with open(filepath, 'rb') as file:
+        reader = FileReader(file)
+        reader.uint8()
+        DukFunction.COUNT = 0
+        func = DukFunction.disassemble(reader)
+        for inner in func.getFunctions():
+            inner.getConstants()
+    return func
+
+def discard(text):
+    pass
+
+def scenarioParse(filepaths, directory):
+    start = time.perf_counter()
+    for filepath in filepaths:
+        parse(filepath)
+    return time.perf_counter() - start
+
+def scenarioGroup(filepaths, directory):
+    functions = [parse(filepath) for filepath in filepaths]
+    start = time.perf_counter()
+    for func in functions:
+        func.decompile(DISABLE_GROUPING)
+    return time.perf_counter() - start
+
+def scenarioRender(filepaths, directory):
+    functions = [parse(filepath) for filepath in filepaths]
+    for func in functions:
+        func.decompile(DISABLE_GROUPING)
+    start = time.perf_counter()
+    for func in functions:
+        func.writeOutputs(discard, discard, None, True)
+    return time.perf_counter() - start
+
+def scenarioEndToEnd(filepaths, directory):
+    start = time.perf_counter()
+    for filepath in filepaths:
+        basename = os.path.join(directory, os.path.basename(filepath))
+        Decompiler.decompile(filepath, True, basename + '.asm.js', basename + '.js', DISABLE_GROUPING)
+    return time.perf_counter() - start
+
+SCENARIOS = {
+    'parse': scenarioParse,
+    'group': scenarioGroup,
+    'render': scenarioRender,
+    'end_to_end': scenarioEndToEnd,
+}
+
+def getCommit():
+    try:
+        result = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=os.path.dirname(os.path.abspath(__file__)), capture_output=True, text=True)
+    except OSError:
+        return None
+    return result.stdout.strip() if result.returncode == 0 else None
+
+def compare(results, baseline):
+    print()
+    if baseline.get('parameters') != results['parameters']:
+        print('Warning: the baseline was run on files generated with different parameters')
+    print(f'{"Scenario":<12} {"Baseline":>10} {"Current":>10} {"Speedup":>9}')
+    for name, result in results['scenarios'].items():
+        if name not in baseline['scenarios']:
+            continue
+        before = baseline['scenarios'][name]['best']
+        print(f'{name:<12} {before:9.3f}s {result["best"]:9.3f}s {before / result["best"]:8.2f}x')
+
+def main(args):
+    Logger.VERBOSITY = Verbosity.NONE
+    sys.setrecursionlimit(10000)
+    parameters = {
+        'files': args.files, 'instructions': args.instructions, 'depth': args.depth, 'fanout': args.fanout, 'ifs': args.ifs,
+        'fors': args.fors, 'whiles': args.whiles, 'tries': args.tries, 'constants': args.constants, 'literal': args.literal, 'nesting': args.nesting,
+    }
+
+    with tempfile.TemporaryDirectory() as directory:
+        # Generate the inputs once, every scenario runs over the same files
+        filepaths = []
+        size = 0
+        for seed in range(args.seed, args.seed + args.files):
+            data = generate(seed, args.instructions, args.depth, args.fanout, args.ifs, args.fors, args.whiles, args.tries, args.constants, args.literal, args.nesting)
+            filepath = os.path.join(directory, f'bench{seed}.jse')
+            with open(filepath, 'wb') as file:
+                file.write(data)
+            filepaths.append(filepath)
+            size += len(data)
+
+        outputDirectory = os.path.join(directory, 'output')
+        os.makedirs(outputDirectory)
+
+        results = {
+            'commit': getCommit(),
+            'python': platform.python_version(),
+            'parameters': parameters,
+            'bytes': size,
+            'scenarios': {},
+        }
+        print(f'Files:                {args.files} ({size} bytes)')
+        for name in args.scenario if args.scenario != None else SCENARIOS:
+            runs = [SCENARIOS[name](filepaths, outputDirectory) for i in range(args.repeat)]
+            results['scenarios'][name] = {'best': min(runs), 'median': statistics.median(runs), 'runs': runs}
+            print(f'{name + ":":<22}{min(runs):8.3f} s (median {statistics.median(runs):.3f} s)')
+
+    if args.output != None:
+        with open(args.output, 'w') as file:
+            json.dump(results, file, indent=4)
+
+    if args.compare != None:
+        with open(args.compare, 'r') as file:
+            compare(results, json.load(file))
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Parse, group, render and end-to-end benchmarks over generated JSE files')
+    parser.add_argument('-o', '--output', required=False, help='The JSON results file.')
+    parser.add_argument('-b', '--compare', required=False, metavar='BASELINE', help='A JSON results file of an earlier run to compare against.')
+    parser.add_argument('-r', '--repeat', type=int, default=3, help='The number of runs of each scenario, the best run is reported. (Default 3)')
+    parser.add_argument('--scenario', action='append', choices=list(SCENARIOS), help='Only run the given scenario, can be repeated.')
+    parser.add_argument('-n', '--files', type=int, default=4, help='The number of generated files. (Default 4)')
+    parser.add_argument('-s', '--seed', type=int, default=0, help='The random seed of the first file. (Default 0)')
+    parser.add_argument('-i', '--instructions', type=int, default=2000, help='The number of instructions in each function. (Default 2000)')
+    parser.add_argument('-d', '--depth', type=int, default=2, help='The nesting depth of inner functions. (Default 2)')
+    parser.add_argument('-f', '--fanout', type=int, default=2, help='The number of inner functions of each function above the depth. (Default 2)')
+    parser.add_argument('--ifs', type=int, default=20, help='The number of if/else shapes in each function. (Default 20)')
+    parser.add_argument('--fors', type=int, default=10, help='The number of for loop shapes in each function. (Default 10)')
+    parser.add_argument('--whiles', type=int, default=10, help='The number of while loop shapes in each function. (Default 10)')
+    parser.add_argument('--tries', type=int, default=10, help='The number of try/catch shapes in each function. (Default 10)')
+    parser.add_argument('-c', '--constants', type=int, default=64, help='The size of the constant pool of each function. (Default 64)')
+    parser.add_argument('-l', '--literal', type=int, default=16, help='The length of the string constants. (Default 16)')
+    parser.add_argument('--nesting', type=int, default=2, help='The number of levels of shapes nested in the body of a shape. (Default 2)')
+    main(parser.parse_args())
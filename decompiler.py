@@ -1,51 +1,267 @@
 import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from util.cache import OutputCache
 from util.logger import Logger, Verbosity
+from util.profiler import Profiler
+from duk.groups.stats import DukRuleStats
 from util.filereader import FileReader
 from duk.function import DukFunction
+from duk.snapshot import DukSnapshot
 
 class Decompiler:
+    # Version of the outputs, cached outputs of another version are never reused
+    VERSION = '1.0.0'
+
+    # Functions of the file last indexed by a function worker
+    INDEX = None
+
+    @staticmethod
+    def decompile(filepath, grouping = True, asm = None, output = None, disableGrouping = {}, functions = None, functionJobs = 1, dump = None, cache = None, irIn = False, irOut = None, lines = False, worklist = True, structuring = False, entryChecks = False):
+        Profiler.startFile(filepath)
+        DukRuleStats.startFile(filepath)
+        try:
+            if cache != None:
+                return Decompiler.decompileCached(cache, filepath, grouping, asm, output, disableGrouping, functions, functionJobs, dump, irIn, irOut, lines, worklist, structuring, entryChecks)
+            return Decompiler.decompileFile(filepath, grouping, asm, output, disableGrouping, functions, functionJobs, dump, irIn, irOut, lines, worklist, structuring, entryChecks)
+        finally:
+            Profiler.stopFile()
+            DukRuleStats.stopFile()
+
     @staticmethod
-    def decompile(filepath, grouping = True, asm = None, output = None, disableGrouping = {}):
+    def decompileFile(filepath, grouping, asm, output, disableGrouping, functions, functionJobs, dump, irIn, irOut, lines, worklist, structuring, entryChecks):
         try:
             # Open file for reading
             with open(filepath, 'rb') as file:
-                reader = FileReader(file)
+                with Profiler.phase('read'):
+                    reader = FileReader(file)
 
-                # Validate marker
-                marker = reader.uint8()
-                if marker != 0xbf:
-                    if marker == None:
-                        Logger.warning(Verbosity.DEBUG, f'{filepath}: No marker byte found, ignoring')
+                    # Validate marker
+                    if irIn:
+                        if not DukSnapshot.isSnapshot(reader):
+                            Logger.warning(Verbosity.DEBUG, f'{filepath}: Not a version {DukSnapshot.VERSION} IR snapshot, ignoring')
+                            return False
                     else:
-                        Logger.warning(Verbosity.DEBUG, f'{filepath}: Invalid marker byte of 0x{marker:02X}, expecting 0xBF, ignoring')
-                    return None
+                        marker = reader.uint8()
+                        if marker != 0xbf:
+                            if marker == None:
+                                Logger.warning(Verbosity.DEBUG, f'{filepath}: No marker byte found, ignoring')
+                            else:
+                                Logger.warning(Verbosity.DEBUG, f'{filepath}: Invalid marker byte of 0x{marker:02X}, expecting 0xBF, ignoring')
+                            return False
 
-                # Disassemble global function
-                Logger.info(Verbosity.NORMAL, f'Disassembling {filepath}')
-                func = DukFunction.disassemble(reader)
+                # Disassemble global function, or load the parsed functions from a snapshot
+                DukFunction.COUNT = 0
+                with Profiler.phase('disassemble'):
+                    if irIn:
+                        Logger.info(Verbosity.NORMAL, f'Loading {filepath}')
+                        func = DukSnapshot.load(reader)
+                    else:
+                        Logger.info(Verbosity.NORMAL, f'Disassembling {filepath}')
+                        func = DukFunction.disassemble(reader)
+                        if func == None:
+                            Logger.warning(Verbosity.NORMAL, f'{filepath}: Truncated function header, ignoring')
+                            return False
+
+                # The snapshot holds every function, whichever functions are selected
+                if irOut != None:
+                    with Profiler.phase('write'), Decompiler.openOutput(irOut, 'wb') as fSnapshot:
+                        DukSnapshot.save(func, fSnapshot.write)
 
-                # Write to asm
-                if asm != None:
-                    os.makedirs(os.path.dirname(asm), exist_ok=True)
-                    with open(asm, 'w') as fAsm:
-                        fAsm.write(func.toAsm())
+                # Select functions, only the selected functions are parsed
+                selected = [func]
+                if functions != None:
+                    selected = func.findFunctions(functions)
+                    if len(selected) == 0:
+                        Logger.warning(Verbosity.NORMAL, f'{filepath}: No function matching {", ".join(functions)}, ignoring')
+                        return False
 
-                # Write to output
+                # Decompile function to high-level
                 if output != None:
-                    # Decompile function to high-level
                     Logger.bar(Verbosity.DEBUG)
                     Logger.info(Verbosity.NORMAL, f'Decompiling {filepath}')
-                    if grouping:
-                        func.decompile(disableGrouping)
+                    try:
+                        with Profiler.phase('group'):
+                            if functionJobs != 1:
+                                Decompiler.decompileFunctions(filepath, selected, grouping, disableGrouping, functionJobs, irIn, lines, worklist, structuring, entryChecks)
+                            if grouping:
+                                for func in selected:
+                                    func.decompile(disableGrouping, worklist, structuring, entryChecks)
+                    except Exception:
+                        # The listing and dump are still written when grouping fails
+                        Decompiler.writeOutputs(selected, asm, None, dump, grouping, lines)
+                        raise
 
-                    os.makedirs(os.path.dirname(output), exist_ok=True)
-                    with open(output, 'w') as fOutput:
-                        fOutput.write(func.toString(grouping))
+                # Write every output in a single pass
+                Decompiler.writeOutputs(selected, asm, output, dump, grouping, lines)
 
                 # Check if there is any remaining data
-                remaining = file.read()
+                remaining = reader.remaining()
                 if remaining != b'':
-                    Logger.warning(Verbosity.DEBUG, f'{filepath}: Failed to process excess data ({remaining.hex()})')
+                    Logger.warning(Verbosity.DEBUG, lambda: f'{filepath}: Failed to process excess data ({remaining.hex()})')
         except OSError:
             Logger.error(Verbosity.NORMAL, f'Failed to open {filepath}, ignoring')
-            return
\ No newline at end of file
+            return False
+        return True
+
+    @staticmethod
+    def decompileCached(directory, filepath, grouping, asm, output, disableGrouping, functions, functionJobs, dump, irIn, irOut, lines, worklist, structuring, entryChecks):
+        # Hits and the seconds they saved are counted by the cache
+        outputs = (asm, output, dump, irOut)
+        if all(path == None for path in outputs):
+            return Decompiler.decompileFile(filepath, grouping, asm, output, disableGrouping, functions, functionJobs, dump, irIn, irOut, lines, worklist, structuring, entryChecks)
+
+        try:
+            cache = OutputCache(directory)
+            key = OutputCache.getKey(filepath, [Decompiler.VERSION, grouping, disableGrouping, functions, irIn, lines, structuring, entryChecks])
+        except OSError:
+            Logger.error(Verbosity.NORMAL, f'Failed to open {filepath}, ignoring')
+            return False
+
+        start = time.perf_counter()
+        with Profiler.phase('cache'):
+            seconds = cache.restore(key, outputs)
+        if seconds != None:
+            Logger.info(Verbosity.NORMAL, f'Restored {filepath} from the cache')
+            OutputCache.count(True, max(seconds - (time.perf_counter() - start), 0))
+            return True
+
+        # Outputs left over from an earlier run are never stored for an input that failed or was ignored
+        OutputCache.count(False)
+        if not Decompiler.decompileFile(filepath, grouping, asm, output, disableGrouping, functions, functionJobs, dump, irIn, irOut, lines, worklist, structuring, entryChecks):
+            return False
+        with Profiler.phase('cache'):
+            cache.store(key, outputs, time.perf_counter() - start)
+        return True
+
+    @staticmethod
+    def openOutput(filepath, mode = 'w'):
+        if filepath == None:
+            return None
+
+        # Outputs in the working directory have no directory to create
+        if os.path.dirname(filepath) != '':
+            os.makedirs(os.path.dirname(filepath), exist_ok=True)
+        return open(filepath, mode)
+
+    @staticmethod
+    def writeOutputs(selected, asm, output, dump, grouping, lines = False):
+        files = []
+        try:
+            with Profiler.phase('write'):
+                for filepath in (asm, output, dump):
+                    files.append(Decompiler.openOutput(filepath))
+            fAsm, fOutput, fDump = files
+            writeAsm = None if fAsm == None else fAsm.write
+            writeString = None if fOutput == None else fOutput.write
+            writeDump = None if fDump == None else fDump.write
+
+            # The dump is a list of the selected functions
+            with Profiler.phase('render'):
+                if writeDump != None:
+                    writeDump('[')
+                for i in range(0, len(selected)):
+                    if writeDump != None and i > 0:
+                        writeDump(', ')
+                    selected[i].writeOutputs(writeAsm, writeString, writeDump, grouping, lines)
+                if writeDump != None:
+                    writeDump(']\n')
+        finally:
+            with Profiler.phase('write'):
+                for file in files:
+                    if file != None:
+                        file.close()
+
+    @staticmethod
+    def decompileCaptured(*args):
+        # Capture the log output so files decompiled in parallel are not interleaved
+        Logger.capture()
+        try:
+            result = Decompiler.decompile(*args)
+            error = None
+        except Exception as e:
+            result = None
+            error = e
+        return Logger.release(), Profiler.release(), DukRuleStats.release(), OutputCache.release(), result, error
+
+    @staticmethod
+    def initWorker(verbosity, useColor, profile = False, ruleStats = False):
+        Logger.VERBOSITY = verbosity
+        Logger.useColor(useColor)
+        Logger.detachFile()
+        Profiler.enable(profile)
+        Profiler.detach()
+        DukRuleStats.enable(ruleStats)
+        DukRuleStats.detach()
+        OutputCache.detach()
+
+    @staticmethod
+    def getWeight(func, weights):
+        if func not in weights:
+            weights[func] = func.instructionCount + sum(Decompiler.getWeight(f, weights) for f in func.functions)
+        return weights[func]
+
+    @staticmethod
+    def decompileFunctions(filepath, selected, grouping, disableGrouping, workers, irIn, lines = False, worklist = True, structuring = False, entryChecks = False):
+        # Split the inner functions of the selected functions into independent units
+        units = [f for func in selected for f in func.functions if f not in selected]
+        weights = {}
+        while len(units) > 0 and len(units) < (workers if workers > 0 else os.cpu_count()) * 4:
+            # Split the largest unit into its inner functions, its own body is rendered in this process
+            largest = max(units, key=lambda func: Decompiler.getWeight(func, weights))
+            if len(largest.functions) == 0:
+                break
+            index = units.index(largest)
+            units[index:index + 1] = [f for f in largest.functions if f not in selected]
+
+        if len(units) == 0:
+            return
+
+        # Group and render the units in parallel, then stitch the text back into the functions
+        with ProcessPoolExecutor(workers if workers > 0 else None, initializer=Decompiler.initWorker, initargs=(Logger.VERBOSITY, Logger.USE_COLOR, Profiler.ENABLED, DukRuleStats.ENABLED)) as executor:
+            futures = [executor.submit(Decompiler.decompileFunction, filepath, func.index, grouping, disableGrouping, irIn, lines, worklist, structuring, entryChecks) for func in units]
+            for func, future in zip(units, futures):
+                log, profiles, ruleStats, text, error = future.result()
+                Logger.write(Verbosity.NONE, log, '')
+                Profiler.merge(profiles)
+                DukRuleStats.merge(ruleStats)
+                if error != None:
+                    executor.shutdown(cancel_futures=True)
+                    raise error
+                func.text = text
+
+    @staticmethod
+    def decompileFunction(filepath, index, grouping, disableGrouping, irIn, lines = False, worklist = True, structuring = False, entryChecks = False):
+        # Index the file once per worker, only the requested function is parsed
+        if Decompiler.INDEX == None or Decompiler.INDEX[0] != filepath:
+            Logger.capture()
+            try:
+                with open(filepath, 'rb') as file:
+                    reader = FileReader(file)
+                    DukFunction.COUNT = 0
+                    if irIn:
+                        DukSnapshot.isSnapshot(reader)
+                        functions = DukSnapshot.load(reader).getFunctions()
+                    else:
+                        reader.uint8()
+                        functions = DukFunction.disassemble(reader).getFunctions()
+                Decompiler.INDEX = (filepath, {func.index: func for func in functions})
+            finally:
+                Logger.release()
+
+        Logger.capture()
+        Profiler.startFile(filepath)
+        DukRuleStats.startFile(filepath)
+        try:
+            func = Decompiler.INDEX[1][index]
+            if grouping:
+                func.decompile(disableGrouping, worklist, structuring, entryChecks)
+            text = func.toString(True, lines)
+            error = None
+        except Exception as e:
+            text = None
+            error = e
+        finally:
+            Profiler.stopFile()
+            DukRuleStats.stopFile()
+        return Logger.release(), Profiler.release(), DukRuleStats.release(), text, error
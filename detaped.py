@@ -2,8 +2,12 @@
 
 import argparse
 import os
+from concurrent.futures import ProcessPoolExecutor
 from decompiler import Decompiler
 from util.logger import Logger, Verbosity
+from util.cache import OutputCache
+from util.profiler import Profiler
+from duk.groups.stats import DukRuleStats
 
 def resolveDirectoryToFilename(input, output, basename, extension):
     if output == None:
@@ -17,12 +21,49 @@ def resolveDirectoryToFilename(input, output, basename, extension):
 
     return output
 
+def getFileSize(filepath):
+    try:
+        return os.path.getsize(filepath)
+    except OSError:
+        return 0
+
+def getJobCount(value):
+    # Number of processes, 0 uses every core
+    count = int(value)
+    if count < 0:
+        raise argparse.ArgumentTypeError(f'invalid job count: {value}, expecting 0 or more')
+    return count
+
+def reportCache():
+    rate = 100 * OutputCache.HITS / OutputCache.LOOKUPS if OutputCache.LOOKUPS > 0 else 0
+    Logger.success(Verbosity.NORMAL, f'Cache: {OutputCache.HITS}/{OutputCache.LOOKUPS} files restored ({rate:.1f}% hit rate), {OutputCache.SAVED:.2f}s saved')
+
+def decompileParallel(jobs, workers):
+    with ProcessPoolExecutor(workers if workers > 0 else None, initializer=Decompiler.initWorker, initargs=(Logger.VERBOSITY, Logger.USE_COLOR, Profiler.ENABLED, DukRuleStats.ENABLED)) as executor:
+        # Schedule the largest files first so a single large file does not finish last
+        futures = {}
+        for job in sorted(jobs, key=lambda job: getFileSize(job[0]), reverse=True):
+            futures[job[0]] = executor.submit(Decompiler.decompileCaptured, *job)
+
+        # Output the logs in the sequential order, stopping at the first failure like sequential mode
+        for job in jobs:
+            log, profiles, ruleStats, cacheCounts, result, error = futures[job[0]].result()
+            Logger.write(Verbosity.NONE, log, '')
+            Profiler.FILES += profiles
+            DukRuleStats.FILES += ruleStats
+            OutputCache.merge(cacheCounts)
+            if error != None:
+                executor.shutdown(cancel_futures=True)
+                raise error
+
 def main(args):
     # Logger
     Logger.setVerbosity(args.verbosity)
     Logger.useColor(not args.no_ansi)
     if args.txt != None:
         Logger.setFile(args.txt)
+    Profiler.enable(args.profile or args.profile_json != None)
+    DukRuleStats.enable(args.rule_stats != None)
 
     # Validation
     if not os.path.exists(args.input):
@@ -36,6 +77,13 @@ def main(args):
             Logger.fatal(Verbosity.NORMAL, 3, 'Input is a directory therefore the output must be a directory.')
         if args.asm != None and os.path.isfile(args.asm):
             Logger.fatal(Verbosity.NORMAL, 4, 'Input is a directory therefore the ASM must be a directory.')
+        if args.dump != None and os.path.isfile(args.dump):
+            Logger.fatal(Verbosity.NORMAL, 5, 'Input is a directory therefore the dump must be a directory.')
+        if args.ir_out != None and os.path.isfile(args.ir_out):
+            Logger.fatal(Verbosity.NORMAL, 7, 'Input is a directory therefore the IR snapshot must be a directory.')
+
+    if args.cache != None and os.path.isfile(args.cache):
+        Logger.fatal(Verbosity.NORMAL, 6, 'The cache must be a directory.')
 
     # Disable grouping options
     disableGrouping = {
@@ -57,9 +105,12 @@ def main(args):
     inputBasename = os.path.splitext(os.path.basename(args.input.rstrip('/')))[0]
     output = resolveDirectoryToFilename(args.input, args.output, inputBasename, 'js')
     asm = resolveDirectoryToFilename(args.input, args.asm, inputBasename, 'asm.js')
+    dump = resolveDirectoryToFilename(args.input, args.dump, inputBasename, 'json')
+    irOut = resolveDirectoryToFilename(args.input, args.ir_out, inputBasename, 'dkir')
 
     # Handle directory
     if os.path.isdir(args.input):
+        jobs = []
         for directory, subdirs, files in os.walk(args.input):
             directory = directory.rstrip('/')
             for file in files:
@@ -70,19 +121,47 @@ def main(args):
                 if subpath == '.':
                     subpath = ''
 
-                Decompiler.decompile(filepath, not args.disable_grouping, os.path.join(asm, subpath, file) if asm != None else None, os.path.join(output, subpath, file) if output != None else None, disableGrouping)
-        return
+                jobs.append((filepath, not args.disable_grouping, os.path.join(asm, subpath, file) if asm != None else None, os.path.join(output, subpath, file) if output != None else None, disableGrouping, args.function, args.function_jobs, os.path.join(dump, subpath, file) if dump != None else None, args.cache, args.ir_in, os.path.join(irOut, subpath, file) if irOut != None else None, args.lines, not args.disable_worklist, args.structuring, args.entry_checks))
+
+        if args.jobs == 1:
+            for job in jobs:
+                Decompiler.decompile(*job)
+        else:
+            decompileParallel(jobs, args.jobs)
+    else:
+        # Handle file
+        Decompiler.decompile(args.input, not args.disable_grouping, asm, output, disableGrouping, args.function, args.function_jobs, dump, args.cache, args.ir_in, irOut, args.lines, not args.disable_worklist, args.structuring, args.entry_checks)
+
+    if args.cache != None:
+        reportCache()
+
+    if Profiler.ENABLED:
+        Profiler.report(args.profile_top)
+        if args.profile_json != None:
+            Profiler.save(args.profile_json)
 
-    # Handle file
-    Decompiler.decompile(args.input, not args.disable_grouping, asm, output, disableGrouping)
+    if DukRuleStats.ENABLED:
+        DukRuleStats.save(args.rule_stats)
 
 if __name__ == '__main__':
     parser = argparse.ArgumentParser(description='Duktape JavaScript bytecode decompiler')
     parser.add_argument('input', help='The Duktape bytecode file or directory to be decompiled.')
     parser.add_argument('-o', '--output', required=False, help='The decompiled output JavaScript file or directory.')
     parser.add_argument('-a', '--asm', required=False, help='The output JavaScript ASM file or directory.')
+    parser.add_argument('-d', '--dump', required=False, help='The output JSON dump of the functions and instructions file or directory.')
+    parser.add_argument('--ir-out', required=False, help='The output IR snapshot of the parsed functions file or directory, it is loaded with --ir-in without parsing the bytecode again.')
+    parser.add_argument('--ir-in', action='store_true', help='The input files are IR snapshots written by --ir-out instead of Duktape bytecode.')
+    parser.add_argument('-c', '--cache', required=False, help='The directory of cached outputs, unchanged inputs are restored from it instead of being decompiled again.')
     parser.add_argument('-t', '--txt', required=False, help='The command output text file.')
+    parser.add_argument('-j', '--jobs', type=getJobCount, default=1, help='The number of files to decompile in parallel, 0 uses every core. (Default 1)')
+    parser.add_argument('--function-jobs', type=getJobCount, default=1, help='The number of inner functions to decompile in parallel within a file, 0 uses every core. (Default 1)')
     parser.add_argument('-n', '--no-ansi', action='store_true', help='Disable ANSI color output.')
+    parser.add_argument('-l', '--lines', action='store_true', help='Annotate the decompiled statements and ASM instructions with their source line.')
+    parser.add_argument('-f', '--function', action='append', metavar='NAME|INDEX', help='Only output the function with the given name or index, can be repeated.')
+    parser.add_argument('-p', '--profile', action='store_true', help='Time the read, disassemble, group, render and write phases of every file and print the slowest files and functions.')
+    parser.add_argument('--profile-top', type=int, default=10, help='The number of files and functions in the profile tables. (Default 10)')
+    parser.add_argument('--profile-json', required=False, help='The output JSON file of the raw profile timings, implies --profile.')
+    parser.add_argument('--rule-stats', required=False, metavar='FILE', help='The output JSON file of the calls, rewrites and time of every grouping rule, per function and for the whole run.')
     parser.add_argument('-v', '--verbosity', default='normal', choices=['none', 'normal', 'debug'], help='The script output verbosity mode. (Default "normal")')
 
     grouping = parser.add_argument_group('Decompiler Grouping', 'Disable specific decompiler grouping functionality.')
@@ -99,5 +178,8 @@ if __name__ == '__main__':
     grouping.add_argument('--disable-get-prop', action='store_true', help='Disables grouping get properties.')
     grouping.add_argument('--disable-join-operator', action='store_true', help='Disables grouping join operators.')
     grouping.add_argument('--disable-double-return', action='store_true', help='Disables grouping return undefined after return.')
+    grouping.add_argument('--structuring', action='store_true', help='Enables the control flow graph structuring pass, if/else, loops and try/catch are only grouped at the headers found in the graph.')
+    grouping.add_argument('--entry-checks', action='store_true', help='Enables the check that no jump from outside lands inside an if/else, loop or try/catch before grouping it.')
+    grouping.add_argument('--disable-worklist', action='store_true', help='Disables the worklist, every item is grouped again on each pass.')
 
     main(parser.parse_args())
\ No newline at end of file
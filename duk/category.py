@@ -0,0 +1,42 @@
+class DukCategory:
+    # Category bits of the items grouping rules match on, an item class carries the bits of all of its base classes
+    NONE = 0
+
+    # Instructions
+    JUMP = 1 << 0
+    IF = 1 << 1
+    IF_R = 1 << 2
+    IF_TRUE_R = 1 << 3
+    IF_FALSE_R = 1 << 4
+    LABEL = 1 << 5
+    END_LABEL = 1 << 6
+    NEXT_ENUM = 1 << 7
+    TRY_CATCH = 1 << 8
+    LOAD = 1 << 9
+    GET_VAR = 1 << 10
+    LD_REG = 1 << 11
+    LD_CONST = 1 << 12
+    LD_INT = 1 << 13
+    OPERATOR = 1 << 14
+    COMPARISON = 1 << 15
+    INC_DEC = 1 << 16
+    CALL = 1 << 17
+    CS_REG = 1 << 18
+    CS_VAR = 1 << 19
+    GET_PROP = 1 << 20
+    NEW_OBJ = 1 << 21
+    NEW_ARR = 1 << 22
+    MPUT_OBJ = 1 << 23
+    MPUT_ARR = 1 << 24
+    RET_REG = 1 << 25
+    RET_CONST = 1 << 26
+    RET_UNDEF = 1 << 27
+
+    # Groups
+    GROUP = 1 << 28
+    GROUP_LOAD = 1 << 29
+    GROUP_JOIN_OPERATOR = 1 << 30
+    GROUP_CALL = 1 << 31
+    GROUP_IF_R = 1 << 32
+    GROUP_IF_TRUE_R = 1 << 33
+    GROUP_IF_FALSE_R = 1 << 34
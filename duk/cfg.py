@@ -0,0 +1,276 @@
+from array import array
+from duk.category import DukCategory
+from duk.instructions.instructions import *
+
+class DukBasicBlock:
+    __slots__ = ('index', 'start', 'end', 'successors', 'predecessors')
+
+    def __init__(self, index, start, end):
+        # Instructions start to end, both included
+        self.index = index
+        self.start = start
+        self.end = end
+        self.successors = []
+        self.predecessors = []
+
+class DukCFG:
+    # Instructions ending a block without falling through to the next one
+    RETURNS = DukCategory.RET_REG | DukCategory.RET_CONST | DukCategory.RET_UNDEF
+
+    def __init__(self, instructions):
+        self.instructions = instructions
+        self.blocks = []
+        self.blockOf = array('I')
+        self.buildBlocks()
+        self.idom = DukCFG.getDominators(self.blocks, 0, lambda block: block.successors, lambda block: block.predecessors)
+        self.ipdom = self.getPostDominators()
+        self.domRanges = DukCFG.getTreeRanges(self.idom)
+        self.pdomRanges = DukCFG.getTreeRanges(self.ipdom)
+
+    def getTargets(self, index, labels):
+        # Addresses execution can continue at after the instruction, None for the next instruction only
+        ins = self.instructions[index]
+        category = ins.CATEGORY
+        if category & DukCategory.JUMP:
+            return [ins.getDestinationAddress()]
+        if category & (DukCategory.IF | DukCategory.NEXT_ENUM):
+            return [index + 1, ins.getDestinationAddress()]
+        if category & DukCategory.LABEL:
+            # The two jump slots after a label are only reached by the break and continue jumping to them
+            labels[ins.bc] = index
+            return [index + 3]
+        if category & DukCategory.TRY_CATCH:
+            # The two jump slots after a try are taken on a catch and a finally, anywhere in the try
+            return [index + 3, index + 1, index + 2]
+        if category & DukCFG.RETURNS or isinstance(ins, DukInstructionThrow):
+            return []
+        if isinstance(ins, (DukInstructionBreak, DukInstructionContinue)):
+            # Breaks and continues refer to the closest label before them with their label number
+            label = labels.get(ins.bc)
+            if label == None:
+                return []
+            return [label + (1 if isinstance(ins, DukInstructionBreak) else 2)]
+        return None
+
+    def buildBlocks(self):
+        count = len(self.instructions)
+        if count == 0:
+            return
+
+        # Blocks start at the first instruction, at every target and after every instruction changing the flow
+        targets = [None] * count
+        leaders = bytearray(count)
+        leaders[0] = 1
+        labels = {}
+        for i in range(0, count):
+            targets[i] = self.getTargets(i, labels)
+            if targets[i] == None:
+                continue
+            if i + 1 < count:
+                leaders[i + 1] = 1
+            for target in targets[i]:
+                if 0 <= target < count:
+                    leaders[target] = 1
+
+        self.blockOf = array('I', bytes(4 * count))
+        start = 0
+        for i in range(1, count + 1):
+            if i == count or leaders[i]:
+                block = DukBasicBlock(len(self.blocks), start, i - 1)
+                self.blocks.append(block)
+                for address in range(start, i):
+                    self.blockOf[address] = block.index
+                start = i
+
+        # Edges, targets outside of the function are dropped
+        for block in self.blocks:
+            blockTargets = targets[block.end]
+            if blockTargets == None:
+                blockTargets = [block.end + 1]
+            for target in blockTargets:
+                if 0 <= target < count:
+                    successor = self.blocks[self.blockOf[target]]
+                    if successor not in block.successors:
+                        block.successors.append(successor)
+                        successor.predecessors.append(block)
+
+    def getPostDominators(self):
+        # Dominators of the reversed graph, a virtual exit follows every block leaving the function
+        exit = DukBasicBlock(len(self.blocks), None, None)
+        exits = [block for block in self.blocks if len(block.successors) == 0]
+        nodes = self.blocks + [exit]
+        ipdom = DukCFG.getDominators(nodes, exit.index,
+            lambda block: exits if block == exit else block.predecessors,
+            lambda block: block.successors + ([exit] if len(block.successors) == 0 else []))
+        if len(ipdom) > 0:
+            ipdom.pop()
+
+        # The virtual exit is not a block, blocks only post dominated by it have no immediate post dominator
+        for i in range(0, len(ipdom)):
+            if ipdom[i] == exit.index:
+                ipdom[i] = None
+        return ipdom
+
+    @staticmethod
+    def getDominators(nodes, entry, getSuccessors, getPredecessors):
+        # Cooper, Harvey and Kennedy's iterative algorithm over the reverse postorder, unreachable nodes have None
+        if len(nodes) == 0:
+            return []
+
+        order = []
+        visited = bytearray(len(nodes))
+        visited[entry] = 1
+        stack = [(nodes[entry], iter(getSuccessors(nodes[entry])))]
+        while len(stack) > 0:
+            node, successors = stack[-1]
+            for successor in successors:
+                if not visited[successor.index]:
+                    visited[successor.index] = 1
+                    stack.append((successor, iter(getSuccessors(successor))))
+                    break
+            else:
+                order.append(node)
+                stack.pop()
+        order.reverse()
+
+        position = [None] * len(nodes)
+        for i in range(0, len(order)):
+            position[order[i].index] = i
+
+        idom = [None] * len(nodes)
+        idom[entry] = entry
+        changed = True
+        while changed:
+            changed = False
+            for node in order[1:]:
+                dominator = None
+                for predecessor in getPredecessors(node):
+                    if idom[predecessor.index] == None:
+                        continue
+                    if dominator == None:
+                        dominator = predecessor.index
+                        continue
+
+                    # Walk both nodes up the tree until they meet
+                    other = predecessor.index
+                    while dominator != other:
+                        while position[dominator] > position[other]:
+                            dominator = idom[dominator]
+                        while position[other] > position[dominator]:
+                            other = idom[other]
+                if idom[node.index] != dominator:
+                    idom[node.index] = dominator
+                    changed = True
+
+        idom[entry] = None
+        return idom
+
+    @staticmethod
+    def getTreeRanges(idom):
+        # Preorder entry and exit numbers of the tree, a node dominates another when its range holds the other range
+        children = [[] for i in range(0, len(idom))]
+        roots = []
+        for i in range(0, len(idom)):
+            if idom[i] == None:
+                roots.append(i)
+            else:
+                children[idom[i]].append(i)
+
+        ranges = [None] * len(idom)
+        counter = 0
+        for root in roots:
+            stack = [(root, False)]
+            while len(stack) > 0:
+                node, done = stack.pop()
+                if done:
+                    ranges[node] = (ranges[node], counter)
+                    continue
+                ranges[node] = counter
+                counter += 1
+                stack.append((node, True))
+                for child in children[node]:
+                    stack.append((child, False))
+        return ranges
+
+    def getBlock(self, address):
+        if address < 0 or address >= len(self.blockOf):
+            return None
+        return self.blocks[self.blockOf[address]]
+
+    def dominates(self, a, b):
+        return self.domRanges[a.index][0] <= self.domRanges[b.index][0] and self.domRanges[b.index][1] <= self.domRanges[a.index][1]
+
+    def postDominates(self, a, b):
+        return self.pdomRanges[a.index][0] <= self.pdomRanges[b.index][0] and self.pdomRanges[b.index][1] <= self.pdomRanges[a.index][1]
+
+    def getImmediateDominator(self, block):
+        return None if self.idom[block.index] == None else self.blocks[self.idom[block.index]]
+
+    def getImmediatePostDominator(self, block):
+        return None if self.ipdom[block.index] == None else self.blocks[self.ipdom[block.index]]
+
+    def isReachable(self, block):
+        return block.index == 0 or self.idom[block.index] != None
+
+    def isSingleEntry(self, startAddress, endAddress):
+        # Every reachable block of the addresses is dominated by the block holding the first address, blocks are
+        # only entered at their start so the instructions before the first address cannot enter the addresses
+        header = self.getBlock(startAddress)
+        if header == None or self.getBlock(endAddress) == None:
+            return False
+        for index in range(self.blockOf[startAddress], self.blockOf[endAddress] + 1):
+            block = self.blocks[index]
+            if self.isReachable(block) and not self.dominates(header, block):
+                return False
+        return True
+
+    def getHeaders(self):
+        # Addresses starting an if, a loop or a try the graph shows are entered only through their first instruction
+        headers = []
+        count = len(self.instructions)
+        for block in self.blocks:
+            address = block.end
+            ins = self.instructions[address]
+            category = ins.CATEGORY
+
+            # if (...) { } else { }, the region ends before the block joining the branches, without a join after the
+            # if the jump slot skips the body and a forward jump at its end skips the else
+            if category & (DukCategory.IF_TRUE_R | DukCategory.IF_FALSE_R):
+                if address + 1 >= count or not self.instructions[address + 1].CATEGORY & DukCategory.JUMP:
+                    continue
+                join = self.getImmediatePostDominator(block)
+                if join != None and join.start > address + 1:
+                    endAddress = join.start - 1
+                else:
+                    endAddress = self.instructions[address + 1].getDestinationAddress() - 1
+                    if endAddress <= address + 1 or endAddress >= count:
+                        continue
+                    if self.instructions[endAddress].CATEGORY & DukCategory.JUMP and self.instructions[endAddress].getDestinationAddress() > endAddress + 1:
+                        endAddress = self.instructions[endAddress].getDestinationAddress() - 1
+                if self.isSingleEntry(address, endAddress):
+                    headers.append(address)
+                continue
+
+            # Loops are labels, the break slot jumps to the end of the loop
+            if category & DukCategory.LABEL:
+                if address + 1 >= count or not self.instructions[address + 1].CATEGORY & DukCategory.JUMP:
+                    continue
+                endAddress = self.instructions[address + 1].getDestinationAddress()
+                if endAddress <= address or endAddress >= count:
+                    continue
+                if self.isSingleEntry(address, endAddress):
+                    headers.append(address)
+                continue
+
+            # try { } catch { }, the constant loaded before the try is part of it, the first jump slot leads to the
+            # catch after the endtry and the second one to the end of the endcatch, the region holds both bodies
+            if category & DukCategory.TRY_CATCH and address > 0:
+                if address + 2 >= count or not self.instructions[address + 1].CATEGORY & self.instructions[address + 2].CATEGORY & DukCategory.JUMP:
+                    continue
+                endTryAddress = self.instructions[address + 1].getDestinationAddress() - 1
+                endAddress = max(endTryAddress, self.instructions[address + 2].getDestinationAddress() - 1)
+                if endTryAddress <= address or endAddress >= count:
+                    continue
+                if self.isSingleEntry(address, endAddress):
+                    headers.append(address - 1)
+        return headers
@@ -1,92 +1,65 @@
+import json
+import math
+import struct
 from duk.constants import DukConstants
-from duk.instructions.lookup import DUK_OP_CLASSES
-from duk.instructions.instructions import DukInstruction
+from duk.instructions.block import DukInstructionBlock
+from duk.pool import DukConstantPool
+from duk.lines import DukLineIndex
+from duk.cfg import DukCFG
 from duk.groups.groups import DukGroup
+from util.filereader import FileReader
 from util.logger import Logger, Verbosity
+from util.profiler import Profiler
+from duk.groups.stats import DukRuleStats
 
 class DukFunction:
     COUNT = 0
+    HEADER = struct.Struct('>IIIHHIII')
 
     @staticmethod
     def disassemble(reader, parentCount = 0):
         prefix = (parentCount * 4) * ' '
-        Logger.success(Verbosity.DEBUG, f'{prefix}Function')
+        Logger.success(Verbosity.DEBUG, '{}Function', prefix)
         prefix += 4 * ' '
 
-        instructionCount = reader.uint32()
-        Logger.info(Verbosity.DEBUG, f'{prefix}- Instructions: {instructionCount}')
-        constantCount = reader.uint32()
-        Logger.info(Verbosity.DEBUG, f'{prefix}- Constants: {constantCount}')
-        functionCount = reader.uint32()
-        Logger.info(Verbosity.DEBUG, f'{prefix}- Sub Functions: {functionCount}')
-        numberOfRegs = reader.uint16()
-        Logger.info(Verbosity.DEBUG, f'{prefix}- Registers: {numberOfRegs}')
-        numberOfArgs = reader.uint16()
-        Logger.info(Verbosity.DEBUG, f'{prefix}- Arguments: {numberOfArgs}')
-        startLine = reader.uint32()
-        Logger.info(Verbosity.DEBUG, f'{prefix}- Start Line: {startLine}')
-        endLine = reader.uint32()
-        Logger.info(Verbosity.DEBUG, f'{prefix}- End Line: {endLine}')
-        flags = reader.uint32()
-        Logger.info(Verbosity.DEBUG, f'{prefix}- Flags: {flags:#010x}')
-
-        # Parse instructions
-        instructions = []
-        if instructionCount > 0:
-            Logger.info(Verbosity.DEBUG, f'{prefix}Instructions')
-        for i in range(instructionCount):
-            encoded = reader.uint32()
-            opcode = encoded & 0xff
-            Logger.info(Verbosity.DEBUG, f'{prefix}    - Instruction #{i:04}: {encoded:#010x} ({opcode:03} - {DukConstants.DUK_OP[opcode]})')
-
-            # Append instruction
-            if opcode in DUK_OP_CLASSES:
-                instructions.append(DUK_OP_CLASSES[opcode](i, encoded))
-            else:
-                instructions.append(DukInstruction(i, encoded))
-
-        # Parse constants
-        constants = []
-        if constantCount > 0:
-            Logger.info(Verbosity.DEBUG, f'{prefix}Constants')
-        for i in range(constantCount):
-            Logger.info(Verbosity.DEBUG, f'{prefix}    - Constant #{i:03}')
-            constType = reader.uint8()
-
-            # String Constant
-            if constType == DukConstants.DUK__SER_STRING:
-                Logger.info(Verbosity.DEBUG, f'{prefix}        - Type: {constType} (STRING)')
-                string = reader.string()
-                Logger.info(Verbosity.DEBUG, f'{prefix}        - Value: {string}')
-                constants.append(string)
-                continue
-
-            # Number Constant
-            if constType == DukConstants.DUK__SER_NUMBER:
-                Logger.info(Verbosity.DEBUG, f'{prefix}        - Type: {constType} (NUMBER)')
-                double = reader.double()
-                Logger.info(Verbosity.DEBUG, f'{prefix}        - Value: {double}')
-                constants.append(double)
-                continue
-
-            Logger.info(Verbosity.DEBUG, f'{prefix}        - Type: {constType} (Unknown)')
-            raise Exception(f'Unhandled constant type: {hex(constType)}')
-
-        # Parse inner function
+        # Header (instruction, constant and function counts, regs, args, lines, flags), a truncated header ends the file
+        header = reader.unpack(DukFunction.HEADER)
+        if header == None:
+            Logger.warning(Verbosity.DEBUG, '{}Truncated function header', prefix)
+            return None
+        instructionCount, constantCount, functionCount, numberOfRegs, numberOfArgs, startLine, endLine, flags = header
+        Logger.info(Verbosity.DEBUG, '{}- Instructions: {}', prefix, instructionCount)
+        Logger.info(Verbosity.DEBUG, '{}- Constants: {}', prefix, constantCount)
+        Logger.info(Verbosity.DEBUG, '{}- Sub Functions: {}', prefix, functionCount)
+        Logger.info(Verbosity.DEBUG, '{}- Registers: {}', prefix, numberOfRegs)
+        Logger.info(Verbosity.DEBUG, '{}- Arguments: {}', prefix, numberOfArgs)
+        Logger.info(Verbosity.DEBUG, '{}- Start Line: {}', prefix, startLine)
+        Logger.info(Verbosity.DEBUG, '{}- End Line: {}', prefix, endLine)
+        Logger.info(Verbosity.DEBUG, '{}- Flags: {:#010x}', prefix, flags)
+
+        # Only index instructions and constants, they are parsed once the function is accessed
+        offset = reader.offset
+        reader.slice(instructionCount * 4)
+        DukFunction.skipConstants(reader, constantCount)
+
+        # Index inner function
         functions = []
         if functionCount > 0:
-            Logger.info(Verbosity.DEBUG, f'{prefix}Functions')
+            Logger.info(Verbosity.DEBUG, '{}Functions', prefix)
         for i in range(functionCount):
-            functions.append(DukFunction.disassemble(reader, parentCount + 1))
+            func = DukFunction.disassemble(reader, parentCount + 1)
+            if func == None:
+                return None
+            functions.append(func)
 
         length = reader.uint32()
-        Logger.info(Verbosity.DEBUG, f'{prefix}- Length: {length}')
+        Logger.info(Verbosity.DEBUG, '{}- Length: {}', prefix, length)
         name = reader.string()
-        Logger.info(Verbosity.DEBUG, f'{prefix}- Name: {name}')
+        Logger.info(Verbosity.DEBUG, '{}- Name: {}', prefix, name)
         filename = reader.string()
-        Logger.info(Verbosity.DEBUG, f'{prefix}- Filename: {filename}')
+        Logger.info(Verbosity.DEBUG, '{}- Filename: {}', prefix, filename)
         pc2line = reader.rawString()
-        Logger.info(Verbosity.DEBUG, f'{prefix}- PC2 Line: {pc2line.hex()}')
+        Logger.info(Verbosity.DEBUG, lambda: f'{prefix}- PC2 Line: {pc2line.hex()}')
 
         # Parse Varmap
         varmap = {}
@@ -98,33 +71,91 @@ class DukFunction:
 
             # Heading
             if not foundVarmap:
-                Logger.info(Verbosity.DEBUG, f'{prefix}Varmap')
+                Logger.info(Verbosity.DEBUG, '{}Varmap', prefix)
                 foundVarmap = True
 
             varmapValue = reader.uint32()
             varmap[varmapName] = varmapValue
-            Logger.info(Verbosity.DEBUG, f'{prefix}    {varmapName}: {varmapValue}')
+            Logger.info(Verbosity.DEBUG, '{}    {}: {}', prefix, varmapName, varmapValue)
 
         # Parse Formals
         formals = []
         formalCount = reader.uint32()
         if formalCount != DukConstants.DUK__NO_FORMALS:
-            Logger.info(Verbosity.DEBUG, f'{prefix}Formals: {formalCount}')
+            Logger.info(Verbosity.DEBUG, '{}Formals: {}', prefix, formalCount)
             for i in range(formalCount):
                 formal = reader.string()
-                Logger.info(Verbosity.DEBUG, f'{prefix}    {formal}')
+                Logger.info(Verbosity.DEBUG, '{}    {}', prefix, formal)
                 formals.append(formal)
 
         return DukFunction(instructionCount, constantCount, functionCount,
             numberOfRegs, numberOfArgs, startLine, endLine, flags,
-            instructions, constants, functions, length, name, filename,
-            pc2line, varmap, formals, parentCount
+            None, None, functions, length, name, filename,
+            pc2line, varmap, formals, parentCount, reader.fork(offset)
         )
 
+    @staticmethod
+    def skipConstants(reader, constantCount):
+        for i in range(constantCount):
+            constType = reader.uint8()
+
+            # String Constant
+            if constType == DukConstants.DUK__SER_STRING:
+                reader.rawString()
+                continue
+
+            # Number Constant
+            if constType == DukConstants.DUK__SER_NUMBER:
+                reader.slice(FileReader.DOUBLE.size)
+                continue
+
+            raise Exception(f'Unhandled constant type: {hex(constType)}')
+
+    @staticmethod
+    def disassembleInstructions(reader, instructionCount, prefix = ''):
+        # Parse instructions as a single block, instruction objects are created on demand
+        instructions = DukInstructionBlock(reader.slice(instructionCount * 4))
+        if instructionCount > 0:
+            Logger.info(Verbosity.DEBUG, '{}Instructions', prefix)
+        if Logger.enabled(Verbosity.DEBUG):
+            for i in range(instructionCount):
+                opcode = instructions.opcodes[i]
+                Logger.info(Verbosity.DEBUG, f'{prefix}    - Instruction #{i:04}: {instructions.words[i]:#010x} ({opcode:03} - {DukConstants.DUK_OP[opcode]})')
+        return instructions
+
+    @staticmethod
+    def disassembleConstants(reader, constantCount, prefix = ''):
+        constants = []
+        if constantCount > 0:
+            Logger.info(Verbosity.DEBUG, '{}Constants', prefix)
+        for i in range(constantCount):
+            Logger.info(Verbosity.DEBUG, '{}    - Constant #{:03}', prefix, i)
+            constType = reader.uint8()
+
+            # String Constant
+            if constType == DukConstants.DUK__SER_STRING:
+                Logger.info(Verbosity.DEBUG, '{}        - Type: {} (STRING)', prefix, constType)
+                string = reader.rawString()
+                Logger.info(Verbosity.DEBUG, lambda: f'{prefix}        - Value: {FileReader.escape(string)}')
+                constants.append(string)
+                continue
+
+            # Number Constant
+            if constType == DukConstants.DUK__SER_NUMBER:
+                Logger.info(Verbosity.DEBUG, '{}        - Type: {} (NUMBER)', prefix, constType)
+                double = reader.double()
+                Logger.info(Verbosity.DEBUG, '{}        - Value: {}', prefix, double)
+                constants.append(double)
+                continue
+
+            Logger.info(Verbosity.DEBUG, '{}        - Type: {} (Unknown)', prefix, constType)
+            raise Exception(f'Unhandled constant type: {hex(constType)}')
+        return DukConstantPool(constants)
+
     def __init__(self, instructionCount, constantCount, functionCount,
             numberOfRegs, numberOfArgs, startLine, endLine, flags,
             instructions, constants, functions, length, name, filename,
-            pc2line, varmap, formals, parentCount = 0
+            pc2line, varmap, formals, parentCount = 0, reader = None
         ):
         self.index = DukFunction.COUNT
         DukFunction.COUNT += 1
@@ -146,7 +177,74 @@ class DukFunction:
         self.varmap = varmap
         self.formals = formals
         self.parentCount = parentCount
-        self.group = DukGroup(0 if len(self.instructions) == 0 else self.instructions[0].address, self.instructions)
+        self.reader = reader
+        self.group = None
+        self.isDecompiled = False
+        self.text = None
+        self.lineIndex = None
+
+    def materialize(self):
+        # Parse the indexed instructions and constants the first time the function is accessed
+        if self.instructions == None:
+            prefix = (self.parentCount * 4) * ' '
+            Logger.success(Verbosity.DEBUG, '{}Function {}', prefix, self.getName())
+            prefix += 4 * ' '
+
+            with Profiler.phase('disassemble'):
+                self.instructions = DukFunction.disassembleInstructions(self.reader, self.instructionCount, prefix)
+                self.constants = DukFunction.disassembleConstants(self.reader, self.constantCount, prefix)
+            self.reader = None
+
+    def getInstructions(self):
+        self.materialize()
+        return self.instructions
+
+    def getConstants(self):
+        self.materialize()
+        return self.constants
+
+    def getFunctions(self):
+        # This function followed by all of its inner functions
+        functions = [self]
+        for func in self.functions:
+            functions += func.getFunctions()
+        return functions
+
+    def findFunctions(self, selectors):
+        # Match each selector against a function index or name
+        functions = []
+        for selector in selectors:
+            found = False
+            for func in self.getFunctions():
+                if selector.isdigit():
+                    if func.index != int(selector):
+                        continue
+                elif selector != func.name and selector != func.getName():
+                    continue
+
+                found = True
+                if func not in functions:
+                    functions.append(func)
+
+            if not found:
+                Logger.warning(Verbosity.DEBUG, 'No function matching {}', selector)
+        return functions
+
+    def getLineIndex(self):
+        # The pc2line data is only decoded once a line is looked up
+        if self.lineIndex == None:
+            self.lineIndex = DukLineIndex(self.pc2line)
+        return self.lineIndex
+
+    def getLine(self, address):
+        return self.getLineIndex().getLine(address)
+
+    def getGroup(self):
+        # Instructions are only materialized into a group when grouping or rendering needs them
+        if self.group == None:
+            instructions = list(self.getInstructions())
+            self.group = DukGroup(0 if len(instructions) == 0 else instructions[0].address, instructions)
+        return self.group
 
     def isAnonymous(self):
         return self.name == ''
@@ -163,74 +261,143 @@ class DukFunction:
     def getDefinition(self):
         return f'function {self.getName()}({", ".join(self.getArgs())})'
 
-    def decompile(self, disableGrouping = {}):
+    def decompile(self, disableGrouping = {}, worklist = True, structuring = False, entryChecks = False):
+        # Functions can be selected more than once or rendered by a worker, only group them once
+        if self.isDecompiled or self.text != None:
+            return self.group
+        self.isDecompiled = True
+
         # Group instructions to high-level instructions
-        self.group.decompile(self.constants, self.functions, self.varmap, self.formals, disableGrouping, '    ')
+        DukRuleStats.startFunction(self)
+        self.getGroup().worklist = worklist
+        self.getGroup().jumps = self.getInstructions().getJumpIndex() if entryChecks else None
+        with Profiler.function(self):
+            if not structuring:
+                self.getGroup().decompile(self.getConstants(), self.functions, self.varmap, self.formals, disableGrouping, '    ')
+            else:
+                self.getGroup().structure(DukCFG(self.getInstructions()), self.getConstants(), self.functions, self.varmap, self.formals, disableGrouping, '    ')
+        DukRuleStats.stopFunction()
 
         for func in self.functions:
-            func.decompile(disableGrouping)
-
-        return self.group
+            func.decompile(disableGrouping, worklist, structuring, entryChecks)
 
-    def toAsm(self):
-        indentation = '' if self.parentCount == 0 else ((self.parentCount - 1) * 4) * ' '
+        return self.getGroup()
 
-        # Output
-        text = ''
+    def writeOutputs(self, writeAsm = None, writeString = None, writeDump = None, group = True, lines = False):
+        # Write the ASM listing, the decompiled output and the JSON dump in a single pass over the functions and
+        # instructions, sinks that are None are skipped. Lines annotates statements with their source line
+        indentation = '' if self.parentCount == 0 else (self.parentCount - 1) * '    '
+        subIndentation =  '' if self.parentCount == 0 else self.parentCount * '    '
+        instructionIndentation = indentation + ('' if self.parentCount == 0 else '    ')
 
         # Filename
         if self.parentCount == 0:
-            text += f'; File: {self.filename}\n\n'
+            if writeAsm != None:
+                writeAsm(f'; File: {self.filename}\n\n')
+            if writeString != None:
+                writeString(f'// {self.filename}\n\n')
 
         # Function definition
         if self.parentCount > 0:
-            text += f'{indentation}{self.getName()}: ; Function({", ".join(self.getArgs())})\n'
-
-        # Sub functions
-        for func in self.functions:
-            text += func.toAsm()
-
-        # Instructions
-        for ins in self.instructions:
-            text += f'{indentation}{("" if self.parentCount == 0 else "    ")}{ins.address:04x}: {ins.toAsm(self.constants, self.functions, self.varmap, self.formals)}\n'
-
-        text += '\n'
-        return text
+            if writeAsm != None:
+                writeAsm(f'{indentation}{self.getName()}: ; Function({", ".join(self.getArgs())})\n')
+            if writeString != None:
+                writeString(f'{indentation}{self.getDefinition()}\n')
+                writeString(f'{indentation}{{\n')
+        if writeDump != None:
+            writeDump(self.getDumpHeader())
+
+        # Sub functions, inner functions are always written from their groups and the ones rendered by a worker
+        # are stitched back in as text
+        for i in range(0, len(self.functions)):
+            func = self.functions[i]
+            if writeDump != None and i > 0:
+                writeDump(', ')
+            if func.text == None:
+                func.writeOutputs(writeAsm, writeString, writeDump, True, lines)
+                continue
+            if writeAsm != None or writeDump != None:
+                func.writeOutputs(writeAsm, None, writeDump, True, lines)
+            if writeString != None:
+                writeString(func.text)
+
+        # Instructions, the address and ASM text are formatted once for every sink using them
+        constants = self.getConstants()
+        if writeDump != None:
+            writeDump('], "instructions": [')
+        if writeAsm != None or writeDump != None or (writeString != None and not group):
+            for i, ins in enumerate(self.getInstructions()):
+                address = f'{ins.address:04x}'
+                line = self.getLine(ins.address) if lines else None
+                annotation = '' if line == None else f' // line {line}'
+                if writeAsm != None or writeDump != None:
+                    asm = ins.toAsm(constants, self.functions, self.varmap, self.formals)
+                if writeAsm != None:
+                    writeAsm(f'{instructionIndentation}{address}: {asm}{annotation}\n')
+                if writeDump != None:
+                    writeDump(('' if i == 0 else ', ') + json.dumps({
+                        'address': ins.address, 'opcode': ins.opcode, 'name': ins.name, 'a': ins.a, 'b': ins.b, 'c': ins.c, 'asm': asm
+                    }, allow_nan=False))
+                if writeString != None and not group:
+                    writeString(f'{instructionIndentation}/* {address} */')
+                    writeString(f' {ins.toString(constants, self.functions, self.varmap, self.formals)}{annotation}\n')
+        if writeAsm != None:
+            writeAsm('\n')
+        if writeDump != None:
+            writeDump(']}')
+
+        # Groups
+        if writeString != None and group:
+            prefixAddresses = self.getGroup().hasRawAddressInstruction()
+            lineIndex = self.getLineIndex() if lines else None
+            self.getGroup().writeItems(writeString, constants, self.functions, self.varmap, self.formals, subIndentation, prefixAddresses, lineIndex)
 
-    def toString(self, group = True):
-        indentation = '' if self.parentCount == 0 else (self.parentCount - 1) * '    '
-        subIndentation =  '' if self.parentCount == 0 else self.parentCount * '    '
+        # Function end
+        if writeString != None and self.parentCount > 0:
+            writeString(f'{indentation}}}\n\n')
+
+    def getDumpHeader(self):
+        # Function fields of the JSON dump up to the inner functions
+        header = json.dumps({
+            'index': self.index,
+            'name': self.getName(),
+            'filename': self.filename,
+            'registers': self.numberOfRegs,
+            'arguments': self.numberOfArgs,
+            'startLine': self.startLine,
+            'endLine': self.endLine,
+            'flags': self.flags,
+            'varmap': self.varmap,
+            'formals': self.formals,
+            'constants': [DukFunction.getDumpConstant(constant) for constant in self.getConstants()],
+        }, allow_nan=False)
+        return header[:-1] + ', "functions": ['
 
-        # Output function
-        text = ''
+    @staticmethod
+    def getDumpConstant(constant):
+        # JSON has no NaN or infinities, non-finite doubles are written as their JS name
+        if isinstance(constant, float) and not math.isfinite(constant):
+            return 'NaN' if math.isnan(constant) else ('Infinity' if constant > 0 else '-Infinity')
+        return constant
 
-        # Filename
-        if self.parentCount == 0:
-            text += f'// {self.filename}\n\n'
+    def writeAsm(self, write, lines = False):
+        self.writeOutputs(write, None, None, True, lines)
 
-        # Function definition
-        if self.parentCount > 0:
-            text += f'{indentation}{self.getDefinition()}\n'
-            text += f'{indentation}{{\n'
+    def toAsm(self, lines = False):
+        chunks = []
+        self.writeAsm(chunks.append, lines)
+        return ''.join(chunks)
 
-        # Sub functions
-        for func in self.functions:
-            text += str(func)
-
-        if group:
-            # Groups
-            prefixAddresses = self.group.hasRawAddressInstruction()
-            text += self.group.toString(self.constants, self.functions, self.varmap, self.formals, subIndentation, prefixAddresses)
-        else:
-            # Instructions
-            for ins in self.instructions:
-                text += f'{indentation}{("" if self.parentCount == 0 else "    ")}/* {ins.address:04x} */'
-                text += f' {ins.toString(self.constants, self.functions, self.varmap, self.formals)}\n'
+    def writeString(self, write, group = True, lines = False):
+        self.writeOutputs(None, write, None, group, lines)
 
-        # Function end
-        if self.parentCount > 0:
-            text += f'{indentation}}}\n\n'
-        return text
+    def toString(self, group = True, lines = False):
+        chunks = []
+        self.writeString(chunks.append, group, lines)
+        return ''.join(chunks)
 
     def __str__(self):
+        # Inner functions rendered by a worker are stitched back in as text
+        if self.text != None:
+            return self.text
         return self.toString()
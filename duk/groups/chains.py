@@ -0,0 +1,48 @@
+class DukChainNode:
+    __slots__ = ('accept', 'edges')
+
+    def __init__(self):
+        # Chains ending at this node and (category mask, node) edges to the next item
+        self.accept = 0
+        self.edges = []
+
+    def getChild(self, mask):
+        for edgeMask, node in self.edges:
+            if edgeMask == mask:
+                return node
+
+        node = DukChainNode()
+        self.edges.append((mask, node))
+        return node
+
+class DukChains:
+    __slots__ = ('root', 'depth')
+
+    # Chains of category masks compiled into a trie, chains sharing a prefix are matched together
+    def __init__(self, chains):
+        self.root = DukChainNode()
+        self.depth = 0
+        for chain, masks in chains:
+            self.depth = max(self.depth, len(masks))
+            node = self.root
+            for mask in masks:
+                node = node.getChild(mask)
+            node.accept |= chain
+
+    def match(self, items, index):
+        # Every chain matching the items starting at index, masks of different edges can overlap so all matching
+        # edges are followed
+        matched = 0
+        nodes = [self.root]
+        while len(nodes) > 0 and index < len(items):
+            category = items[index].CATEGORY
+            nextNodes = []
+            for node in nodes:
+                for mask, child in node.edges:
+                    if category & mask:
+                        matched |= child.accept
+                        if len(child.edges) > 0:
+                            nextNodes.append(child)
+            nodes = nextNodes
+            index += 1
+        return matched
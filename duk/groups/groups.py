@@ -1,4 +1,9 @@
+from bisect import bisect_right
+from duk.category import DukCategory
 from duk.item import DukItem
+from duk.groups.chains import DukChains
+from duk.groups.items import DukItems
+from duk.groups.stats import DukRuleStats
 from duk.instructions.instructions import *
 from duk.instructions.comparison import *
 from duk.instructions.ifs import *
@@ -8,27 +13,118 @@ from duk.instructions.operator import *
 from util.logger import Logger, Verbosity
 
 class DukGroup(DukItem):
+    __slots__ = ('items', 'hasChanged', 'isIndexed', 'starts', 'reach', 'dirty', 'chains', 'worklist', 'headers', 'jumps', 'probe',
+                 'watched', 'buckets', 'parent', 'renders')
+    CATEGORY = DukCategory.GROUP
+
+    # Watched addresses are bucketed in runs of 64
+    BUCKET_BITS = 6
+
+    # Grouping rules in the order they are tried on an item, with the categories that can start a match and the
+    # grouping options disabling them
+    RULES = (
+        (DukCategory.IF_TRUE_R | DukCategory.IF_FALSE_R, ('jump', 'if_else'), 'decompileIfElse'),
+        (DukCategory.LD_CONST, ('jump', 'try_catch_finally'), 'decompileTryCatch'),
+        (DukCategory.LABEL, ('jump', 'for'), 'decompileFor'),
+        (DukCategory.LABEL, ('jump', 'while'), 'decompileWhile'),
+        (DukCategory.COMPARISON, ('jump', 'if_condition'), 'decompileIfCondition'),
+        (DukCategory.CALL, ('call',), 'decompileCall'),
+        (DukCategory.GET_VAR, ('call',), 'decompileCallVar'),
+        (DukCategory.GET_VAR | DukCategory.LD_REG, ('get_prop',), 'decompileGetProp'),
+        (DukCategory.NEW_OBJ, ('init_object',), 'decompileInitObject'),
+        (DukCategory.NEW_ARR, ('init_array',), 'decompileInitArray'),
+        (DukCategory.OPERATOR | DukCategory.GROUP_JOIN_OPERATOR, ('join_operator',), 'decompileJoinOperator'),
+        (DukCategory.RET_REG | DukCategory.RET_CONST, ('double_return',), 'decompileDoubleReturn'),
+    )
+
+    # Control flow rules, the structuring pass only runs them at the headers of the graph
+    STRUCTURE_RULES = ('decompileIfElse', 'decompileTryCatch', 'decompileFor', 'decompileWhile')
+
+    # Mask of the control flow rules in the rule order, computed the first time it is needed
+    STRUCTURE_MASK = None
+
+    # Placeholder indentation of the kept renders, replaced by the indentation a group is rendered at
+    INDENTATION = '\x00'
+
+    # Item chains the rules start with, compiled into a single matcher
+    CHAIN_IF_ELSE = 1 << 0
+    CHAIN_FOR = 1 << 1
+    CHAIN_FOR_EVER = 1 << 2
+    CHAIN_FOR_COMPARISON = 1 << 3
+    CHAIN_WHILE = 1 << 4
+    CHAIN_TRY_CATCH = 1 << 5
+    CHAIN_IF_CONDITION = 1 << 6
+    CHAIN_CALL_VAR = 1 << 7
+    CHAIN_GET_PROP = 1 << 8
+    CHAIN_JOIN_OPERATOR = 1 << 9
+    CHAIN_DOUBLE_RETURN = 1 << 10
+    CHAINS = DukChains([
+        (CHAIN_IF_ELSE, [DukCategory.IF_TRUE_R | DukCategory.IF_FALSE_R, DukCategory.JUMP]),
+        (CHAIN_FOR, [DukCategory.LABEL, DukCategory.JUMP, DukCategory.JUMP]),
+        (CHAIN_FOR_EVER, [DukCategory.LABEL, DukCategory.JUMP, DukCategory.JUMP, DukCategory.JUMP]),
+        (CHAIN_FOR_COMPARISON, [DukCategory.LABEL, DukCategory.JUMP, DukCategory.JUMP, DukCategory.LD_INT, DukCategory.COMPARISON, DukCategory.IF_R, DukCategory.JUMP, DukCategory.JUMP, DukCategory.INC_DEC, DukCategory.JUMP]),
+        (CHAIN_WHILE, [DukCategory.LABEL, DukCategory.JUMP, DukCategory.JUMP, DukCategory.COMPARISON, DukCategory.IF_R, DukCategory.JUMP]),
+        (CHAIN_TRY_CATCH, [DukCategory.LD_CONST, DukCategory.TRY_CATCH, DukCategory.JUMP, DukCategory.JUMP]),
+        (CHAIN_IF_CONDITION, [DukCategory.COMPARISON, DukCategory.GROUP_IF_R]),
+        (CHAIN_CALL_VAR, [DukCategory.GET_VAR, DukCategory.LD_REG, DukCategory.GROUP_CALL]),
+        (CHAIN_GET_PROP, [DukCategory.GET_VAR | DukCategory.LD_REG, DukCategory.GET_PROP]),
+        (CHAIN_JOIN_OPERATOR, [DukCategory.OPERATOR | DukCategory.GROUP_JOIN_OPERATOR, DukCategory.OPERATOR]),
+        (CHAIN_DOUBLE_RETURN, [DukCategory.RET_REG | DukCategory.RET_CONST, DukCategory.RET_UNDEF]),
+    ])
+
+    # Rules triggered by an item category, keyed on the category and the enabled rules
+    DISPATCH = {}
+
     @staticmethod
-    def isChain(instructions, chain):
-        if len(instructions) < len(chain):
-            return False
+    def getEnabledRules(disableGrouping):
+        enabled = 0
+        for i in range(0, len(DukGroup.RULES)):
+            trigger, keys, name = DukGroup.RULES[i]
+            if not any(disableGrouping[key] for key in keys):
+                enabled |= 1 << i
+        return enabled
 
-        for i in range(0, len(chain)):
-            if not isinstance(instructions[i], chain[i]):
-                return False
-        return True
+    @staticmethod
+    def getStructureRules():
+        if DukGroup.STRUCTURE_MASK == None:
+            rules = 0
+            for i in range(0, len(DukGroup.RULES)):
+                if DukGroup.RULES[i][2] in DukGroup.STRUCTURE_RULES:
+                    rules |= 1 << i
+            DukGroup.STRUCTURE_MASK = rules
+        return DukGroup.STRUCTURE_MASK
 
     @staticmethod
-    def isAny(instruction, classes):
-        for i in range(0, len(classes)):
-            if isinstance(instruction, classes[i]):
-                return True
-        return False
+    def getRules(category, enabled):
+        rules = DukGroup.DISPATCH.get((category, enabled))
+        if rules == None:
+            rules = []
+            for i in range(0, len(DukGroup.RULES)):
+                trigger, keys, name = DukGroup.RULES[i]
+                if enabled & (1 << i) and category & trigger:
+                    rules.append((i, getattr(DukGroup, name)))
+            DukGroup.DISPATCH[(category, enabled)] = rules
+        return rules
 
     def __init__(self, address, items):
         super().__init__(address)
-        self.items = items
+        self.items = DukItems(items)
         self.hasChanged = False
+        self.isIndexed = False
+        self.starts = None
+        self.reach = None
+        self.dirty = None
+        self.chains = None
+        self.worklist = True
+        self.headers = None
+        self.jumps = None
+        self.probe = None
+        self.watched = None
+        self.buckets = None
+        self.parent = None
+        self.renders = None
+        for item in self.items:
+            self.adopt(item)
 
     def getInstructionCount(self):
         count = 0
@@ -36,10 +132,50 @@ class DukGroup(DukItem):
             count += item.getInstructionCount()
         return count
 
+    def indexAddresses(self):
+        # Start address and furthest end address so far of every item, only valid while the items are sorted
+        # and non-empty items do not overlap, otherwise lookups fall back to a linear scan
+        self.isIndexed = True
+        self.starts = []
+        self.reach = []
+        reach = -1
+        for item in self.items:
+            start = item.getStartAddress()
+            end = item.getEndAddress()
+            if (len(self.starts) > 0 and start < self.starts[-1]) or (end >= start and start <= reach):
+                self.starts = None
+                self.reach = None
+                return
+            self.starts.append(start)
+            reach = max(reach, end)
+            self.reach.append(reach)
+
+    def invalidateAddresses(self):
+        self.isIndexed = False
+        self.starts = None
+        self.reach = None
+
     def getIndexFromAddress(self, address):
-        for i in range(0, len(self.items)):
-            if self.items[i].containsAddress(address):
-                return i
+        if self.probe != None:
+            self.extendProbe(address, address)
+        if not self.isIndexed:
+            self.indexAddresses()
+
+        # Linear scan
+        if self.starts == None:
+            for i in range(0, len(self.items)):
+                if self.items[i].containsAddress(address):
+                    return i
+            return None
+
+        # Last item starting at or before the address, empty items never contain an address
+        i = bisect_right(self.starts, address) - 1
+        while i >= 0:
+            item = self.items[i]
+            end = item.getEndAddress()
+            if end >= item.getStartAddress():
+                return i if address <= end else None
+            i -= 1
         return None
 
     def getItemByAddress(self, address, offset = 0):
@@ -64,32 +200,129 @@ class DukGroup(DukItem):
         if index == None:
             return None
 
-        for item in self.items[index:]:
-            if isinstance(item, cls):
-                return item.getStartAddress()
+        for i in range(index, len(self.items)):
+            if isinstance(self.items[i], cls):
+                self.probeItems(index, i)
+                return self.items[i].getStartAddress()
 
+        self.probeItems(index, len(self.items) - 1)
         return None
 
     def hasRawAddressInstruction(self):
-        rawAddressInstructions = [
-            DukInstructionJump,
-            DukInstructionIf,
-            DukInstructionLabel,
-            DukInstructionNextEnum,
-        ]
+        rawAddressInstructions = DukCategory.JUMP | DukCategory.IF | DukCategory.LABEL | DukCategory.NEXT_ENUM
 
         for item in self.items:
-            if isinstance(item, DukGroup):
+            if item.CATEGORY & DukCategory.GROUP:
                 if item.hasRawAddressInstruction():
                     return True
-            elif isinstance(item, DukInstruction):
-                if DukGroup.isAny(item, rawAddressInstructions):
-                    return True
+            elif item.CATEGORY & rawAddressInstructions:
+                return True
         return False
 
+    def markDirty(self, index = None):
+        if self.dirty == None:
+            return
+
+        # Local rules read at most two items ahead, so a rewrite can only change the result of the two items before it
+        if index == None:
+            self.dirty.update(self.items)
+            return
+        self.dirty.update(self.items[max(0, index - 2):index + 1])
+
+    def isStickyItem(self, index):
+        # Rules looking up items far away from their index, their reads are watched for rewrites
+        category = self.items[index].CATEGORY
+        if category & (DukCategory.IF_R | DukCategory.LABEL | DukCategory.CALL | DukCategory.NEW_OBJ | DukCategory.NEW_ARR):
+            return True
+        return category & DukCategory.LD_CONST and index + 1 < len(self.items) and self.items[index + 1].CATEGORY & DukCategory.TRY_CATCH
+
+    def extendProbe(self, startAddress, endAddress):
+        if startAddress < self.probe[0]:
+            self.probe[0] = startAddress
+        if endAddress > self.probe[1]:
+            self.probe[1] = endAddress
+
+    def probeItems(self, startIndex, endIndex):
+        # Addresses of the items read by the rule grouping the current item
+        if self.probe == None or len(self.items) == 0:
+            return
+        startIndex = min(max(startIndex, 0), len(self.items) - 1)
+        endIndex = min(max(endIndex, 0), len(self.items) - 1)
+        start = self.items[startIndex]
+        end = self.items[endIndex]
+        self.extendProbe(min(start.getStartAddress(), start.getEndAddress()), max(end.getStartAddress(), end.getEndAddress()))
+
+    def watch(self, item, startAddress, endAddress):
+        # Buckets of addresses point to the items that read them
+        self.watched[item] = (startAddress, endAddress)
+        for bucket in range(startAddress >> DukGroup.BUCKET_BITS, (endAddress >> DukGroup.BUCKET_BITS) + 1):
+            if bucket in self.buckets:
+                self.buckets[bucket].add(item)
+            else:
+                self.buckets[bucket] = {item}
+
+    def touch(self, startAddress, endAddress):
+        # Watched items having read any of the rewritten addresses are grouped again
+        if self.watched == None:
+            return
+        for bucket in range(startAddress >> DukGroup.BUCKET_BITS, (endAddress >> DukGroup.BUCKET_BITS) + 1):
+            for item in self.buckets.get(bucket, ()):
+                watched = self.watched.get(item)
+                if watched != None and watched[0] <= endAddress and startAddress <= watched[1]:
+                    self.dirty.add(item)
+
+    def getChains(self, index):
+        # Chains matching at an index, shared by the rules tried on an item until the items change
+        if self.chains == None or self.chains[0] != index:
+            self.chains = (index, DukGroup.CHAINS.match(self.items, index))
+        self.probeItems(index, index + DukGroup.CHAINS.depth)
+        return self.chains[1]
+
+    def isEntered(self, startAddress, endAddress):
+        # Addresses are never renumbered by grouping, so the jump index of the function stays valid for every group,
+        # without an index entries are not checked
+        return self.jumps != None and self.jumps.isEntered(startAddress, endAddress)
+
+    def adopt(self, item):
+        # Groups know the group containing them, so a change clears the renders of every group around it
+        if isinstance(item, DukGroup):
+            item.parent = self
+
+    def invalidateRenders(self):
+        group = self
+        while group != None:
+            group.renders = None
+            group = group.parent
+
     def replaceItems(self, group, startIndex, endIndex):
-        self.items = self.items[:startIndex] + [group] + self.items[endIndex + 1:]
+        if 0 <= startIndex <= endIndex + 1 <= len(self.items):
+            self.touch(min(group.getStartAddress(), self.items[startIndex].getStartAddress()),
+                       max(group.getEndAddress(), self.items[endIndex].getEndAddress()))
+            self.items.splice(startIndex, endIndex + 1, [group])
+            self.markDirty(startIndex)
+        else:
+            self.items = DukItems(list(self.items[:startIndex]) + [group] + list(self.items[endIndex + 1:]))
+            self.markDirty()
         self.hasChanged = True
+        self.chains = None
+        self.adopt(group)
+        self.invalidateRenders()
+        DukRuleStats.REWRITES += 1
+
+        # Keep the address index in sync, rebuilding it when the group does not fit between its neighbours
+        if self.starts == None or startIndex < 0 or endIndex < startIndex or endIndex >= len(self.starts):
+            self.invalidateAddresses()
+        else:
+            start = group.getStartAddress()
+            end = group.getEndAddress()
+            previousReach = -1 if startIndex == 0 else self.reach[startIndex - 1]
+            reach = max(previousReach, end)
+            if (start < self.starts[startIndex] or reach > self.reach[endIndex] or (end >= start and start <= previousReach) or
+                (endIndex + 1 < len(self.starts) and start > self.starts[endIndex + 1])):
+                self.invalidateAddresses()
+            else:
+                self.starts[startIndex:endIndex + 1] = [start]
+                self.reach[startIndex:endIndex + 1] = [reach]
         return group
 
     def replaceItemsByAddress(self, group, startAddress, endAddress, startOffset = 0, endOffset = 0):
@@ -103,82 +336,132 @@ class DukGroup(DukItem):
     def removeItemsByAddress(self, address, count):
         startIndex = self.getIndexFromAddress(address)
         endIndex = self.getIndexFromAddress(address + count)
-        self.items = self.items[:startIndex] + self.items[endIndex:]
+        if startIndex != None and endIndex != None and 0 <= startIndex <= endIndex <= len(self.items):
+            self.touch(address, address + count)
+            self.items.splice(startIndex, endIndex, [])
+            self.markDirty(startIndex)
+        else:
+            self.items = DukItems(list(self.items[:startIndex]) + list(self.items[endIndex:]))
+            self.markDirty()
         self.hasChanged = True
+        self.chains = None
+        self.invalidateRenders()
+        DukRuleStats.REWRITES += 1
+        if self.starts == None or startIndex == None or endIndex == None:
+            self.invalidateAddresses()
+        else:
+            del self.starts[startIndex:endIndex]
+            del self.reach[startIndex:endIndex]
 
     def decompile(self, constants, functions, varmap, formals, disableGrouping = {}, indentation = ''):
 
-        # Dump group items
-        Logger.info(Verbosity.DEBUG, f'{indentation}{self.__class__.__name__}: {self.getStartAddress():04x}-{self.getEndAddress():04x}')
-        Logger.info(Verbosity.DEBUG, f'{indentation}Items: ')
-        for item in self.items:
-            Logger.info(Verbosity.DEBUG, f'{indentation}    {item.getStartAddress():04x}: {item.toString(constants, functions, varmap, formals)}')
-        Logger.bar(Verbosity.DEBUG)
+        # Dump group items, rendering every item is only worth it when the dump is written
+        if Logger.enabled(Verbosity.DEBUG):
+            Logger.info(Verbosity.DEBUG, f'{indentation}{self.__class__.__name__}: {self.getStartAddress():04x}-{self.getEndAddress():04x}')
+            Logger.info(Verbosity.DEBUG, f'{indentation}Items: ')
+            for item in self.items:
+                Logger.info(Verbosity.DEBUG, f'{indentation}    {item.getStartAddress():04x}: {item.toString(constants, functions, varmap, formals)}')
+            Logger.bar(Verbosity.DEBUG)
 
         # Keep grouping until no changes occur
         self.hasChanged = True
+        enabled = DukGroup.getEnabledRules(disableGrouping)
+        measured = DukRuleStats.CURRENT != None
+        if measured:
+            DukRuleStats.enterGroup()
+        passes = 0
+        if not self.worklist:
+            while self.hasChanged:
+                self.hasChanged = False
+                passes += 1
+
+                # Group each item
+                i = 0
+                while i < len(self.items):
+                    self.decompileItem(i, enabled, constants, functions, varmap, formals, disableGrouping, indentation)
+                    i += 1
+            if measured:
+                DukRuleStats.exitGroup(passes)
+            return
+
+        # Only group items near a previous rewrite or having read a rewritten address again, passes are kept so the
+        # result matches grouping every item. Items shifted behind the current index by a rewrite stay dirty until
+        # the next pass
+        self.dirty = set(self.items)
+        self.watched = {}
+        self.buckets = {}
         while self.hasChanged:
             self.hasChanged = False
+            passes += 1
 
-            # Group each item
+            # Group each dirty item
             i = 0
             while i < len(self.items):
-
-                # Jumps
-                if not disableGrouping['jump']:
-                    self.decompileJumps(i, constants, functions, varmap, formals, disableGrouping, indentation)
-
-                # Call
-                if not disableGrouping['call']:
-                    self.decompileCall(i, constants, functions, varmap, formals, disableGrouping, indentation)
-                    self.decompileCallVar(i, constants, functions, varmap, formals, disableGrouping, indentation)
-
-                # Get prop
-                if not disableGrouping['get_prop']:
-                    self.decompileGetProp(i, constants, functions, varmap, formals, disableGrouping, indentation)
-
-                # Put object
-                if not disableGrouping['init_object']:
-                    self.decompileInitObject(i, constants, functions, varmap, formals, disableGrouping, indentation)
-
-                # Put array
-                if not disableGrouping['init_array']:
-                    self.decompileInitArray(i, constants, functions, varmap, formals, disableGrouping, indentation)
-
-                # Join operators
-                if not disableGrouping['join_operator']:
-                    self.decompileJoinOperator(i, constants, functions, varmap, formals, disableGrouping, indentation)
-
-                # return r1; return;
-                if not disableGrouping['double_return']:
-                    self.decompileDoubleReturn(i, constants, functions, varmap, formals, disableGrouping, indentation)
-
+                item = self.items[i]
+                if item in self.dirty:
+                    self.dirty.discard(item)
+                    self.decompileWatched(i, enabled, constants, functions, varmap, formals, disableGrouping, indentation)
                 i += 1
+        self.dirty = None
+        self.watched = None
+        self.buckets = None
+        if measured:
+            DukRuleStats.exitGroup(passes)
+
+    def decompileWatched(self, i, enabled, constants, functions, varmap, formals, disableGrouping = {}, indentation = ''):
+        # Record the addresses read by the rules of the items reading further than their neighbours, they are
+        # watched when left in place
+        item = self.items[i]
+        if not self.isStickyItem(i):
+            self.decompileItem(i, enabled, constants, functions, varmap, formals, disableGrouping, indentation)
+            return
 
-    def decompileJumps(self, index, constants, functions, varmap, formals, disableGrouping = {}, indentation = ''):
-        # if / else
-        if not disableGrouping['if_else']:
-            self.decompileIfElse(index, constants, functions, varmap, formals, disableGrouping, indentation)
-
-        # try / catch / finally
-        if not disableGrouping['try_catch_finally']:
-            self.decompileTryCatch(index, constants, functions, varmap, formals, disableGrouping, indentation)
-
-        # for
-        if not disableGrouping['for']:
-            self.decompileFor(index, constants, functions, varmap, formals, disableGrouping, indentation)
-
-        # while
-        if not disableGrouping['while']:
-            self.decompileWhile(index, constants, functions, varmap, formals, disableGrouping, indentation)
-
-        # r3 = r9 == "all" ; if (r3 == true)
-        if not disableGrouping['if_condition']:
-            self.decompileIfCondition(index, constants, functions, varmap, formals, disableGrouping, indentation)
+        self.probe = [item.getStartAddress(), item.getStartAddress()]
+        try:
+            self.decompileItem(i, enabled, constants, functions, varmap, formals, disableGrouping, indentation)
+        finally:
+            probe = self.probe
+            self.probe = None
+        if i < len(self.items) and self.items[i] == item:
+            self.watch(item, probe[0], probe[1])
+
+    def structure(self, cfg, constants, functions, varmap, formals, disableGrouping = {}, indentation = ''):
+        # Group with the control flow rules only tried at the headers of the graph, which are only entered through
+        # their first instruction, every other item skips them without probing its neighbours
+        self.headers = set(cfg.getHeaders())
+        self.decompile(constants, functions, varmap, formals, disableGrouping, indentation)
+
+    def decompileGroup(self, group, constants, functions, varmap, formals, disableGrouping = {}, indentation = ''):
+        # Groups created by a rule are grouped with the options of their parent
+        group.worklist = self.worklist
+        group.headers = self.headers
+        group.jumps = self.jumps
+        group.decompile(constants, functions, varmap, formals, disableGrouping, indentation)
+
+    def decompileItem(self, i, enabled, constants, functions, varmap, formals, disableGrouping = {}, indentation = ''):
+        # Try the rules triggered by the item in order, dispatching again on the item replacing it
+        position = 0
+        while i < len(self.items):
+            item = self.items[i]
+            rules = enabled
+            if self.headers != None and item.getStartAddress() not in self.headers:
+                rules &= ~DukGroup.getStructureRules()
+            for rulePosition, rule in DukGroup.getRules(item.CATEGORY, rules):
+                if rulePosition < position:
+                    continue
+                position = rulePosition + 1
+
+                if DukRuleStats.CURRENT == None:
+                    rule(self, i, constants, functions, varmap, formals, disableGrouping, indentation)
+                else:
+                    DukRuleStats.measure(rule, self, i, constants, functions, varmap, formals, disableGrouping, indentation)
+                if i >= len(self.items) or self.items[i] != item:
+                    break
+            else:
+                return
 
     def decompileIfElse(self, index, constants, functions, varmap, formals, disableGrouping = {}, indentation = ''):
-        if (not DukGroup.isChain(self.items[index:], [DukInstructionIfTrueR, DukInstructionJump]) and
-            not DukGroup.isChain(self.items[index:], [DukInstructionIfFalseR, DukInstructionJump])):
+        if not self.getChains(index) & DukGroup.CHAIN_IF_ELSE:
             return
 
         # Validate if jump only skips the following jump instruction
@@ -198,6 +481,14 @@ class DukGroup(DukItem):
         if self.items[index + 1].getDestinationAddress() <= self.items[index + 1].address:
             return
 
+        # A branch from outside landing in the if or the else would be hidden by the groups
+        endAddress = self.items[index + 1].getDestinationAddress() - 1
+        elseJump = self.getItemByAddress(endAddress)
+        if isinstance(elseJump, DukInstructionJump) and elseJump.getDestinationAddress() > endAddress + 1:
+            endAddress = elseJump.getDestinationAddress() - 1
+        if self.isEntered(self.items[index].getStartAddress(), endAddress):
+            return
+
         # Otherwise it's a standard if/if-else
         self.decompileIfElseForward(index, constants, functions, varmap, formals, disableGrouping, indentation)
         return
@@ -210,7 +501,7 @@ class DukGroup(DukItem):
     # ->
     # for (;;) { ..[loop statements].. }
     def decompileFor(self, index, constants, functions, varmap, formals, disableGrouping = {}, indentation = ''):
-        if not DukGroup.isChain(self.items[index:], [DukInstructionLabel, DukInstructionJump, DukInstructionJump]):
+        if not self.getChains(index) & DukGroup.CHAIN_FOR:
             return
 
         # Get jump addresses
@@ -230,8 +521,12 @@ class DukGroup(DukItem):
         if not isinstance(insEndJump, DukInstructionJump) or not isinstance(insEnd, DukInstructionEndLabel):
             return
 
+        # Validate no branch from outside lands inside the loop
+        if self.isEntered(insLabel.getStartAddress(), endAddress):
+            return
+
         # for (;;)
-        if DukGroup.isChain(self.items[index:], [DukInstructionLabel, DukInstructionJump, DukInstructionJump, DukInstructionJump]):
+        if self.getChains(index) & DukGroup.CHAIN_FOR_EVER:
             insJump3 = self.items[index + 3]
             jump3StartAddress = insJump3.getDestinationAddress()
             instructionStart = self.items[index + 4]
@@ -263,11 +558,11 @@ class DukGroup(DukItem):
             )
 
             # Recursive Decompile
-            forGroup.decompile(constants, functions, varmap, formals, disableGrouping, indentation + '    ')
+            self.decompileGroup(forGroup, constants, functions, varmap, formals, disableGrouping, indentation + '    ')
             return
 
         # for (r1 = 0; r2 = (r1 < 10.0; if (r2 == false)); r1 = r2++) { ..[loop statements].. }
-        if DukGroup.isChain(self.items[index:], [DukInstructionLabel, DukInstructionJump, DukInstructionJump, DukInstructionLdInt, DukInstructionComparison, DukInstructionIfR, DukInstructionJump, DukInstructionJump, DukInstructionIncDec, DukInstructionJump]):
+        if self.getChains(index) & DukGroup.CHAIN_FOR_COMPARISON:
             insLdInt = self.items[index + 3]
             insComparison = self.items[index + 4]
             insIf = self.items[index + 5]
@@ -349,7 +644,7 @@ class DukGroup(DukItem):
             )
 
             # Recursive Decompile
-            forGroup.decompile(constants, functions, varmap, formals, disableGrouping, indentation + '    ')
+            self.decompileGroup(forGroup, constants, functions, varmap, formals, disableGrouping, indentation + '    ')
             return
         return
 
@@ -357,7 +652,7 @@ class DukGroup(DukItem):
     # ->
     # while (r0 < 10.0) { ..[loop statements].. }
     def decompileWhile(self, index, constants, functions, varmap, formals, disableGrouping = {}, indentation = ''):
-        if not DukGroup.isChain(self.items[index:], [DukInstructionLabel, DukInstructionJump, DukInstructionJump, DukInstructionComparison, DukInstructionIfR, DukInstructionJump]):
+        if not self.getChains(index) & DukGroup.CHAIN_WHILE:
             return
 
         # Get jump addresses
@@ -377,6 +672,10 @@ class DukGroup(DukItem):
         if not isinstance(insEndJump, DukInstructionJump) or not isinstance(insEnd, DukInstructionEndLabel):
             return
 
+        # Validate no branch from outside lands inside the loop
+        if self.isEntered(insLabel.getStartAddress(), endAddress):
+            return
+
         insComparison = self.items[index + 3]
         insIf = self.items[index + 4]
         insIfJump = self.items[index + 5]
@@ -410,7 +709,7 @@ class DukGroup(DukItem):
         )
 
         # Recursive Decompile
-        whileGroup.decompile(constants, functions, varmap, formals, disableGrouping, indentation + '    ')
+        self.decompileGroup(whileGroup, constants, functions, varmap, formals, disableGrouping, indentation + '    ')
         return
 
     # r7 = r0 == 2.0; if (r7 == true); jump 0004; jump 0006; ..[if statements].. jump 0007; ..[else statements]..
@@ -471,15 +770,15 @@ class DukGroup(DukItem):
                 )
 
         # Recursive Decompile
-        ifGroup.decompile(constants, functions, varmap, formals, disableGrouping, indentation + '    ')
+        self.decompileGroup(ifGroup, constants, functions, varmap, formals, disableGrouping, indentation + '    ')
         if elseGroup != None:
-            elseGroup.decompile(constants, functions, varmap, formals, disableGrouping, indentation + '    ')
+            self.decompileGroup(elseGroup, constants, functions, varmap, formals, disableGrouping, indentation + '    ')
 
     # r2 = "err"; try (r2); jump 0006; jump 0009; ..[try statements].. endtry; err = r2; ..[catch statements].. endcatch;
     # ->
     # try { ..[try statements].. } catch (err) { ..[catch statements].. }
     def decompileTryCatch(self, index, constants, functions, varmap, formals, disableGrouping = {}, indentation = ''):
-        if not DukGroup.isChain(self.items[index:], [DukInstructionLdConst, DukInstructionTryCatch, DukInstructionJump, DukInstructionJump]):
+        if not self.getChains(index) & DukGroup.CHAIN_TRY_CATCH:
             return
 
         endTryAddress = self.items[index + 2].getDestinationAddress() - 1
@@ -495,6 +794,10 @@ class DukGroup(DukItem):
         if endTry == None or endCatch == None or not isinstance(endTry, DukInstructionEndTry) or not isinstance(endCatch, DukInstructionEndCatch):
             return
 
+        # Validate no branch from outside lands inside the try or the catch
+        if self.isEntered(self.items[index].getStartAddress(), endCatchAddress):
+            return
+
         # Get try/catch/finally register
         tryCatchFinallyRegister = self.items[index + 1].bc
 
@@ -582,16 +885,16 @@ class DukGroup(DukItem):
             )
 
         # Recursive Decompile
-        tryGroup.decompile(constants, functions, varmap, formals, disableGrouping, indentation + '    ')
-        catchGroup.decompile(constants, functions, varmap, formals, disableGrouping, indentation + '    ')
+        self.decompileGroup(tryGroup, constants, functions, varmap, formals, disableGrouping, indentation + '    ')
+        self.decompileGroup(catchGroup, constants, functions, varmap, formals, disableGrouping, indentation + '    ')
         if finallyGroup != None:
-            finallyGroup.decompile(constants, functions, varmap, formals, disableGrouping, indentation + '    ')
+            self.decompileGroup(finallyGroup, constants, functions, varmap, formals, disableGrouping, indentation + '    ')
 
     # r3 = r9 == "all" ; if (r3 == true)
     # ->
     # if (/*r3 = */r9 == "all")
     def decompileIfCondition(self, index, constants, functions, varmap, formals, disableGrouping = {}, indentation = ''):
-        if not DukGroup.isChain(self.items[index:], [DukInstructionComparison, DukGroupIfR]):
+        if not self.getChains(index) & DukGroup.CHAIN_IF_CONDITION:
             return
 
         # Substitute items for if condition group
@@ -607,31 +910,34 @@ class DukGroup(DukItem):
         )
 
         # Recursive Decompile
-        ifConditionGroup.decompile(constants, functions, varmap, formals, disableGrouping, indentation + '    ')
+        self.decompileGroup(ifConditionGroup, constants, functions, varmap, formals, disableGrouping, indentation + '    ')
 
     # r2 = r3["log"]; r4 = 1; r5 = r0; r2 = r2(r4, r5);
     # ->
     # r3.log(1, r0);
     def decompileCall(self, index, constants, functions, varmap, formals, disableGrouping = {}, indentation = ''):
-        if not isinstance(self.items[index], DukInstructionCall):
+        if not self.items[index].CATEGORY & DukCategory.CALL:
             return
         call = self.items[index]
 
         # Get argument count
         args = call.getArgRegs()
 
+        # Arguments are read backwards from the call, without room for the function register it wraps to the last item
+        self.probeItems(index - len(args) - 1, index if index - len(args) > 0 else len(self.items) - 1)
+
         # Validate there is enough room for argument assignments
         if index - len(args) < 0:
             return
 
         # Validate each argument assignment
         for i in range(0, len(args)):
-            if not DukGroup.isAny(self.items[index - i - 1], [DukInstructionLoad, DukGroupLoad]):
+            if not self.items[index - i - 1].CATEGORY & (DukCategory.LOAD | DukCategory.GROUP_LOAD):
                 return
 
         # Validate function register
         funcReg = self.items[index - len(args) - 1]
-        if not DukGroup.isAny(funcReg, [DukInstructionGetProp, DukInstructionCsReg, DukInstructionCsVar]):
+        if not funcReg.CATEGORY & (DukCategory.GET_PROP | DukCategory.CS_REG | DukCategory.CS_VAR):
             return
 
         # Call Arguments
@@ -661,7 +967,7 @@ class DukGroup(DukItem):
     # ->
     # r3 = console.log("Hello World");
     def decompileCallVar(self, index, constants, functions, varmap, formals, disableGrouping = {}, indentation = ''):
-        if not DukGroup.isChain(self.items[index:], [DukInstructionGetVar, DukInstructionLdReg, DukGroupCall]):
+        if not self.getChains(index) & DukGroup.CHAIN_CALL_VAR:
             return
 
         insGetVar = self.items[index]
@@ -718,7 +1024,7 @@ class DukGroup(DukItem):
         for address in range(rStart, rEnd):
             insValue = self.getItemByAddress(address)
 
-            if not DukGroup.isAny(insValue, [DukInstructionLoad]):
+            if insValue == None or not insValue.CATEGORY & DukCategory.LOAD:
                 return
 
             # Validate register
@@ -769,7 +1075,7 @@ class DukGroup(DukItem):
             insKey = self.getItemByAddress(address)
             insValue = self.getItemByAddress(address + 1)
 
-            if not DukGroup.isAny(insKey, [DukInstructionLoad]) or not DukGroup.isAny(insValue, [DukInstructionLoad]):
+            if insKey == None or insValue == None or not insKey.CATEGORY & DukCategory.LOAD or not insValue.CATEGORY & DukCategory.LOAD:
                 return
             
             # Validate register
@@ -805,7 +1111,7 @@ class DukGroup(DukItem):
         if index >= len(self.items) or len(self.items[index:]) < 2:
             return
 
-        if not DukGroup.isAny(self.items[index], [DukInstructionGetVar, DukInstructionLdReg]) or not isinstance(self.items[index + 1], DukInstructionGetProp):
+        if not self.getChains(index) & DukGroup.CHAIN_GET_PROP:
             return
 
         insVarLd = self.items[index]
@@ -838,7 +1144,7 @@ class DukGroup(DukItem):
         if index >= len(self.items) or len(self.items[index:]) < 2:
             return
 
-        if not DukGroup.isAny(self.items[index], [DukInstructionOperator, DukGroupJoinOperator]) or not DukGroup.isAny(self.items[index + 1], [DukInstructionOperator]):
+        if not self.getChains(index) & DukGroup.CHAIN_JOIN_OPERATOR:
             return
 
         insA = self.items[index]
@@ -859,10 +1165,7 @@ class DukGroup(DukItem):
     # ->
     # return r1;
     def decompileDoubleReturn(self, index, constants, functions, varmap, formals, disableGrouping = {}, indentation = ''):
-        if (
-            DukGroup.isChain(self.items[index:], [DukInstructionRetReg, DukInstructionRetUndef]) or
-            DukGroup.isChain(self.items[index:], [DukInstructionRetConst, DukInstructionRetUndef])
-        ):
+        if self.getChains(index) & DukGroup.CHAIN_DOUBLE_RETURN:
             self.replaceItems(self.items[index], index, index + 1) # Ignore return undefined
 
     def getAdressText(self, start, end):
@@ -872,19 +1175,57 @@ class DukGroup(DukItem):
         return f'/* {address} */ '
 
     def dumpGroupItems(self, name, startAddress, endAddress, items, constants, functions, varmap, formals, indentation = ''):
+        if not Logger.enabled(Verbosity.DEBUG):
+            return
+
         addressRange = f'{startAddress:04x}' if startAddress == endAddress else f'{startAddress:04x}-{endAddress:04x}'
         Logger.info(Verbosity.DEBUG, f'{indentation}{name} {addressRange}')
         if items != None:
             for item in items:
                 Logger.info(Verbosity.DEBUG, f'{indentation}    -> {item.getStartAddress():04x}-{item.getEndAddress():04x} {item.toString(constants, functions, varmap, formals)}')
 
-    def toString(self, constants, functions, varmap, formals, indentation = '', showAddress = False):
-        text = ''
+    def writeItems(self, write, constants, functions, varmap, formals, indentation = '', showAddress = False, lines = None):
         for item in self.items:
-            text += f'{item.toString(constants, functions, varmap, formals, indentation, showAddress)}\n'
+            item.writeString(write, constants, functions, varmap, formals, indentation, showAddress, lines)
+            write('\n')
+
+    def renderString(self, constants, functions, varmap, formals, indentation = '', showAddress = False):
+        chunks = []
+        self.writeItems(chunks.append, constants, functions, varmap, formals, indentation, showAddress)
+        return ''.join(chunks)
+
+    def getRender(self, indentation, showAddress, keep = True):
+        # Renders are keyed on the indentation and the address option, other indentations are derived from the
+        # placeholder render
+        if self.renders == None:
+            return None
+        text = self.renders.get((indentation, showAddress))
+        if text == None and (DukGroup.INDENTATION, showAddress) in self.renders:
+            text = self.renders[(DukGroup.INDENTATION, showAddress)].replace(DukGroup.INDENTATION, indentation)
+            if keep:
+                self.renders[(indentation, showAddress)] = text
+        return text
+
+    def toString(self, constants, functions, varmap, formals, indentation = '', showAddress = False):
+        # Rendered once until the group or a group inside it changes
+        text = self.getRender(indentation, showAddress)
+        if text == None:
+            if self.renders == None:
+                self.renders = {}
+            self.renders[(DukGroup.INDENTATION, showAddress)] = self.renderString(constants, functions, varmap, formals, DukGroup.INDENTATION, showAddress)
+            text = self.getRender(indentation, showAddress)
         return text
 
+    def writeString(self, write, constants, functions, varmap, formals, indentation = '', showAddress = False, lines = None):
+        # Written text is reused but not kept, the output is only written once
+        text = self.getRender(indentation, showAddress, False)
+        if text == None:
+            text = self.renderString(constants, functions, varmap, formals, indentation, showAddress)
+        write(text if lines == None else lines.annotate(text, self.getStartAddress()))
+
 class DukGroupInitObject(DukGroup):
+    __slots__ = ('newObj', 'putObj')
+
     def __init__(self, newObj, putObj, items):
         super().__init__(newObj.address, items)
         self.newObj = newObj
@@ -893,7 +1234,7 @@ class DukGroupInitObject(DukGroup):
     def getEndAddress(self):
         return self.putObj.getEndAddress()
 
-    def toString(self, constants, functions, varmap, formals, indentation = '', showAddress = False):
+    def renderString(self, constants, functions, varmap, formals, indentation = '', showAddress = False):
         text = f'{indentation}'
         if showAddress:
             text += f'{self.getAdressText(self.getStartAddress(), self.getEndAddress())}'
@@ -908,6 +1249,8 @@ class DukGroupInitObject(DukGroup):
         return text
 
 class DukGroupInitArray(DukGroup):
+    __slots__ = ('newArr', 'putArr')
+
     def __init__(self, newArr, putArr, items):
         super().__init__(newArr.address, items)
         self.newArr = newArr
@@ -916,7 +1259,7 @@ class DukGroupInitArray(DukGroup):
     def getEndAddress(self):
         return self.putArr.getEndAddress()
 
-    def toString(self, constants, functions, varmap, formals, indentation = '', showAddress = False):
+    def renderString(self, constants, functions, varmap, formals, indentation = '', showAddress = False):
         text = f'{indentation}'
         if showAddress:
             text += f'{self.getAdressText(self.getStartAddress(), self.getEndAddress())}'
@@ -936,6 +1279,9 @@ class DukGroupInitArray(DukGroup):
         return text
 
 class DukGroupLoad(DukGroup):
+    __slots__ = ('insLoad',)
+    CATEGORY = DukCategory.GROUP_LOAD
+
     def __init__(self, insLoad):
         super().__init__(insLoad.address, [])
         self.insLoad = insLoad
@@ -946,7 +1292,7 @@ class DukGroupLoad(DukGroup):
     def getAssignee(self):
         return self.insLoad.getAssignee()
 
-    def toString(self, constants, functions, varmap, formals, indentation = '', showAddress = False):
+    def renderString(self, constants, functions, varmap, formals, indentation = '', showAddress = False):
         text = f'{indentation}'
         if showAddress:
             text += f'{self.getAdressText(self.getStartAddress(), self.getEndAddress())}'
@@ -954,6 +1300,9 @@ class DukGroupLoad(DukGroup):
         return text
 
 class DukGroupJoinOperator(DukGroupLoad):
+    __slots__ = ('insOther',)
+    CATEGORY = DukCategory.GROUP_JOIN_OPERATOR
+
     def __init__(self, insLoad, insOther):
         DukGroupLoad.__init__(self, insLoad)
         self.insOther = insOther
@@ -970,6 +1319,8 @@ class DukGroupJoinOperator(DukGroupLoad):
         return f'({self.insLoad.getLeft(constants)} {self.insLoad.getOperatorText()} {self.insLoad.getRight(constants)}) {self.insOther.getOperatorText()} {self.insOther.getRight(constants)}'
 
 class DukGroupProp(DukGroupLoad):
+    __slots__ = ('insGetProp',)
+
     def __init__(self, insLoad, insGetProp):
         DukGroupLoad.__init__(self, insLoad)
         self.insGetProp = insGetProp
@@ -984,14 +1335,21 @@ class DukGroupProp(DukGroupLoad):
         return f'{self.getKeyValue(constants, functions, varmap, formals, indentation, showAddress)}[{self.insGetProp.regConstC(constants, True)}]'
 
 class DukGroupGetVarProp(DukGroupProp):
+    __slots__ = ()
+
     def getKeyValue(self, constants, functions, varmap, formals, indentation = '', showAddress = False):
         return f'{self.insLoad.constBC(constants)}'
 
 class DukGroupLoadProp(DukGroupProp):
+    __slots__ = ()
+
     def getKeyValue(self, constants, functions, varmap, formals, indentation = '', showAddress = False):
         return f'{self.insLoad.getValue(constants, functions, varmap, formals, indentation, showAddress)}'
 
 class DukGroupCall(DukGroup):
+    __slots__ = ('insFuncReg', 'insCall')
+    CATEGORY = DukCategory.GROUP_CALL
+
     def __init__(self, insFuncReg, insCall, items):
         super().__init__(insFuncReg.address, items)
         self.insFuncReg = insFuncReg
@@ -1014,7 +1372,7 @@ class DukGroupCall(DukGroup):
             return f'.{self.insFuncReg.constC(constants)}'
         return f'[r{self.insFuncReg.c}]'
 
-    def toString(self, constants, functions, varmap, formals, indentation = '', showAddress = False):
+    def renderString(self, constants, functions, varmap, formals, indentation = '', showAddress = False):
         text = f'{indentation}'
         if showAddress:
             text += f'{self.getAdressText(self.getStartAddress(), self.getEndAddress())}'
@@ -1037,11 +1395,14 @@ class DukGroupCall(DukGroup):
         return text
 
 class DukGroupCallVar(DukGroup):
+    __slots__ = ('insGetVar', 'insLdReg', 'groupCall')
+
     def __init__(self, insGetVar, insLdReg, groupCall):
         super().__init__(insGetVar.address, [])
         self.insGetVar = insGetVar
         self.insLdReg = insLdReg
         self.groupCall = groupCall
+        self.adopt(groupCall)
 
     def getEndAddress(self):
         return self.groupCall.getEndAddress()
@@ -1049,7 +1410,7 @@ class DukGroupCallVar(DukGroup):
     def hasRawAddressInstruction(self):
         return super().hasRawAddressInstruction() or self.groupCall.hasRawAddressInstruction()
 
-    def toString(self, constants, functions, varmap, formals, indentation = '', showAddress = False):
+    def renderString(self, constants, functions, varmap, formals, indentation = '', showAddress = False):
         text = f'{indentation}'
         if showAddress:
             text += f'{self.getAdressText(self.getStartAddress(), self.getEndAddress())}'
@@ -1065,6 +1426,8 @@ class DukGroupCallVar(DukGroup):
         return text
 
 class DukGroupBlock(DukGroup):
+    __slots__ = ()
+
     def toStringStatement(self, constants, functions, varmap, formals, indentation = '', showAddress = False):
         raise RuntimeError()
 
@@ -1074,21 +1437,37 @@ class DukGroupBlock(DukGroup):
     def toStringSuffix(self):
         return ''
 
-    def toStringItems(self, constants, functions, varmap, formals, indentation = '', showAddress = False):
-        return super().toString(constants, functions, varmap, formals, indentation + '    ', showAddress)
+    def writeStringItems(self, write, constants, functions, varmap, formals, indentation = '', showAddress = False, lines = None):
+        self.writeItems(write, constants, functions, varmap, formals, indentation + '    ', showAddress, lines)
 
-    def toString(self, constants, functions, varmap, formals, indentation = '', showAddress = False):
+    def writeString(self, write, constants, functions, varmap, formals, indentation = '', showAddress = False, lines = None):
+        # Kept renders are reused, annotated output is always written again
+        if lines == None:
+            text = self.getRender(indentation, showAddress, False)
+            if text != None:
+                write(text)
+                return
+
+        # Blocks are written statement by statement so nested blocks are never copied into their parent's text
         text = self.toStringPrefix()
         if showAddress:
             text += f'{indentation}{self.getAdressText(self.getStartAddress(), self.getEndAddress())}\n'
-        text += f'{indentation}{self.toStringStatement(constants, functions, varmap, formals, indentation, showAddress)}\n'
+        statement = f'{indentation}{self.toStringStatement(constants, functions, varmap, formals, indentation, showAddress)}'
+        text += (statement if lines == None else lines.annotate(statement, self.getStartAddress())) + '\n'
         text += f'{indentation}{{\n'
-        text += self.toStringItems(constants, functions, varmap, formals, indentation, showAddress)
-        text += f'{indentation}}}'
-        text += self.toStringSuffix()
-        return text
+        write(text)
+        self.writeStringItems(write, constants, functions, varmap, formals, indentation, showAddress, lines)
+        write(f'{indentation}}}{self.toStringSuffix()}')
+
+    def renderString(self, constants, functions, varmap, formals, indentation = '', showAddress = False):
+        chunks = []
+        self.writeString(chunks.append, constants, functions, varmap, formals, indentation, showAddress)
+        return ''.join(chunks)
 
 class DukGroupIfR(DukGroupBlock):
+    __slots__ = ('insIf', 'insJump')
+    CATEGORY = DukCategory.GROUP_IF_R
+
     def __init__(self, insIf, insJump, items):
         super().__init__(insIf.address, items)
         self.insIf = insIf
@@ -1098,6 +1477,9 @@ class DukGroupIfR(DukGroupBlock):
         return '\n'
 
 class DukGroupIfTrueR(DukGroupIfR):
+    __slots__ = ()
+    CATEGORY = DukCategory.GROUP_IF_TRUE_R
+
     def getEndAddress(self):
         return self.insJump.getEndAddress()
 
@@ -1105,6 +1487,9 @@ class DukGroupIfTrueR(DukGroupIfR):
         return f'if (r{self.insIf.bc} == true)'
 
 class DukGroupIfFalseR(DukGroupIfR):
+    __slots__ = ()
+    CATEGORY = DukCategory.GROUP_IF_FALSE_R
+
     def getEndAddress(self):
         return self.insJump.getEndAddress()
 
@@ -1112,6 +1497,8 @@ class DukGroupIfFalseR(DukGroupIfR):
         return f'if (r{self.insIf.bc} == false)'
 
 class DukGroupElse(DukGroupBlock):
+    __slots__ = ('insJump',)
+
     def __init__(self, insJump, items):
         super().__init__(insJump.address, items)
         self.insJump = insJump
@@ -1126,19 +1513,19 @@ class DukGroupElse(DukGroupBlock):
         return '\n'
 
 class DukGroupIfCondition(DukGroupBlock):
+    __slots__ = ('insCondition', 'groupIf')
+
     def __init__(self, insCondition, groupIf, items):
         super().__init__(insCondition.address, items)
         self.insCondition = insCondition
         self.groupIf = groupIf
+        self.adopt(groupIf)
 
     def hasRawAddressInstruction(self):
         return super().hasRawAddressInstruction() or self.groupIf.hasRawAddressInstruction()
 
-    def toStringItems(self, constants, functions, varmap, formals, indentation = '', showAddress = False):
-        text = ''
-        for item in self.groupIf.items:
-            text += f'{item.toString(constants, functions, varmap, formals, indentation + "    ", showAddress)}\n'
-        return text
+    def writeStringItems(self, write, constants, functions, varmap, formals, indentation = '', showAddress = False, lines = None):
+        self.groupIf.writeItems(write, constants, functions, varmap, formals, indentation + '    ', showAddress, lines)
 
     def getEndAddress(self):
         return self.groupIf.getEndAddress()
@@ -1147,14 +1534,20 @@ class DukGroupIfCondition(DukGroupBlock):
         return '\n'
 
 class DukGroupIfTrueCondition(DukGroupIfCondition):
+    __slots__ = ()
+
     def toStringStatement(self, constants, functions, varmap, formals, indentation = '', showAddress = False):
         return f'if (/*r{self.insCondition.a} = */{self.insCondition.regConstB(constants, True)} {self.insCondition.getComparisonText()} {self.insCondition.regConstC(constants, True)})'
 
 class DukGroupIfFalseCondition(DukGroupIfCondition):
+    __slots__ = ()
+
     def toStringStatement(self, constants, functions, varmap, formals, indentation = '', showAddress = False):
         return f'if (/*r{self.insCondition.a} = */({self.insCondition.regConstB(constants, True)} {self.insCondition.getComparisonText()} {self.insCondition.regConstC(constants, True)}) == false)'
 
 class DukGroupTry(DukGroupBlock):
+    __slots__ = ('insLdConst', 'insTry', 'insJumpEndTry', 'insJumpEndCatch')
+
     def __init__(self, insLdConst, insTry, insJumpEndTry, insJumpEndCatch, items):
         super().__init__(insLdConst.address, items)
         self.insLdConst = insLdConst
@@ -1172,6 +1565,8 @@ class DukGroupTry(DukGroupBlock):
         return '\n'
 
 class DukGroupCatch(DukGroupBlock):
+    __slots__ = ('insVarAssign',)
+
     def __init__(self, insVarAssign, items):
         super().__init__(insVarAssign.address, items)
         self.insVarAssign = insVarAssign
@@ -1186,6 +1581,8 @@ class DukGroupCatch(DukGroupBlock):
         return f'catch ({self.insVarAssign.constBC(constants)})'
 
 class DukGroupFinally(DukGroupBlock):
+    __slots__ = ('insFirst', 'insEndFin')
+
     def __init__(self, insFirst, insEndFin, items):
         super().__init__(insFirst.address, items)
         self.insFirst = insFirst
@@ -1201,6 +1598,8 @@ class DukGroupFinally(DukGroupBlock):
         return f'finally'
 
 class DukGroupWhile(DukGroupBlock):
+    __slots__ = ('insLabel', 'insJumpEnd', 'insJump2', 'insCondition', 'insIf', 'insIfJump', 'insEndJump', 'insEnd')
+
     def __init__(self, insLabel, insJumpEnd, insJump2, insCondition, insIf, insIfJump, insEndJump, insEnd, items):
         super().__init__(insLabel.address, items)
         self.insLabel = insLabel
@@ -1232,6 +1631,8 @@ class DukGroupWhile(DukGroupBlock):
         return '\n'
 
 class DukGroupFor(DukGroupBlock):
+    __slots__ = ('insLabel', 'insJumpEnd', 'insJump2', 'insEndJump', 'insEnd', 'initGroup', 'comparisonGroup', 'modifierGroup')
+
     def __init__(self, insLabel, insJumpEnd, insJump2, insEndJump, insEnd, items, initGroup = None, comparisonGroup = None, modifierGroup = None):
         super().__init__(insLabel.address, items)
         self.insLabel = insLabel
@@ -1242,6 +1643,9 @@ class DukGroupFor(DukGroupBlock):
         self.initGroup = initGroup
         self.comparisonGroup = comparisonGroup
         self.modifierGroup = modifierGroup
+        self.adopt(initGroup)
+        self.adopt(comparisonGroup)
+        self.adopt(modifierGroup)
 
     def getEndAddress(self):
         return self.insEnd.getEndAddress()
@@ -1263,10 +1667,12 @@ class DukGroupFor(DukGroupBlock):
         return '\n'
 
 class DukGroupForItems(DukGroup):
+    __slots__ = ()
+
     def __init__(self, items):
         super().__init__(0 if len(items) == 0 else items[0].address, items)
 
-    def toString(self, constants, functions, varmap, formals, indentation = '', showAddress = False):
+    def renderString(self, constants, functions, varmap, formals, indentation = '', showAddress = False):
         text = ''
         if showAddress:
             lastItemAddress = 0 if len(self.items) == 0 else self.items[len(self.items) - 1].getStartAddress()
@@ -1278,16 +1684,18 @@ class DukGroupForItems(DukGroup):
         return text + ', '.join(commands)
 
 class DukGroupForInit(DukGroupForItems):
-    pass
+    __slots__ = ()
 
 class DukGroupForComparison(DukGroup):
+    __slots__ = ('insCondition', 'insIf', 'insIfJump')
+
     def __init__(self, insCondition, insIf, insIfJump):
         super().__init__(insCondition.getStartAddress(), [])
         self.insCondition = insCondition
         self.insIf = insIf
         self.insIfJump = insIfJump
 
-    def toString(self, constants, functions, varmap, formals, indentation = '', showAddress = False):
+    def renderString(self, constants, functions, varmap, formals, indentation = '', showAddress = False):
         text = ''
 
         if showAddress:
@@ -1303,4 +1711,4 @@ class DukGroupForComparison(DukGroup):
         return text
 
 class DukGroupForModifier(DukGroupForItems):
-    pass
\ No newline at end of file
+    __slots__ = ()
\ No newline at end of file
@@ -0,0 +1,110 @@
+from bisect import bisect_right
+from itertools import islice
+
+class DukItems:
+    __slots__ = ('chunks', 'offsets', 'length')
+
+    # Items are stored in chunks so a splice only copies the chunks it touches
+    CHUNK_SIZE = 256
+
+    def __init__(self, items = ()):
+        items = list(items)
+        self.chunks = [items[i:i + DukItems.CHUNK_SIZE] for i in range(0, len(items), DukItems.CHUNK_SIZE)]
+        self.offsets = []
+        self.length = 0
+        self.updateOffsets(0)
+
+    def updateOffsets(self, chunkIndex):
+        # Index of the first item of every chunk from chunkIndex onwards
+        del self.offsets[chunkIndex:]
+        offset = 0 if chunkIndex == 0 else self.offsets[chunkIndex - 1] + len(self.chunks[chunkIndex - 1])
+        for chunk in self.chunks[chunkIndex:]:
+            self.offsets.append(offset)
+            offset += len(chunk)
+        self.length = offset
+
+    def locate(self, index):
+        # Chunk index and offset within the chunk, the end of the items maps to the end of the last chunk
+        if index == self.length and self.length > 0:
+            return len(self.chunks) - 1, len(self.chunks[-1])
+        chunkIndex = bisect_right(self.offsets, index) - 1
+        return chunkIndex, index - self.offsets[chunkIndex]
+
+    def splice(self, start, stop, items):
+        # Replace the items in [start, stop) with items
+        items = list(items)
+        if len(self.chunks) == 0:
+            self.chunks = [items] if len(items) > 0 else []
+            self.updateOffsets(0)
+            return
+
+        startChunk, startOffset = self.locate(start)
+        endChunk, endOffset = self.locate(stop)
+        chunk = self.chunks[startChunk][:startOffset] + items + self.chunks[endChunk][endOffset:]
+
+        # Split oversized chunks and drop empty ones
+        if len(chunk) > 2 * DukItems.CHUNK_SIZE:
+            chunks = [chunk[i:i + DukItems.CHUNK_SIZE] for i in range(0, len(chunk), DukItems.CHUNK_SIZE)]
+        else:
+            chunks = [chunk] if len(chunk) > 0 else []
+        self.chunks[startChunk:endChunk + 1] = chunks
+        self.updateOffsets(startChunk)
+
+    def iterate(self, start, stop):
+        if start >= stop:
+            return
+        chunkIndex, offset = self.locate(start)
+        remaining = stop - start
+        for chunk in self.chunks[chunkIndex:]:
+            for item in islice(chunk, offset, offset + remaining):
+                yield item
+            remaining -= len(chunk) - offset
+            if remaining <= 0:
+                return
+            offset = 0
+
+    def __len__(self):
+        return self.length
+
+    def __iter__(self):
+        for chunk in self.chunks:
+            for item in chunk:
+                yield item
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            start, stop, step = index.indices(self.length)
+            return DukItemsView(self, start, max(start, stop))
+
+        if index < 0:
+            index += self.length
+        if index < 0 or index >= self.length:
+            raise IndexError('item index out of range')
+        chunkIndex, offset = self.locate(index)
+        return self.chunks[chunkIndex][offset]
+
+class DukItemsView:
+    __slots__ = ('items', 'start', 'stop')
+
+    # Slice of DukItems without copying, only valid until the items are spliced
+    def __init__(self, items, start, stop):
+        self.items = items
+        self.start = start
+        self.stop = stop
+
+    def __len__(self):
+        return self.stop - self.start
+
+    def __iter__(self):
+        return self.items.iterate(self.start, self.stop)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            start, stop, step = index.indices(len(self))
+            return DukItemsView(self.items, self.start + start, self.start + max(start, stop))
+
+        if index < 0:
+            index += len(self)
+        if index < 0 or index >= len(self):
+            raise IndexError('item index out of range')
+        return self.items[self.start + index]
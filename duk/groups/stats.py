@@ -0,0 +1,138 @@
+import json
+import time
+
+class DukRuleStats:
+    ENABLED = False
+
+    # Records of the files grouped, the file and function being grouped and the rules being run
+    FILES = []
+    FILE = None
+    CURRENT = None
+    STACK = []
+
+    # Rewrites of every group so far, a rule rewrote items when it changed while the rule ran
+    REWRITES = 0
+
+    @staticmethod
+    def enable(toggle):
+        DukRuleStats.ENABLED = toggle
+
+    @staticmethod
+    def startFile(filepath):
+        if not DukRuleStats.ENABLED:
+            return
+
+        DukRuleStats.FILE = {'file': filepath, 'functions': []}
+        DukRuleStats.FILES.append(DukRuleStats.FILE)
+
+    @staticmethod
+    def stopFile():
+        DukRuleStats.FILE = None
+        DukRuleStats.CURRENT = None
+        DukRuleStats.STACK = []
+
+    @staticmethod
+    def detach():
+        # Forget the records inherited by a forked process, they belong to the parent
+        DukRuleStats.FILES = []
+        DukRuleStats.stopFile()
+
+    @staticmethod
+    def release():
+        files = DukRuleStats.FILES
+        DukRuleStats.FILES = []
+        return files
+
+    @staticmethod
+    def merge(files):
+        # Functions grouped by worker processes belong to the file being grouped
+        if DukRuleStats.FILE == None:
+            return
+        for record in files:
+            DukRuleStats.FILE['functions'] += record['functions']
+
+    @staticmethod
+    def startFunction(func):
+        if DukRuleStats.FILE == None:
+            return
+
+        DukRuleStats.CURRENT = {
+            'index': func.index,
+            'name': func.getName(),
+            'instructions': func.instructionCount,
+            'groups': 0,
+            'passes': 0,
+            'maxPasses': 0,
+            'maxDepth': 0,
+            'depth': 0,
+            'rules': {},
+        }
+
+    @staticmethod
+    def stopFunction():
+        if DukRuleStats.CURRENT != None:
+            del DukRuleStats.CURRENT['depth']
+            DukRuleStats.FILE['functions'].append(DukRuleStats.CURRENT)
+            DukRuleStats.CURRENT = None
+
+    @staticmethod
+    def enterGroup():
+        stats = DukRuleStats.CURRENT
+        stats['groups'] += 1
+        stats['depth'] += 1
+        stats['maxDepth'] = max(stats['maxDepth'], stats['depth'])
+
+    @staticmethod
+    def exitGroup(passes):
+        stats = DukRuleStats.CURRENT
+        stats['depth'] -= 1
+        stats['passes'] += passes
+        stats['maxPasses'] = max(stats['maxPasses'], passes)
+
+    @staticmethod
+    def measure(rule, group, *args):
+        # Rules count their own time and rewrites, the groups a rule decompiles inside it are taken out
+        name = rule.__name__
+        rules = DukRuleStats.CURRENT['rules']
+        if name not in rules:
+            rules[name] = {'calls': 0, 'rewrites': 0, 'time': 0}
+
+        entry = [time.perf_counter(), DukRuleStats.REWRITES, 0, 0]
+        DukRuleStats.STACK.append(entry)
+        try:
+            rule(group, *args)
+        finally:
+            DukRuleStats.STACK.pop()
+            elapsed = time.perf_counter() - entry[0]
+            rewrites = DukRuleStats.REWRITES - entry[1]
+            if len(DukRuleStats.STACK) > 0:
+                DukRuleStats.STACK[-1][2] += elapsed
+                DukRuleStats.STACK[-1][3] += rewrites
+
+            rules[name]['calls'] += 1
+            rules[name]['time'] += elapsed - entry[2]
+            if rewrites - entry[3] > 0:
+                rules[name]['rewrites'] += 1
+
+    @staticmethod
+    def getTotals(files):
+        # Statistics of the whole run, summed over every function
+        totals = {'functions': 0, 'groups': 0, 'passes': 0, 'maxPasses': 0, 'maxDepth': 0, 'rules': {}}
+        for record in files:
+            for func in record['functions']:
+                totals['functions'] += 1
+                totals['groups'] += func['groups']
+                totals['passes'] += func['passes']
+                totals['maxPasses'] = max(totals['maxPasses'], func['maxPasses'])
+                totals['maxDepth'] = max(totals['maxDepth'], func['maxDepth'])
+                for name, stats in func['rules'].items():
+                    if name not in totals['rules']:
+                        totals['rules'][name] = {'calls': 0, 'rewrites': 0, 'time': 0}
+                    for key in ('calls', 'rewrites', 'time'):
+                        totals['rules'][name][key] += stats[key]
+        return totals
+
+    @staticmethod
+    def save(filepath):
+        with open(filepath, 'w') as file:
+            json.dump({'run': DukRuleStats.getTotals(DukRuleStats.FILES), 'files': DukRuleStats.FILES}, file, indent=4)
@@ -1,13 +1,14 @@
 from duk.instructions.instructions import DukInstruction
 
 class DukInstructionBlank(DukInstruction):
+    __slots__ = ()
     def toString(self, constants, functions, varmap, formals, indentation = '', showAddress = False):
         return ''
     def toAsm(self, constants, functions, varmap, formals, indentation = '', showAddress = False):
         return f'{self.getStringPrefix(indentation, showAddress)}{self.name}'
 
 class DukInstructionNop(DukInstructionBlank):
-    pass
+    __slots__ = ()
 
 class DukInstructionInvalid(DukInstructionBlank):
-    pass
\ No newline at end of file
+    __slots__ = ()
\ No newline at end of file
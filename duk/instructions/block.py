@@ -0,0 +1,67 @@
+import sys
+from array import array
+from duk.instructions.lookup import DUK_OP_CLASSES
+from duk.instructions.instructions import DukInstruction
+from duk.jumps import DukJumpIndex
+
+# Array type code holding a 32-bit instruction word
+DUK_WORD_TYPECODE = 'I' if array('I').itemsize == 4 else 'L'
+
+class DukInstructionBlock:
+    def __init__(self, data):
+        # Instruction words are stored big endian, so each field is a strided byte column
+        data = memoryview(data)
+        self.words = array(DUK_WORD_TYPECODE)
+        self.words.frombytes(data)
+        if sys.byteorder == 'little':
+            self.words.byteswap()
+        self.opcodes = data[3::4].tobytes()
+        self.a = data[2::4].tobytes()
+        self.b = data[1::4].tobytes()
+        self.c = data[0::4].tobytes()
+
+        # Instruction objects are only created once they are needed
+        self.instructions = [None] * len(self.words)
+        self.jumps = None
+
+    def getBC(self, index):
+        return (self.c[index] << 8) | self.b[index]
+
+    def getABC(self, index):
+        return (self.getBC(index) << 8) | self.a[index]
+
+    def getJumpIndex(self):
+        # Branch edges of the block, built once from the columns the first time a rule needs them
+        if self.jumps == None:
+            self.jumps = DukJumpIndex(self)
+        return self.jumps
+
+    def create(self, index):
+        return DUK_OP_CLASSES.get(self.opcodes[index], DukInstruction)(index, self.words[index])
+
+    def materialize(self):
+        if None in self.instructions:
+            words = self.words
+            opcodes = self.opcodes
+            self.instructions = [
+                DUK_OP_CLASSES.get(opcodes[i], DukInstruction)(i, words[i]) if instruction == None else instruction
+                for i, instruction in enumerate(self.instructions)
+            ]
+        return self.instructions
+
+    def __len__(self):
+        return len(self.instructions)
+
+    def __iter__(self):
+        return iter(self.materialize())
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+
+        instruction = self.instructions[index]
+        if instruction == None:
+            if index < 0:
+                index += len(self)
+            instruction = self.instructions[index] = self.create(index)
+        return instruction
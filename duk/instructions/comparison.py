@@ -1,6 +1,9 @@
+from duk.category import DukCategory
 from duk.instructions.instructions import DukInstruction
 
 class DukInstructionComparison(DukInstruction):
+    __slots__ = ()
+    CATEGORY = DukCategory.COMPARISON
     def getComparisonText(self):
         raise RuntimeError()
     def toString(self, constants, functions, varmap, formals, indentation = '', showAddress = False):
@@ -9,33 +12,41 @@ class DukInstructionComparison(DukInstruction):
         return f'{self.getStringPrefix(indentation, showAddress)}{self.name} r{self.a}, {self.regConstB(constants, True)}, {self.regConstC(constants, True)}'
 
 class DukInstructionEq(DukInstructionComparison):
+    __slots__ = ()
     def getComparisonText(self):
         return '=='
 
 class DukInstructionNeq(DukInstructionComparison):
+    __slots__ = ()
     def getComparisonText(self):
         return '!='
 
 class DukInstructionSeq(DukInstructionComparison):
+    __slots__ = ()
     def getComparisonText(self):
         return '=='
 
 class DukInstructionSNeq(DukInstructionComparison):
+    __slots__ = ()
     def getComparisonText(self):
         return '!='
 
 class DukInstructionGt(DukInstructionComparison):
+    __slots__ = ()
     def getComparisonText(self):
         return '>'
 
 class DukInstructionGe(DukInstructionComparison):
+    __slots__ = ()
     def getComparisonText(self):
         return '>='
 
 class DukInstructionLt(DukInstructionComparison):
+    __slots__ = ()
     def getComparisonText(self):
         return '<'
 
 class DukInstructionLe(DukInstructionComparison):
+    __slots__ = ()
     def getComparisonText(self):
         return '<='
\ No newline at end of file
@@ -1,6 +1,9 @@
+from duk.category import DukCategory
 from duk.instructions.instructions import DukInstruction
 
 class DukInstructionIf(DukInstruction):
+    __slots__ = ()
+    CATEGORY = DukCategory.IF
     def getConditionStatement(self, constants):
         raise RuntimeError()
     def getDestinationAddress(self):
@@ -11,25 +14,34 @@ class DukInstructionIf(DukInstruction):
         raise RuntimeError()
 
 class DukInstructionIfC(DukInstructionIf):
+    __slots__ = ()
     def toAsm(self, constants, functions, varmap, formals, indentation = '', showAddress = False):
         return f'{self.getStringPrefix(indentation, showAddress)}{self.name} {self.formatConst(self.constBC(constants))}, {self.getDestinationAddress():04x}'
 
 class DukInstructionIfR(DukInstructionIf):
+    __slots__ = ()
+    CATEGORY = DukCategory.IF_R
     def toAsm(self, constants, functions, varmap, formals, indentation = '', showAddress = False):
         return f'{self.getStringPrefix(indentation, showAddress)}{self.name} r{self.bc}, {self.getDestinationAddress():04x}'
 
 class DukInstructionIfTrueR(DukInstructionIfR):
+    __slots__ = ()
+    CATEGORY = DukCategory.IF_TRUE_R
     def getConditionStatement(self, constants):
         return f'r{self.bc} == true'
 
 class DukInstructionIfTrueC(DukInstructionIfC):
+    __slots__ = ()
     def getConditionStatement(self, constants):
         return f'{self.formatConst(self.constBC(constants))} == true'
 
 class DukInstructionIfFalseR(DukInstructionIfR):
+    __slots__ = ()
+    CATEGORY = DukCategory.IF_FALSE_R
     def getConditionStatement(self, constants):
         return f'r{self.bc} == false'
 
 class DukInstructionIfFalseC(DukInstructionIfC):
+    __slots__ = ()
     def getConditionStatement(self, constants):
         return f'{self.formatConst(self.constBC(constants))} == false'
\ No newline at end of file
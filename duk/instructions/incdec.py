@@ -1,6 +1,10 @@
+from duk.category import DukCategory
 from duk.instructions.instructions import DukInstruction
 
 class DukInstructionIncDec(DukInstruction):
+    __slots__ = ()
+    CATEGORY = DukCategory.INC_DEC
+
     def isIncPre(self):
         raise RuntimeError()
 
@@ -16,6 +20,8 @@ class DukInstructionIncDec(DukInstruction):
 
 # Increment/Decrement Assign Register
 class DukInstructionIncDecR(DukInstructionIncDec):
+    __slots__ = ()
+
     def toString(self, constants, functions, varmap, formals, indentation = '', showAddress = False):
         inner = f'r{self.bc}'
         return f'{self.getStringPrefix(indentation, showAddress)}r{self.a} = ' + self.wrapIncPreText(inner) + ';'
@@ -24,23 +30,29 @@ class DukInstructionIncDecR(DukInstructionIncDec):
         return f'{self.getStringPrefix(indentation, showAddress)}{self.name} r{self.bc}, r{self.a}'
 
 class DukInstructionPreIncR(DukInstructionIncDecR):
+    __slots__ = ()
     def isIncPre(self):
         return True, True
 
 class DukInstructionPreDecR(DukInstructionIncDecR):
+    __slots__ = ()
     def isIncPre(self):
         return False, True
 
 class DukInstructionPostIncR(DukInstructionIncDecR):
+    __slots__ = ()
     def isIncPre(self):
         return True, False
 
 class DukInstructionPostDecR(DukInstructionIncDecR):
+    __slots__ = ()
     def isIncPre(self):
         return False, False
 
 # Increment/Decrement Register
 class DukInstructionIncDecV(DukInstructionIncDec):
+    __slots__ = ()
+
     def toString(self, constants, functions, varmap, formals, indentation = '', showAddress = False):
         inner = f'{self.constBC(constants)}'
         return f'{self.getStringPrefix(indentation, showAddress)}' + self.wrapIncPreText(inner) + ';'
@@ -49,23 +61,29 @@ class DukInstructionIncDecV(DukInstructionIncDec):
         return f'{self.getStringPrefix(indentation, showAddress)}{self.name} {self.constBC(constants)}'
 
 class DukInstructionPreIncV(DukInstructionIncDecV):
+    __slots__ = ()
     def isIncPre(self):
         return True, True
 
 class DukInstructionPreDecV(DukInstructionIncDecV):
+    __slots__ = ()
     def isIncPre(self):
         return False, True
 
 class DukInstructionPostIncV(DukInstructionIncDecV):
+    __slots__ = ()
     def isIncPre(self):
         return True, False
 
 class DukInstructionPostDecV(DukInstructionIncDecV):
+    __slots__ = ()
     def isIncPre(self):
         return False, False
 
 # Increment/Decrement Assign Prop
 class DukInstructionIncDecP(DukInstructionIncDec):
+    __slots__ = ()
+
     def toString(self, constants, functions, varmap, formals, indentation = '', showAddress = False):
         inner = f'{self.regConstB(constants, True)}[{self.regConstC(constants, True)}]'
         return f'{self.getStringPrefix(indentation, showAddress)}r{self.a} = ' + self.wrapIncPreText(inner) + ';'
@@ -74,17 +92,21 @@ class DukInstructionIncDecP(DukInstructionIncDec):
         return f'{self.getStringPrefix(indentation, showAddress)}{self.name} r{self.a}, {self.regConstB(constants, True)}, {self.regConstC(constants, True)}'
 
 class DukInstructionPreIncP(DukInstructionIncDecP):
+    __slots__ = ()
     def isIncPre(self):
         return True, True
 
 class DukInstructionPreDecP(DukInstructionIncDecP):
+    __slots__ = ()
     def isIncPre(self):
         return False, True
 
 class DukInstructionPostIncP(DukInstructionIncDecP):
+    __slots__ = ()
     def isIncPre(self):
         return True, False
 
 class DukInstructionPostDecP(DukInstructionIncDecP):
+    __slots__ = ()
     def isIncPre(self):
         return False, False
@@ -1,17 +1,30 @@
+from duk.category import DukCategory
 from duk.constants import DukConstants
 from duk.item import DukItem
 import ctypes
 
 class DukInstruction(DukItem):
+    # Only the 8-bit fields are stored, they are shared small ints so each instruction stays compact
+    __slots__ = ('opcode', 'a', 'b', 'c')
+
     def __init__(self, address, encoded):
         super().__init__(address)
         self.opcode = encoded & 0xFF
         self.a = (encoded >> 8) & 0xFF
         self.b = (encoded >> 16) & 0xFF
         self.c = (encoded >> 24) & 0xFF
-        self.bc = (encoded >> 16) & 0xFFFF
-        self.abc = (encoded >> 8) & 0xFFFFFF
-        self.name = DukConstants.DUK_OP[self.opcode]
+
+    @property
+    def bc(self):
+        return (self.c << 8) | self.b
+
+    @property
+    def abc(self):
+        return (self.c << 16) | (self.b << 8) | self.a
+
+    @property
+    def name(self):
+        return DukConstants.DUK_OP[self.opcode]
 
     def formatConst(self, const):
         return f'"{const}"' if type(const) == str else const
@@ -54,6 +67,8 @@ class DukInstruction(DukItem):
         return self.getStringPrefix(indentation, showAddress) + str(self)
 
 class DukInstructionJump(DukInstruction):
+    __slots__ = ()
+    CATEGORY = DukCategory.JUMP
     def getDestinationAddress(self):
         return self.address + 1 + (self.abc - DukConstants.DUK_BC_JUMP_BIAS)
     def toString(self, constants, functions, varmap, formals, indentation = '', showAddress = False):
@@ -62,6 +77,8 @@ class DukInstructionJump(DukInstruction):
         return f'{self.getStringPrefix(indentation, showAddress)}{self.name} {self.getDestinationAddress():04x}'
 
 class DukInstructionDeclVar(DukInstruction):
+    __slots__ = ()
+
     def getPropFlags(self):
         return self.a & DukConstants.DUK_PROPDESC_FLAGS_MASK
 
@@ -79,6 +96,8 @@ class DukInstructionDeclVar(DukInstruction):
         return f'{self.getStringPrefix(indentation, showAddress)}{self.name} {self.regConstB(constants)}, r{self.c} ; prop_flags: {self.getPropFlags()}'
 
 class DukInstructionRegExp(DukInstruction):
+    __slots__ = ()
+
     def toString(self, constants, functions, varmap, formals, indentation = '', showAddress = False):
         # self.regConstB(constants) - Expanded regular expression binary text
         return f'{self.getStringPrefix(indentation, showAddress)}r{self.a} = /{self.regConstC(constants)}/;'
@@ -87,54 +106,67 @@ class DukInstructionRegExp(DukInstruction):
         return f'{self.getStringPrefix(indentation, showAddress)}{self.name} r{self.a}, /{self.regConstC(constants)}/'
 
 class DukInstructionTypeOf(DukInstruction):
+    __slots__ = ()
     def toString(self, constants, functions, varmap, formals, indentation = '', showAddress = False):
         return f'{self.getStringPrefix(indentation, showAddress)}r{self.a} = typeof r{self.bc};'
     def toAsm(self, constants, functions, varmap, formals, indentation = '', showAddress = False):
         return f'{self.getStringPrefix(indentation, showAddress)}{self.name} r{self.a}, r{self.bc}'
 
 class DukInstructionTypeOfId(DukInstruction):
+    __slots__ = ()
     def toString(self, constants, functions, varmap, formals, indentation = '', showAddress = False):
         return f'{self.getStringPrefix(indentation, showAddress)}r{self.a} = typeof {self.constBC(constants)};'
     def toAsm(self, constants, functions, varmap, formals, indentation = '', showAddress = False):
         return f'{self.getStringPrefix(indentation, showAddress)}{self.name} r{self.a}, {self.constBC(constants)}'
 
 class DukInstructionPutVar(DukInstruction):
+    __slots__ = ()
     def toString(self, constants, functions, varmap, formals, indentation = '', showAddress = False):
         return f'{self.getStringPrefix(indentation, showAddress)}{self.constBC(constants)} = r{self.a};'
     def toAsm(self, constants, functions, varmap, formals, indentation = '', showAddress = False):
         return f'{self.getStringPrefix(indentation, showAddress)}{self.name} {self.constBC(constants)}, r{self.a}'
 
 class DukInstructionDelVar(DukInstruction):
+    __slots__ = ()
     def toString(self, constants, functions, varmap, formals, indentation = '', showAddress = False):
         return f'{self.getStringPrefix(indentation, showAddress)}delete {self.constBC(constants)};'
     def toAsm(self, constants, functions, varmap, formals, indentation = '', showAddress = False):
         return f'{self.getStringPrefix(indentation, showAddress)}{self.name} {self.constBC(constants)}'
 
 class DukInstructionClosure(DukInstruction):
+    __slots__ = ()
     def toString(self, constants, functions, varmap, formals, indentation = '', showAddress = False):
         return f'{self.getStringPrefix(indentation, showAddress)}r{self.a} = {functions[self.bc].getName()}; // CLOSURE' # Closure
     def toAsm(self, constants, functions, varmap, formals, indentation = '', showAddress = False):
         return f'{self.getStringPrefix(indentation, showAddress)}{self.name} r{self.a}, {functions[self.bc].getName()}'
 
 class DukInstructionRetReg(DukInstruction):
+    __slots__ = ()
+    CATEGORY = DukCategory.RET_REG
     def toString(self, constants, functions, varmap, formals, indentation = '', showAddress = False):
         return f'{self.getStringPrefix(indentation, showAddress)}return r{self.bc};'
     def toAsm(self, constants, functions, varmap, formals, indentation = '', showAddress = False):
         return f'{self.getStringPrefix(indentation, showAddress)}{self.name} r{self.bc}'
 
 class DukInstructionRetUndef(DukInstruction):
+    __slots__ = ()
+    CATEGORY = DukCategory.RET_UNDEF
     def toString(self, constants, functions, varmap, formals, indentation = '', showAddress = False):
         return f'{self.getStringPrefix(indentation, showAddress)}return;'
     def toAsm(self, constants, functions, varmap, formals, indentation = '', showAddress = False):
         return f'{self.getStringPrefix(indentation, showAddress)}{self.name}'
 
 class DukInstructionRetConst(DukInstruction):
+    __slots__ = ()
+    CATEGORY = DukCategory.RET_CONST
     def toString(self, constants, functions, varmap, formals, indentation = '', showAddress = False):
         return f'{self.getStringPrefix(indentation, showAddress)}return {self.formatConst(self.constBC(constants))};'
     def toAsm(self, constants, functions, varmap, formals, indentation = '', showAddress = False):
         return f'{self.getStringPrefix(indentation, showAddress)}{self.name} {self.formatConst(self.constBC(constants))}'
 
 class DukInstructionLabel(DukInstruction):
+    __slots__ = ()
+    CATEGORY = DukCategory.LABEL
     def getDestinationAddress(self):
         return self.address + 3
     def getFlags(self):
@@ -147,66 +179,83 @@ class DukInstructionLabel(DukInstruction):
         return f'{self.getStringPrefix(indentation, showAddress)}{self.name} {self.getLabelId()}, {self.getDestinationAddress():04x}'
 
 class DukInstructionEndLabel(DukInstruction):
+    __slots__ = ()
+    CATEGORY = DukCategory.END_LABEL
     def toString(self, constants, functions, varmap, formals, indentation = '', showAddress = False):
         return f'{self.getStringPrefix(indentation, showAddress)}end LABEL_{self.bc:03x};'
     def toAsm(self, constants, functions, varmap, formals, indentation = '', showAddress = False):
         return f'{self.getStringPrefix(indentation, showAddress)}{self.name} {self.bc}'
 
 class DukInstructionBreak(DukInstruction):
+    __slots__ = ()
     def toString(self, constants, functions, varmap, formals, indentation = '', showAddress = False):
         return f'{self.getStringPrefix(indentation, showAddress)}break LABEL_{self.bc:03x};'
     def toAsm(self, constants, functions, varmap, formals, indentation = '', showAddress = False):
         return f'{self.getStringPrefix(indentation, showAddress)}{self.name} {self.bc}'
 
 class DukInstructionContinue(DukInstruction):
+    __slots__ = ()
     def toString(self, constants, functions, varmap, formals, indentation = '', showAddress = False):
         return f'{self.getStringPrefix(indentation, showAddress)}continue LABEL_{self.bc:03x};'
     def toAsm(self, constants, functions, varmap, formals, indentation = '', showAddress = False):
         return f'{self.getStringPrefix(indentation, showAddress)}{self.name} {self.bc}'
 
 class DukInstructionTryCatch(DukInstruction):
+    __slots__ = ()
+    CATEGORY = DukCategory.TRY_CATCH
     def toString(self, constants, functions, varmap, formals, indentation = '', showAddress = False):
         return f'{self.getStringPrefix(indentation, showAddress)}try (r{self.bc}); // flags: {self.a}'
     def toAsm(self, constants, functions, varmap, formals, indentation = '', showAddress = False):
         return f'{self.getStringPrefix(indentation, showAddress)}{self.name} r{self.bc}, {self.a}'
 
 class DukInstructionEndTry(DukInstruction):
+    __slots__ = ()
     def toString(self, constants, functions, varmap, formals, indentation = '', showAddress = False):
         return f'{self.getStringPrefix(indentation, showAddress)}endtry;'
     def toAsm(self, constants, functions, varmap, formals, indentation = '', showAddress = False):
         return f'{self.getStringPrefix(indentation, showAddress)}{self.name}'
 
 class DukInstructionEndCatch(DukInstruction):
+    __slots__ = ()
     def toString(self, constants, functions, varmap, formals, indentation = '', showAddress = False):
         return f'{self.getStringPrefix(indentation, showAddress)}endcatch;'
     def toAsm(self, constants, functions, varmap, formals, indentation = '', showAddress = False):
         return f'{self.getStringPrefix(indentation, showAddress)}{self.name}'
 
 class DukInstructionEndFin(DukInstruction):
+    __slots__ = ()
     def toString(self, constants, functions, varmap, formals, indentation = '', showAddress = False):
         return f'{self.getStringPrefix(indentation, showAddress)}endfin (r{self.a});'
     def toAsm(self, constants, functions, varmap, formals, indentation = '', showAddress = False):
         return f'{self.getStringPrefix(indentation, showAddress)}{self.name} r{self.a}'
 
 class DukInstructionThrow(DukInstruction):
+    __slots__ = ()
     def toString(self, constants, functions, varmap, formals, indentation = '', showAddress = False):
         return f'{self.getStringPrefix(indentation, showAddress)}throw r{self.bc};'
     def toAsm(self, constants, functions, varmap, formals, indentation = '', showAddress = False):
         return f'{self.getStringPrefix(indentation, showAddress)}{self.name} r{self.bc}'
 
 class DukInstructionCsReg(DukInstruction):
+    __slots__ = ()
+    CATEGORY = DukCategory.CS_REG
     def toString(self, constants, functions, varmap, formals, indentation = '', showAddress = False):
         return f'{self.getStringPrefix(indentation, showAddress)}r{self.bc} = r{self.a};' # (Closure Register)
     def toAsm(self, constants, functions, varmap, formals, indentation = '', showAddress = False):
         return f'{self.getStringPrefix(indentation, showAddress)}{self.name} r{self.bc}, r{self.a}'
 
 class DukInstructionCsVar(DukInstruction):
+    __slots__ = ()
+    CATEGORY = DukCategory.CS_VAR
     def toString(self, constants, functions, varmap, formals, indentation = '', showAddress = False):
         return f'{self.getStringPrefix(indentation, showAddress)}r{self.a} = {self.constB(constants)};' # (Closure Variable)
     def toAsm(self, constants, functions, varmap, formals, indentation = '', showAddress = False):
         return f'{self.getStringPrefix(indentation, showAddress)}{self.name} r{self.a}, {self.constB(constants)}'
 
 class DukInstructionCall(DukInstruction):
+    __slots__ = ()
+    CATEGORY = DukCategory.CALL
+
     def getFlags(self):
         return (self.opcode & 0x07) | DukConstants.DUK_CALL_FLAG_ALLOW_ECMATOECMA
 
@@ -236,18 +285,23 @@ class DukInstructionCall(DukInstruction):
         return f'{self.getStringPrefix(indentation, showAddress)}{self.name} {", ".join(regs)} ; flags: {self.getFlags()}'
 
 class DukInstructionGetProp(DukInstruction):
+    __slots__ = ()
+    CATEGORY = DukCategory.GET_PROP
     def toString(self, constants, functions, varmap, formals, indentation = '', showAddress = False):
         return f'{self.getStringPrefix(indentation, showAddress)}r{self.a} = {self.regConstB(constants, True)}[{self.regConstC(constants, True)}];'
     def toAsm(self, constants, functions, varmap, formals, indentation = '', showAddress = False):
         return f'{self.getStringPrefix(indentation, showAddress)}{self.name} r{self.a}, {self.regConstB(constants, True)}, {self.regConstC(constants, True)}'
 
 class DukInstructionInitEnum(DukInstruction):
+    __slots__ = ()
     def toString(self, constants, functions, varmap, formals, indentation = '', showAddress = False):
         return f'{self.getStringPrefix(indentation, showAddress)}r{self.b} = _ENUMERATOR(r{self.c});'
     def toAsm(self, constants, functions, varmap, formals, indentation = '', showAddress = False):
         return f'{self.getStringPrefix(indentation, showAddress)}{self.name} r{self.b}, r{self.c}'
 
 class DukInstructionNextEnum(DukInstruction):
+    __slots__ = ()
+    CATEGORY = DukCategory.NEXT_ENUM
     def getDestinationAddress(self):
         return self.address + 2
     def toString(self, constants, functions, varmap, formals, indentation = '', showAddress = False):
@@ -256,30 +310,39 @@ class DukInstructionNextEnum(DukInstruction):
         return f'{self.getStringPrefix(indentation, showAddress)}{self.name} r{self.b}, r{self.c}, {self.getDestinationAddress():04x}'
 
 class DukInstructionPutProp(DukInstruction):
+    __slots__ = ()
     def toString(self, constants, functions, varmap, formals, indentation = '', showAddress = False):
         return f'{self.getStringPrefix(indentation, showAddress)}r{self.a}[{self.regConstB(constants, True)}] = {self.regConstC(constants, True)};'
     def toAsm(self, constants, functions, varmap, formals, indentation = '', showAddress = False):
         return f'{self.getStringPrefix(indentation, showAddress)}{self.name} r{self.a}, {self.regConstB(constants, True)}, {self.regConstC(constants, True)}'
 
 class DukInstructionDelProp(DukInstruction):
+    __slots__ = ()
     def toString(self, constants, functions, varmap, formals, indentation = '', showAddress = False):
         return f'{self.getStringPrefix(indentation, showAddress)}delete {self.regConstB(constants, True)}[{self.regConstC(constants, True)}];'
     def toAsm(self, constants, functions, varmap, formals, indentation = '', showAddress = False):
         return f'{self.getStringPrefix(indentation, showAddress)}{self.name} {self.regConstB(constants, True)}, {self.regConstC(constants, True)}'
 
 class DukInstructionNewObj(DukInstruction):
+    __slots__ = ()
+    CATEGORY = DukCategory.NEW_OBJ
     def toString(self, constants, functions, varmap, formals, indentation = '', showAddress = False):
         return f'{self.getStringPrefix(indentation, showAddress)}r{self.b} = {{}}; // Size: {self.a}'
     def toAsm(self, constants, functions, varmap, formals, indentation = '', showAddress = False):
         return f'{self.getStringPrefix(indentation, showAddress)}{self.name} r{self.b}, {self.a}'
 
 class DukInstructionNewArr(DukInstruction):
+    __slots__ = ()
+    CATEGORY = DukCategory.NEW_ARR
     def toString(self, constants, functions, varmap, formals, indentation = '', showAddress = False):
         return f'{self.getStringPrefix(indentation, showAddress)}r{self.b} = []; // Size: {self.a}'
     def toAsm(self, constants, functions, varmap, formals, indentation = '', showAddress = False):
         return f'{self.getStringPrefix(indentation, showAddress)}{self.name} r{self.b}, {self.a}'
 
 class DukInstructionMPutObj(DukInstruction):
+    __slots__ = ()
+    CATEGORY = DukCategory.MPUT_OBJ
+
     def toString(self, constants, functions, varmap, formals, indentation = '', showAddress = False):
         text = f'{self.getStringPrefix(indentation, showAddress)}'
         for i in range(self.b, self.b + self.c, 2):
@@ -294,6 +357,9 @@ class DukInstructionMPutObj(DukInstruction):
         return f'{self.getStringPrefix(indentation, showAddress)}{self.name} r{self.a}, {", ".join(regs)}'
 
 class DukInstructionMPutArr(DukInstruction):
+    __slots__ = ()
+    CATEGORY = DukCategory.MPUT_ARR
+
     def getRegs(self):
         regs = []
         for i in range(self.b + 1, self.b + self.c):
@@ -310,6 +376,8 @@ class DukInstructionMPutArr(DukInstruction):
         return f'{self.getStringPrefix(indentation, showAddress)}{self.name} r{self.a}, {", ".join(self.getRegs())}'
 
 class DukInstructionSetALen(DukInstruction):
+    __slots__ = ()
+
     def toString(self, constants, functions, varmap, formals, indentation = '', showAddress = False):
         return f'{self.getStringPrefix(indentation, showAddress)}r{self.a}.length = r{self.bc} + 1;'
 
@@ -1,7 +1,11 @@
+from duk.category import DukCategory
 from duk.instructions.instructions import DukInstruction
 from duk.constants import DukConstants
 
 class DukInstructionLoad(DukInstruction):
+    __slots__ = ()
+    CATEGORY = DukCategory.LOAD
+
     def getValue(self, constants, functions, varmap, formals, indentation = '', showAddress = False):
         raise RuntimeError()
 
@@ -24,41 +28,55 @@ class DukInstructionLoad(DukInstruction):
         return text
 
 class DukInstructionGetVar(DukInstructionLoad):
+    __slots__ = ()
+    CATEGORY = DukCategory.GET_VAR
     def getValue(self, constants, functions, varmap, formals, indentation = '', showAddress = False):
         return self.constBC(constants)
 
 class DukInstructionLdReg(DukInstructionLoad):
+    __slots__ = ()
+    CATEGORY = DukCategory.LD_REG
     def getValue(self, constants, functions, varmap, formals, indentation = '', showAddress = False):
         return f'r{self.bc}'
 
 class DukInstructionLdConst(DukInstructionLoad):
+    __slots__ = ()
+    CATEGORY = DukCategory.LD_CONST
     def getValue(self, constants, functions, varmap, formals, indentation = '', showAddress = False):
         return self.formatConst(self.constBC(constants))
 
 class DukInstructionLdInt(DukInstructionLoad):
+    __slots__ = ()
+    CATEGORY = DukCategory.LD_INT
     def getValue(self, constants, functions, varmap, formals, indentation = '', showAddress = False):
         return self.bc - DukConstants.DUK_BC_LDINT_BIAS
 
 class DukInstructionLdIntx(DukInstructionLoad):
+    __slots__ = ()
     def getValue(self, constants, functions, varmap, formals, indentation = '', showAddress = False):
         return f'(r{self.a} << {DukConstants.DUK_BC_LDINTX_SHIFT}) + {self.bc}'
 
 class DukInstructionLdThis(DukInstructionLoad):
+    __slots__ = ()
     def getValue(self, constants, functions, varmap, formals, indentation = '', showAddress = False):
         return 'this'
 
 class DukInstructionLdUndef(DukInstructionLoad):
+    __slots__ = ()
     def getValue(self, constants, functions, varmap, formals, indentation = '', showAddress = False):
         return 'undefined'
 
 class DukInstructionLdNull(DukInstructionLoad):
+    __slots__ = ()
     def getValue(self, constants, functions, varmap, formals, indentation = '', showAddress = False):
         return 'null'
 
 class DukInstructionLdTrue(DukInstructionLoad):
+    __slots__ = ()
     def getValue(self, constants, functions, varmap, formals, indentation = '', showAddress = False):
         return 'true'
 
 class DukInstructionLdFalse(DukInstructionLoad):
+    __slots__ = ()
     def getValue(self, constants, functions, varmap, formals, indentation = '', showAddress = False):
         return 'false'
\ No newline at end of file
@@ -1,6 +1,10 @@
+from duk.category import DukCategory
 from duk.instructions.load import DukInstructionLoad
 
 class DukInstructionOperator(DukInstructionLoad):
+    __slots__ = ()
+    CATEGORY = DukCategory.OPERATOR
+
     def getOperatorText(self):
         raise RuntimeError()
 
@@ -14,65 +18,79 @@ class DukInstructionOperator(DukInstructionLoad):
         return f'{self.getLeft(constants)} {self.getOperatorText()} {self.getRight(constants)}'
 
 class DukInstructionAdd(DukInstructionOperator):
+    __slots__ = ()
     def getOperatorText(self):
         return '+'
 
 class DukInstructionSub(DukInstructionOperator):
+    __slots__ = ()
     def getOperatorText(self):
         return '-'
 
 class DukInstructionMul(DukInstructionOperator):
+    __slots__ = ()
     def getOperatorText(self):
         return '*'
 
 class DukInstructionDiv(DukInstructionOperator):
+    __slots__ = ()
     def getOperatorText(self):
         return '/'
 
 class DukInstructionMod(DukInstructionOperator):
+    __slots__ = ()
     def getOperatorText(self):
         return '%'
 
 class DukInstructionExp(DukInstructionOperator):
+    __slots__ = ()
     def getOperatorText(self):
         return '**'
 
 class DukInstructionBAnd(DukInstructionOperator):
+    __slots__ = ()
     def getOperatorText(self):
         return '&'
 
 class DukInstructionBOr(DukInstructionOperator):
+    __slots__ = ()
     def getOperatorText(self):
         return '|'
 
 class DukInstructionBXor(DukInstructionOperator):
+    __slots__ = ()
     def getOperatorText(self):
         return '^'
 
 class DukInstructionBaSl(DukInstructionOperator):
+    __slots__ = ()
     def getOperatorText(self):
         return '<<'
     def getCommentText(self):
         return 'SIGNED'
 
 class DukInstructionBlSr(DukInstructionOperator):
+    __slots__ = ()
     def getOperatorText(self):
         return '>>'
     def getCommentText(self):
         return 'SIGNED'
 
 class DukInstructionBaSr(DukInstructionOperator):
+    __slots__ = ()
     def getOperatorText(self):
         return '>>'
     def getCommentText(self):
         return 'UNSIGNED'
 
 class DukInstructionInstOf(DukInstructionOperator):
+    __slots__ = ()
     def getOperatorText(self):
         return '>>'
     def toString(self, constants, functions, varmap, formals, indentation = '', showAddress = False):
         return 'instanceof'
 
 class DukInstructionIn(DukInstructionOperator):
+    __slots__ = ()
     def getOperatorText(self):
         return 'in'
\ No newline at end of file
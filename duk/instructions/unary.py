@@ -1,6 +1,8 @@
 from duk.instructions.load import DukInstructionLoad
 
 class DukInstructionUnary(DukInstructionLoad):
+    __slots__ = ()
+
     def getOperatorText(self):
         raise RuntimeError()
 
@@ -8,17 +10,21 @@ class DukInstructionUnary(DukInstructionLoad):
         return f'{self.getOperatorText()}r{self.bc}'
 
 class DukInstructionBNot(DukInstructionUnary):
+    __slots__ = ()
     def getOperatorText(self):
         return '~'
 
 class DukInstructionLNot(DukInstructionUnary):
+    __slots__ = ()
     def getOperatorText(self):
         return '!'
 
 class DukInstructionUnm(DukInstructionUnary):
+    __slots__ = ()
     def getOperatorText(self):
         return '-'
 
 class DukInstructionUnp(DukInstructionUnary):
+    __slots__ = ()
     def getOperatorText(self):
         return '+'
\ No newline at end of file
@@ -1,4 +1,16 @@
+from duk.category import DukCategory
+
 class DukItem:
+    __slots__ = ('address',)
+    CATEGORY = DukCategory.NONE
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+
+        # Merge the category declared by the class with the categories of its base classes
+        for base in cls.__bases__:
+            cls.CATEGORY |= getattr(base, 'CATEGORY', DukCategory.NONE)
+
     def __init__(self, address):
         self.address = address
 
@@ -12,4 +24,9 @@ class DukItem:
         return address >= self.getStartAddress() and address <= self.getEndAddress()
 
     def getInstructionCount(self):
-        return 1
\ No newline at end of file
+        return 1
+
+    def writeString(self, write, constants, functions, varmap, formals, indentation = '', showAddress = False, lines = None):
+        # Lines is the line index of the function when statements are annotated with their source line
+        text = self.toString(constants, functions, varmap, formals, indentation, showAddress)
+        write(text if lines == None else lines.annotate(text, self.getStartAddress()))
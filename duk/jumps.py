@@ -0,0 +1,76 @@
+import re
+from array import array
+from bisect import bisect_left, bisect_right
+from duk.constants import DukConstants
+from duk.instructions.lookup import DUK_OP_CLASSES
+from duk.instructions.instructions import *
+from duk.instructions.ifs import DukInstructionIf
+
+class DukJumpIndex:
+    # Destination of every branch opcode relative to its address, None for the jumps encoding their own offset,
+    # and the opcodes translated to a byte marking the branches. Computed the first time an index is built
+    OFFSETS = None
+    MASK = None
+    BRANCH = re.compile(b'\x01')
+
+    @staticmethod
+    def getOffsets():
+        # Offsets match the getDestinationAddress of the instruction classes
+        if DukJumpIndex.OFFSETS == None:
+            offsets = {}
+            for opcode, cls in DUK_OP_CLASSES.items():
+                if issubclass(cls, DukInstructionJump):
+                    offsets[opcode] = None
+                elif issubclass(cls, (DukInstructionIf, DukInstructionNextEnum)):
+                    offsets[opcode] = 2
+                elif issubclass(cls, DukInstructionLabel):
+                    offsets[opcode] = 3
+            DukJumpIndex.MASK = bytes(1 if opcode in offsets else 0 for opcode in range(0, 0x100))
+            DukJumpIndex.OFFSETS = offsets
+        return DukJumpIndex.OFFSETS
+
+    def __init__(self, block):
+        # Branch edges of the block, computed from the instruction columns without creating the instructions
+        count = len(block)
+        offsets = DukJumpIndex.getOffsets()
+        edges = []
+        for match in DukJumpIndex.BRANCH.finditer(block.opcodes.translate(DukJumpIndex.MASK)):
+            source = match.start()
+            offset = offsets[block.opcodes[source]]
+            if offset == None:
+                target = source + 1 + (block.getABC(source) - DukConstants.DUK_BC_JUMP_BIAS)
+            else:
+                target = source + offset
+            edges.append((target, source))
+
+        # Edges sorted on their target, a range of targets is found by bisecting
+        edges.sort()
+        self.edgeTargets = array('q', (target for target, source in edges))
+        self.edgeSources = array('q', (source for target, source in edges))
+
+        # Bitmap of the addresses branched to and the sources of every address branched to, built from the sorted
+        # edges so the sources of an address are consecutive and sorted
+        self.targets = bytearray(count)
+        self.sources = {}
+        start = 0
+        for i in range(1, len(edges) + 1):
+            if i == len(edges) or edges[i][0] != edges[start][0]:
+                target = edges[start][0]
+                if 0 <= target < count:
+                    self.targets[target] = 1
+                    self.sources[target] = self.edgeSources[start:i].tolist()
+                start = i
+
+    def isTarget(self, address):
+        return 0 <= address < len(self.targets) and self.targets[address] == 1
+
+    def getSources(self, address):
+        return self.sources.get(address, [])
+
+    def isEntered(self, startAddress, endAddress):
+        # Whether a branch outside the addresses lands after the first one, grouping the addresses would hide it
+        for i in range(bisect_right(self.edgeTargets, startAddress), bisect_left(self.edgeTargets, endAddress + 1)):
+            source = self.edgeSources[i]
+            if source < startAddress or source > endAddress:
+                return True
+        return False
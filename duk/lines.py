@@ -0,0 +1,94 @@
+import struct
+from array import array
+from bisect import bisect_right
+
+class DukLineIndex:
+    # Instructions per header entry of the pc2line data
+    SKIP = 64
+
+    # The pc2line header is written in the byte order of the machine that compiled the bytecode, almost always little endian
+    UINT32 = struct.Struct('<I')
+
+    def __init__(self, pc2line):
+        # Only the addresses where the line changes are kept, lookups bisect them
+        self.length = 0
+        self.addresses = array('I')
+        self.lines = array('I')
+
+        data = bytes(pc2line)
+        if len(data) < 4:
+            return
+        length = DukLineIndex.UINT32.unpack_from(data, 0)[0]
+        chunks = (length + DukLineIndex.SKIP - 1) // DukLineIndex.SKIP
+        if 4 + chunks * 8 > len(data):
+            return
+
+        header = struct.unpack_from(f'<{chunks * 2}I', data, 4)
+        for chunk in range(0, chunks):
+            start = chunk * DukLineIndex.SKIP
+            offset = header[chunk * 2 + 1]
+            end = header[chunk * 2 + 3] if chunk + 1 < chunks else len(data)
+            if not 0 <= offset <= end <= len(data):
+                return
+            if not self.decodeChunk(start, min(start + DukLineIndex.SKIP, length), header[chunk * 2], data[offset:end]):
+                return
+        self.length = length
+
+    def decodeChunk(self, start, end, line, data):
+        # MSB first bitstream of line differences for the instructions following the first one of the chunk
+        bits = int.from_bytes(data, 'big')
+        remaining = len(data) * 8
+        self.addLine(start, line)
+        for address in range(start + 1, end):
+            if remaining < 1:
+                return False
+            remaining -= 1
+            if (bits >> remaining) & 1 == 0:
+                continue
+
+            # Prefix 10 adds 1 to 4, prefix 110 adds a signed byte and prefix 111 sets the line
+            remaining -= 1
+            if remaining < 0:
+                return False
+            if (bits >> remaining) & 1 == 0:
+                remaining -= 2
+                if remaining < 0:
+                    return False
+                line += ((bits >> remaining) & 0x03) + 1
+            else:
+                remaining -= 1
+                if remaining < 0:
+                    return False
+                if (bits >> remaining) & 1 == 0:
+                    remaining -= 8
+                    if remaining < 0:
+                        return False
+                    line += ((bits >> remaining) & 0xff) - 0x80
+                else:
+                    remaining -= 32
+                    if remaining < 0:
+                        return False
+                    line = (bits >> remaining) & 0xffffffff
+            self.addLine(address, line)
+        return True
+
+    def addLine(self, address, line):
+        line &= 0xffffffff
+        if len(self.lines) == 0 or self.lines[-1] != line:
+            self.addresses.append(address)
+            self.lines.append(line)
+
+    def getLine(self, address):
+        if address < 0 or address >= self.length:
+            return None
+        return self.lines[bisect_right(self.addresses, address) - 1]
+
+    def annotate(self, text, address):
+        # The source line is appended to the first line of a statement, statements without text are left alone
+        line = self.getLine(address)
+        if line == None or text.strip() == '':
+            return text
+        end = text.find('\n')
+        if end < 0:
+            return f'{text} // line {line}'
+        return f'{text[:end]} // line {line}{text[end:]}'
@@ -0,0 +1,28 @@
+from util.filereader import FileReader
+
+class DukConstantPool:
+    def __init__(self, constants):
+        # String constants are kept as raw bytes and only escaped the first time they are used
+        self.constants = constants
+
+    def get(self, index):
+        constant = self.constants[index]
+        if isinstance(constant, memoryview):
+            constant = self.constants[index] = FileReader.escape(constant)
+        return constant
+
+    def materialize(self):
+        for i in range(0, len(self.constants)):
+            self.get(i)
+        return self.constants
+
+    def __len__(self):
+        return len(self.constants)
+
+    def __iter__(self):
+        return iter(self.materialize())
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self.get(i) for i in range(*index.indices(len(self)))]
+        return self.get(index)
@@ -0,0 +1,108 @@
+import struct
+import sys
+from array import array
+from duk.constants import DukConstants
+from duk.function import DukFunction
+from duk.pool import DukConstantPool
+from duk.instructions.block import DukInstructionBlock, DUK_WORD_TYPECODE
+from util.filereader import FileReader
+
+class DukSnapshot:
+    # Parsed function trees saved in a form that loads without decoding the JSE again
+    MAGIC = b'DKIR'
+    VERSION = 1
+    HEADER = struct.Struct('>4sI')
+    FUNCTION = struct.Struct('>IIIHHIIII')
+
+    @staticmethod
+    def isSnapshot(reader):
+        header = reader.unpack(DukSnapshot.HEADER)
+        return header != None and header[0] == DukSnapshot.MAGIC and header[1] == DukSnapshot.VERSION
+
+    @staticmethod
+    def load(reader, parentCount = 0):
+        # Functions are created after their inner functions, so they are indexed in the same order as disassemble
+        instructionCount, constantCount, functionCount, numberOfRegs, numberOfArgs, startLine, endLine, flags, length = reader.unpack(DukSnapshot.FUNCTION)
+        name = DukSnapshot.loadString(reader)
+        filename = DukSnapshot.loadString(reader)
+        pc2line = reader.rawString()
+
+        varmap = {}
+        for i in range(reader.uint32()):
+            varmapName = DukSnapshot.loadString(reader)
+            varmap[varmapName] = reader.uint32()
+
+        formals = []
+        for i in range(reader.uint32()):
+            formals.append(DukSnapshot.loadString(reader))
+
+        # Instruction words are kept as the big endian bytes of the JSE and constant strings are already escaped
+        instructions = DukInstructionBlock(reader.slice(reader.uint32() * 4))
+        constants = []
+        for i in range(constantCount):
+            if reader.uint8() == DukConstants.DUK__SER_STRING:
+                constants.append(DukSnapshot.loadString(reader))
+            else:
+                constants.append(reader.double())
+
+        functions = []
+        for i in range(functionCount):
+            functions.append(DukSnapshot.load(reader, parentCount + 1))
+
+        return DukFunction(instructionCount, constantCount, functionCount,
+            numberOfRegs, numberOfArgs, startLine, endLine, flags,
+            instructions, DukConstantPool(constants), functions, length, name, filename,
+            pc2line, varmap, formals, parentCount
+        )
+
+    @staticmethod
+    def loadString(reader):
+        return str(reader.rawString(), 'utf-8')
+
+    @staticmethod
+    def save(func, write):
+        write(DukSnapshot.HEADER.pack(DukSnapshot.MAGIC, DukSnapshot.VERSION))
+        DukSnapshot.saveFunction(func, write)
+
+    @staticmethod
+    def saveFunction(func, write):
+        write(DukSnapshot.FUNCTION.pack(func.instructionCount, func.constantCount, func.functionCount, func.numberOfRegs,
+            func.numberOfArgs, func.startLine, func.endLine, func.flags, func.length))
+        DukSnapshot.saveString(func.name, write)
+        DukSnapshot.saveString(func.filename, write)
+        DukSnapshot.saveBytes(func.pc2line, write)
+
+        write(FileReader.UINT32.pack(len(func.varmap)))
+        for varmapName, varmapValue in func.varmap.items():
+            DukSnapshot.saveString(varmapName, write)
+            write(FileReader.UINT32.pack(varmapValue))
+
+        write(FileReader.UINT32.pack(len(func.formals)))
+        for formal in func.formals:
+            DukSnapshot.saveString(formal, write)
+
+        words = array(DUK_WORD_TYPECODE, func.getInstructions().words)
+        if sys.byteorder == 'little':
+            words.byteswap()
+        write(FileReader.UINT32.pack(len(words)))
+        write(words.tobytes())
+
+        for constant in func.getConstants():
+            if isinstance(constant, str):
+                write(FileReader.UINT8.pack(DukConstants.DUK__SER_STRING))
+                DukSnapshot.saveString(constant, write)
+            else:
+                write(FileReader.UINT8.pack(DukConstants.DUK__SER_NUMBER))
+                write(FileReader.DOUBLE.pack(constant))
+
+        for inner in func.functions:
+            DukSnapshot.saveFunction(inner, write)
+
+    @staticmethod
+    def saveString(string, write):
+        DukSnapshot.saveBytes(string.encode('utf-8'), write)
+
+    @staticmethod
+    def saveBytes(data, write):
+        write(FileReader.UINT32.pack(len(data)))
+        write(data)
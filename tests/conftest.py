@@ -0,0 +1,26 @@
+import os
+import sys
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bench.generator import generate
+from util.logger import Logger, Verbosity
+
+@pytest.fixture(autouse=True)
+def quiet():
+    # Only the outputs are checked, the log is not written
+    verbosity = Logger.VERBOSITY
+    Logger.VERBOSITY = Verbosity.NONE
+    yield
+    Logger.VERBOSITY = verbosity
+
+@pytest.fixture
+def jse(tmp_path):
+    # Write a generated JSE file and return its path
+    def write(name = 'input.jse', **options):
+        path = os.path.join(tmp_path, name)
+        with open(path, 'wb') as file:
+            file.write(generate(**options))
+        return path
+    return write
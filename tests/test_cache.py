@@ -0,0 +1,95 @@
+import os
+
+from bench.suite import DISABLE_GROUPING
+from decompiler import Decompiler
+from util.cache import OutputCache
+
+def read(filepath):
+    with open(filepath) as file:
+        return file.read()
+
+def getOutputs(tmp_path):
+    return (str(tmp_path / 'out' / 'input.asm.js'), str(tmp_path / 'out' / 'input.js'), None, None)
+
+def decompile(filepath, cache, outputs, **options):
+    asm, output, dump, irOut = outputs
+    return Decompiler.decompile(filepath, True, asm, output, DISABLE_GROUPING, cache=cache, irOut=irOut, dump=dump, **options)
+
+def getEntries(cache):
+    if not os.path.isdir(cache):
+        return []
+    return [key for prefix in os.listdir(cache) for key in os.listdir(os.path.join(cache, prefix))]
+
+def test_key(jse, tmp_path):
+    filepath = jse(seed=1)
+    other = jse('other.jse', seed=2)
+    options = [Decompiler.VERSION, True, DISABLE_GROUPING, None, False, False, False, True]
+    key = OutputCache.getKey(filepath, options)
+    assert key == OutputCache.getKey(filepath, list(options))
+    assert key != OutputCache.getKey(other, options)
+    assert key != OutputCache.getKey(filepath, options[:-1] + [False])
+    assert key != OutputCache.getKey(filepath, [Decompiler.VERSION, True, dict(DISABLE_GROUPING, call=True), None, False, False, False, True])
+    assert OutputCache(str(tmp_path)).getEntry(key) == os.path.join(str(tmp_path), key[:2], key)
+
+def test_store_and_restore(tmp_path):
+    cache = OutputCache(str(tmp_path / 'cache'))
+    first = tmp_path / 'first.js'
+    first.write_text('first')
+    cache.store('ab12', (None, str(first), None, None), 1.5)
+
+    restored = str(tmp_path / 'restored' / 'output.js')
+    assert cache.restore('ab12', (None, restored, None, None)) == 1.5
+    assert read(restored) == 'first'
+
+    # Outputs the entry does not hold are not restored, and missing outputs are never stored
+    assert cache.restore('ab12', (str(tmp_path / 'restored.asm.js'), restored, None, None)) == None
+    assert cache.restore('cd34', (None, restored, None, None)) == None
+    cache.store('cd34', (None, str(tmp_path / 'missing.js'), None, None), 1)
+    assert getEntries(str(tmp_path / 'cache')) == ['ab12']
+
+def test_decompile_restores(jse, tmp_path):
+    OutputCache.detach()
+    filepath = jse()
+    cache = str(tmp_path / 'cache')
+    outputs = getOutputs(tmp_path)
+    assert decompile(filepath, cache, outputs)
+    expected = [read(path) for path in outputs[:2]]
+    assert len(getEntries(cache)) == 1
+    assert (OutputCache.LOOKUPS, OutputCache.HITS) == (1, 0)
+
+    for path in outputs[:2]:
+        os.remove(path)
+    assert decompile(filepath, cache, outputs)
+    assert [read(path) for path in outputs[:2]] == expected
+    assert (OutputCache.LOOKUPS, OutputCache.HITS) == (2, 1) and OutputCache.SAVED >= 0
+
+    # Options changing the outputs are another entry
+    assert decompile(filepath, cache, outputs, lines=True)
+    assert len(getEntries(cache)) == 2
+    assert read(outputs[1]) != expected[1]
+    assert OutputCache.release()[:2] == (3, 1)
+    assert OutputCache.LOOKUPS == 0
+
+def test_failed_inputs_are_not_stored(tmp_path):
+    # Outputs left over from an earlier run are not stored for an input that is ignored
+    filepath = str(tmp_path / 'input.jse')
+    with open(filepath, 'wb') as file:
+        file.write(b'\x00not bytecode')
+    outputs = getOutputs(tmp_path)
+    for path in outputs[:2]:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, 'w') as file:
+            file.write('stale')
+
+    cache = str(tmp_path / 'cache')
+    assert not decompile(filepath, cache, outputs)
+    assert getEntries(cache) == []
+
+def test_unselected_functions_are_not_stored(jse, tmp_path):
+    # The outputs of the earlier run are still there when no function matches
+    filepath = jse()
+    outputs = getOutputs(tmp_path)
+    cache = str(tmp_path / 'cache')
+    assert decompile(filepath, cache, outputs)
+    assert not decompile(filepath, cache, outputs, functions=['missing'])
+    assert len(getEntries(cache)) == 1
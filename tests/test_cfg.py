@@ -0,0 +1,151 @@
+import struct
+
+from bench.generator import BIAS, encode, encodeBC, encodeJump
+from bench.suite import DISABLE_GROUPING
+from duk.cfg import DukCFG
+from duk.function import DukFunction
+from duk.instructions.block import DukInstructionBlock
+from util.filereader import FileReader
+
+# if (r4 == false) { if (r3 == true) { r1 = 0; } else { r1 = 1; } } with a jump from the outer if into the inner if body
+ENTERED_IF = [
+    encodeBC(50, 0, 4),                 # 0: IFFALSE_R r4
+    encodeJump(1, 4),                   # 1: JUMP 4
+    encodeBC(48, 0, 3),                 # 2: IFTRUE_R r3
+    encodeJump(3, 6),                   # 3: JUMP 6
+    encodeBC(4, 1, BIAS >> 8),          # 4: LDINT r1, 0
+    encodeJump(5, 7),                   # 5: JUMP 7
+    encodeBC(4, 1, (BIAS >> 8) + 1),    # 6: LDINT r1, 1
+    encodeBC(158, 0, 0),                # 7: RETUNDEF
+]
+
+# while (r1 == r2) { if (r3 == true) { r1 = 0; } }
+WHILE = [
+    encodeBC(161, 0, 0),                # 0: LABEL 0
+    encodeJump(1, 8),                   # 1: JUMP 8 (break)
+    encodeJump(2, 3),                   # 2: JUMP 3 (continue)
+    encode(16, 3, 1, 2),                # 3: EQ r3, r1, r2
+    encodeBC(48, 0, 3),                 # 4: IFTRUE_R r3
+    encodeJump(5, 8),                   # 5: JUMP 8
+    encodeBC(4, 1, BIAS >> 8),          # 6: LDINT r1, 0
+    encodeJump(7, 3),                   # 7: JUMP 3
+    encodeBC(162, 0, 0),                # 8: ENDLABEL 0
+    encodeBC(158, 0, 0),                # 9: RETUNDEF
+]
+
+# try { r1 = 0; } catch (r1) { r1 = 1; } after an if, ENTERED is the jump from the if into the catch body
+TRY = [
+    encodeBC(48, 0, 3),                 # 0: IFTRUE_R r3
+    encodeJump(1, 2),                   # 1: JUMP 2
+    encodeBC(3, 1, 0),                  # 2: LDCONST r1, c0
+    encodeBC(165, 3, 1),                # 3: TRYCATCH r1
+    encodeJump(4, 8),                   # 4: JUMP 8 (catch)
+    encodeJump(5, 11),                  # 5: JUMP 11 (end)
+    encodeBC(4, 1, BIAS >> 8),          # 6: LDINT r1, 0
+    encodeBC(166, 0, 0),                # 7: ENDTRY
+    encodeBC(155, 1, 0),                # 8: PUTVAR r1, c0
+    encodeBC(4, 1, (BIAS >> 8) + 1),    # 9: LDINT r1, 1
+    encodeBC(167, 0, 0),                # 10: ENDCATCH
+    encodeBC(158, 0, 0),                # 11: RETUNDEF
+]
+ENTERED = encodeJump(1, 9)
+
+# Two loops with the same label, the break and the continue go to the slots of the closest label
+LABELS = [
+    encodeBC(161, 0, 0),                # 0: LABEL 0
+    encodeJump(1, 5),                   # 1: JUMP 5 (break)
+    encodeJump(2, 3),                   # 2: JUMP 3 (continue)
+    encodeBC(163, 0, 0),                # 3: BREAK 0
+    encodeBC(162, 0, 0),                # 4: ENDLABEL 0
+    encodeBC(161, 0, 0),                # 5: LABEL 0
+    encodeJump(6, 10),                  # 6: JUMP 10 (break)
+    encodeJump(7, 8),                   # 7: JUMP 8 (continue)
+    encodeBC(164, 0, 0),                # 8: CONTINUE 0
+    encodeBC(162, 0, 0),                # 9: ENDLABEL 0
+    encodeBC(158, 0, 0),                # 10: RETUNDEF
+]
+
+def getCFG(words):
+    return DukCFG(DukInstructionBlock(struct.pack(f'>{len(words)}I', *words)))
+
+def getEdges(cfg):
+    return [(block.start, block.end, [successor.start for successor in block.successors]) for block in cfg.blocks]
+
+def test_blocks():
+    cfg = getCFG(ENTERED_IF)
+    assert getEdges(cfg) == [(0, 0, [1, 2]), (1, 1, [4]), (2, 2, [3, 4]), (3, 3, [6]), (4, 5, [7]), (6, 6, [7]), (7, 7, [])]
+    assert [cfg.getBlock(address).start for address in range(0, 8)] == [0, 1, 2, 3, 4, 4, 6, 7]
+    assert cfg.getBlock(8) == None
+    assert cfg.getBlock(-1) == None
+
+def test_loop_blocks():
+    # The break and continue slots are only reached from inside the loop
+    cfg = getCFG(WHILE)
+    assert getEdges(cfg) == [(0, 0, [3]), (1, 1, [8]), (2, 2, [3]), (3, 4, [5, 6]), (5, 5, [8]), (6, 7, [3]), (8, 9, [])]
+    assert not cfg.isReachable(cfg.getBlock(1))
+    assert cfg.isReachable(cfg.getBlock(6))
+
+def test_labels():
+    cfg = getCFG(LABELS)
+    assert [successor.start for successor in cfg.getBlock(3).successors] == [1]
+    assert [successor.start for successor in cfg.getBlock(8).successors] == [7]
+
+def test_dominators():
+    cfg = getCFG(ENTERED_IF)
+    assert [None if idom == None else cfg.blocks[idom].start for idom in cfg.idom] == [None, 0, 0, 2, 0, 3, 0]
+    block = cfg.getBlock
+    assert cfg.dominates(block(0), block(7))
+    assert cfg.dominates(block(2), block(6))
+    assert cfg.dominates(block(4), block(4))
+    assert not cfg.dominates(block(2), block(4))
+    assert not cfg.dominates(block(6), block(7))
+
+    cfg = getCFG(WHILE)
+    assert [None if idom == None else cfg.blocks[idom].start for idom in cfg.idom] == [None, None, None, 0, 3, 3, 5]
+
+def test_post_dominators():
+    # Both branches of the inner if join at the return, the jump into the inner body joins the if at its else jump
+    cfg = getCFG(ENTERED_IF)
+    assert [None if ipdom == None else cfg.blocks[ipdom].start for ipdom in cfg.ipdom] == [7, 4, 7, 6, 7, 7, None]
+    block = cfg.getBlock
+    assert cfg.getImmediatePostDominator(block(0)) == block(7)
+    assert cfg.getImmediatePostDominator(block(7)) == None
+    assert cfg.postDominates(block(7), block(2))
+    assert cfg.postDominates(block(4), block(1))
+    assert not cfg.postDominates(block(4), block(2))
+
+    # The loop is only left through the jump after the condition
+    cfg = getCFG(WHILE)
+    assert cfg.getImmediatePostDominator(cfg.getBlock(4)) == cfg.getBlock(5)
+
+def test_single_entry():
+    cfg = getCFG(ENTERED_IF)
+    assert cfg.isSingleEntry(0, 6)
+    assert cfg.isSingleEntry(3, 3)
+    assert not cfg.isSingleEntry(2, 6)
+    assert not cfg.isSingleEntry(0, 8)
+
+def test_headers():
+    # The inner if is entered from the outer one, it is not a header
+    assert getCFG(ENTERED_IF).getHeaders() == [0]
+    assert getCFG(WHILE).getHeaders() == [0, 4]
+
+    # The catch body is part of the try, a jump into it drops the try
+    assert 2 in getCFG(TRY).getHeaders()
+    assert 2 not in getCFG(TRY[:1] + [ENTERED] + TRY[2:]).getHeaders()
+
+def test_structuring_matches_default(jse):
+    # Generated code is only entered through its headers, gating the control flow rules on them groups it the same
+    filepath = jse(instructions=400, nesting=2)
+    outputs = []
+    for structuring in (False, True):
+        with open(filepath, 'rb') as file:
+            reader = FileReader(file)
+            reader.uint8()
+            DukFunction.COUNT = 0
+            func = DukFunction.disassemble(reader)
+        func.decompile(DISABLE_GROUPING, True, structuring)
+        outputs.append(func.toString())
+    assert func.getGroup().headers == set(DukCFG(func.getInstructions()).getHeaders())
+    assert len(func.getGroup().headers) > 0
+    assert outputs[0] == outputs[1]
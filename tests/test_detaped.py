@@ -0,0 +1,105 @@
+import json
+import os
+import subprocess
+import sys
+
+DETAPED = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'detaped.py')
+
+def run(*args):
+    result = subprocess.run([sys.executable, DETAPED, '-n', *args], capture_output=True, text=True, timeout=300)
+    assert result.returncode == 0, result.stdout + result.stderr
+    return result.stdout
+
+def readTree(directory):
+    files = {}
+    for root, subdirs, names in os.walk(directory):
+        for name in names:
+            with open(os.path.join(root, name)) as file:
+                files[os.path.relpath(os.path.join(root, name), directory)] = file.read()
+    return files
+
+def test_jobs(jse, tmp_path):
+    # Files decompiled in parallel give the same outputs and the same log order
+    os.makedirs(tmp_path / 'input' / 'sub')
+    for seed in range(0, 4):
+        jse(os.path.join('input', 'sub' if seed % 2 else '', f'{seed}.jse'), seed=seed, instructions=100 + seed * 200)
+    logs = []
+    for jobs in ('1', '2'):
+        logs.append(run(str(tmp_path / 'input'), '-o', str(tmp_path / jobs / 'js'), '-a', str(tmp_path / jobs / 'asm'), '-j', jobs))
+    assert logs[0] == logs[1]
+    assert readTree(tmp_path / '1') == readTree(tmp_path / '2')
+    assert len(readTree(tmp_path / '1')) == 8
+
+def test_negative_jobs(jse):
+    result = subprocess.run([sys.executable, DETAPED, jse(), '-j', '-1'], capture_output=True, text=True, timeout=60)
+    assert result.returncode == 2
+    assert 'invalid job count: -1' in result.stderr
+
+def test_function_jobs(jse, tmp_path):
+    filepath = jse(instructions=200, depth=2, fanout=3)
+    outputs = []
+    for jobs in ('1', '2', '0'):
+        output = str(tmp_path / f'{jobs}.js')
+        run(filepath, '-o', output, '-a', str(tmp_path / f'{jobs}.asm.js'), '-l', '--function-jobs', jobs)
+        with open(output) as file:
+            outputs.append(file.read())
+    assert outputs[0] == outputs[1] == outputs[2]
+
+def test_function_jobs_keep_stats(jse, tmp_path):
+    # Functions grouped by the workers are still profiled and counted
+    filepath = jse(instructions=200, depth=2, fanout=3)
+    counts = []
+    for jobs in ('1', '2'):
+        profile = str(tmp_path / f'{jobs}.profile.json')
+        ruleStats = str(tmp_path / f'{jobs}.rules.json')
+        run(filepath, '-o', str(tmp_path / f'{jobs}.js'), '--function-jobs', jobs, '--profile-json', profile, '--rule-stats', ruleStats)
+        with open(profile) as file:
+            profiled = json.load(file)['files']
+        with open(ruleStats) as file:
+            grouped = json.load(file)
+        assert len(profiled) == len(grouped['files']) == 1
+        counts.append((len(profiled[0]['functions']), grouped['run']['functions'], grouped['run']['rules']))
+    assert counts[0][0] == counts[1][0] == counts[0][1] == counts[1][1] == 13
+    assert {name: stats['calls'] for name, stats in counts[0][2].items()} == {name: stats['calls'] for name, stats in counts[1][2].items()}
+
+def test_cache_report(jse, tmp_path):
+    # Hits of the worker processes are counted in the report
+    os.makedirs(tmp_path / 'input')
+    for seed in range(0, 3):
+        jse(os.path.join('input', f'{seed}.jse'), seed=seed, instructions=100)
+    for jobs, report in (('2', 'Cache: 0/3 files restored'), ('2', 'Cache: 3/3 files restored'), ('1', 'Cache: 3/3 files restored')):
+        assert report in run(str(tmp_path / 'input'), '-o', str(tmp_path / 'js'), '--cache', str(tmp_path / 'cache'), '-j', jobs)
+
+def test_function_selector(jse, tmp_path):
+    filepath = jse(instructions=100)
+    output = str(tmp_path / 'output.js')
+    run(filepath, '-o', output, '-f', '0', '-f', '0')
+    with open(output) as file:
+        text = file.read()
+    assert text.count('function ') == 1
+    assert text.startswith('function func')
+
+def test_profile(jse, tmp_path):
+    filepath = jse(instructions=100)
+    profile = str(tmp_path / 'profile.json')
+    stdout = run(filepath, '-o', str(tmp_path / 'output.js'), '--profile-json', profile, '--profile-top', '1')
+    assert 'Slowest files' in stdout
+    assert 'Slowest functions to group' in stdout
+
+    with open(profile) as file:
+        data = json.load(file)
+    assert len(data['files']) == 1
+    assert {'read', 'disassemble', 'group', 'render', 'write'} <= set(data['files'][0]['phases'])
+    assert len(data['files'][0]['functions']) == 3
+
+def test_rule_stats(jse, tmp_path):
+    filepath = jse(instructions=200)
+    stats = str(tmp_path / 'stats.json')
+    run(filepath, '-o', str(tmp_path / 'output.js'), '--rule-stats', stats)
+    with open(stats) as file:
+        data = json.load(file)
+    assert len(data['files']) == 1
+    assert len(data['files'][0]['functions']) == 3
+    assert data['run']['functions'] == 3
+    assert data['run']['rules']['decompileIfElse']['rewrites'] > 0
+    assert sum(rule['calls'] for func in data['files'][0]['functions'] for rule in func['rules'].values()) == sum(rule['calls'] for rule in data['run']['rules'].values())
@@ -0,0 +1,88 @@
+import io
+import struct
+
+from bench.suite import DISABLE_GROUPING
+from decompiler import Decompiler
+from duk.function import DukFunction
+from duk.pool import DukConstantPool
+from util.filereader import FileReader
+
+DATA = b'\xbf' + struct.pack('>HId', 0x1234, 0xdeadbeef, 1.5) + struct.pack('>I', 3) + b'a\n"'
+
+def getReader(tmp_path, data):
+    path = tmp_path / 'data.bin'
+    path.write_bytes(data)
+    return FileReader(open(path, 'rb'))
+
+def test_values(tmp_path):
+    reader = getReader(tmp_path, DATA)
+    assert reader.uint8() == 0xbf
+    assert reader.uint16() == 0x1234
+    assert reader.uint32() == 0xdeadbeef
+    assert reader.double() == 1.5
+    assert bytes(reader.rawString()) == b'a\n"'
+    assert reader.remaining() == b''
+
+    # Reads past the end return None and leave the offset alone
+    assert reader.uint32() == None
+    assert reader.offset == len(DATA)
+
+def test_empty_and_unmapped(tmp_path):
+    # Empty files and streams without a descriptor are read instead of mapped
+    reader = getReader(tmp_path, b'')
+    assert reader.uint8() == None
+    assert reader.rawString() == None
+
+    reader = FileReader(io.BytesIO(DATA))
+    assert reader.uint8() == 0xbf
+    assert reader.uint16() == 0x1234
+
+def test_fork(tmp_path):
+    reader = getReader(tmp_path, DATA)
+    fork = reader.fork(1)
+    assert reader.uint8() == 0xbf
+    assert fork.uint16() == 0x1234
+    assert reader.offset == 1
+    assert fork.offset == 3
+
+def test_slice_is_clamped(tmp_path):
+    reader = getReader(tmp_path, DATA)
+    reader.slice(len(DATA) - 2)
+    assert bytes(reader.slice(16)) == b'\n"'
+    assert reader.offset == len(DATA)
+
+def test_truncated_header(jse, tmp_path):
+    filepath = jse()
+    with open(filepath, 'rb') as file:
+        data = file.read()
+
+    # Offset of the first inner function, after the instructions and constants of the global function
+    reader = FileReader(io.BytesIO(data))
+    reader.uint8()
+    DukFunction.COUNT = 0
+    func = DukFunction.disassemble(reader)
+    inner = func.reader.fork(func.reader.offset)
+    inner.slice(func.instructionCount * 4)
+    DukFunction.skipConstants(inner, func.constantCount)
+
+    # Headers cut short in the global function or an inner function ignore the file
+    output = str(tmp_path / 'output.js')
+    for length in (1 + 10, inner.offset + 10):
+        truncated = str(tmp_path / f'{length}.jse')
+        with open(truncated, 'wb') as file:
+            file.write(data[:length])
+        assert DukFunction.disassemble(FileReader(io.BytesIO(data[1:length]))) == None
+        assert Decompiler.decompile(truncated, True, None, output, DISABLE_GROUPING) == False
+
+def test_escape():
+    assert FileReader.escape(b'ab c') == 'ab c'
+    assert FileReader.escape(b'\'"\\\n\t\x00\x7f\x80\xff') == '\\x27\\x22\\\\x0a\\x09\\x00\\x7f\\x80\\xff'
+
+def test_constants_are_escaped_once():
+    pool = DukConstantPool([memoryview(b'a\nb'), 2.5])
+    assert isinstance(pool.constants[0], memoryview)
+    assert pool[0] == 'a\\x0ab'
+    assert pool.constants[0] == 'a\\x0ab'
+    assert pool[1] == 2.5
+    assert pool[0:2] == ['a\\x0ab', 2.5]
+    assert list(pool) == ['a\\x0ab', 2.5]
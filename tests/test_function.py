@@ -0,0 +1,106 @@
+import json
+import struct
+
+from bench.generator import BIAS, encode, encodeBC, encodeJump
+from bench.suite import DISABLE_GROUPING
+from duk.function import DukFunction
+from duk.instructions.block import DukInstructionBlock
+from duk.instructions.instructions import DukInstructionJump
+from util.filereader import FileReader
+
+WORDS = [
+    encodeBC(4, 1, (BIAS >> 8) + 7),    # 0: LDINT r1, 7
+    encode(16, 3, 1, 2),                # 1: EQ r3, r1, r2
+    encodeJump(2, 0),                   # 2: JUMP 0
+    encodeBC(158, 0, 0),                # 3: RETUNDEF
+]
+
+def getBlock(words):
+    return DukInstructionBlock(struct.pack(f'>{len(words)}I', *words))
+
+def disassemble(filepath):
+    with open(filepath, 'rb') as file:
+        reader = FileReader(file)
+        assert reader.uint8() == 0xbf
+        DukFunction.COUNT = 0
+        return DukFunction.disassemble(reader)
+
+def test_block_columns():
+    block = getBlock(WORDS)
+    assert list(block.words) == WORDS
+    assert block.opcodes == bytes([4, 16, 2, 158])
+    assert block.a == bytes([1, 3, 0xfd, 0])
+    assert block.b == bytes([7, 1, 0xff, 0])
+    assert block.c == bytes([0x80, 2, 0x7f, 0])
+    assert block.getBC(0) == (BIAS >> 8) + 7
+    assert block.getABC(2) - BIAS == -3
+
+def test_block_instructions_are_created_on_demand():
+    block = getBlock(WORDS)
+    assert block.instructions == [None] * 4
+    jump = block[2]
+    assert isinstance(jump, DukInstructionJump)
+    assert jump.getDestinationAddress() == 0
+    assert block.instructions.count(None) == 3
+
+    # Created instructions are kept, the others are decoded like the single ones
+    instructions = list(block)
+    assert instructions[2] is jump
+    assert [ins.address for ins in instructions] == [0, 1, 2, 3]
+    assert [ins.opcode for ins in instructions] == [4, 16, 2, 158]
+    assert [(ins.a, ins.b, ins.c) for ins in block[1:3]] == [(3, 1, 2), (0xfd, 0xff, 0x7f)]
+
+def test_functions_are_parsed_lazily(jse):
+    func = disassemble(jse(instructions=60, depth=2, fanout=2))
+    functions = func.getFunctions()
+    assert len(functions) == 7
+    assert all(f.instructions == None and f.constants == None for f in functions)
+
+    # Only the function accessed is parsed
+    inner = func.functions[1]
+    assert len(inner.getInstructions()) == inner.instructionCount
+    assert len(inner.getConstants()) == inner.constantCount
+    assert all(f.instructions == None for f in functions if f is not inner)
+
+def test_find_functions(jse):
+    func = disassemble(jse(instructions=60))
+    inner = func.functions[0]
+
+    # Inner functions are indexed before their parent
+    assert [f.index for f in func.getFunctions()] == [2, 0, 1]
+    assert func.getName() == 'FUNC_002'
+    assert func.findFunctions(['2']) == [func]
+    assert func.findFunctions([inner.name, '0', '1']) == [inner, func.functions[1]]
+    assert func.findFunctions(['FUNC_002']) == [func]
+    assert func.findFunctions(['missing', '9']) == []
+
+def test_outputs_in_a_single_pass(jse):
+    filepath = jse(instructions=200)
+    func = disassemble(filepath)
+    func.decompile(DISABLE_GROUPING)
+    asm = []
+    string = []
+    dump = []
+    func.writeOutputs(asm.append, string.append, dump.append)
+
+    # Each output matches the output written on its own
+    other = disassemble(filepath)
+    other.decompile(DISABLE_GROUPING)
+    assert ''.join(asm) == other.toAsm()
+    assert ''.join(string) == other.toString()
+    assert json.loads(''.join(dump))['index'] == func.index
+
+def test_dump_is_valid_json(jse):
+    # Non-finite doubles are not valid JSON, they are written as their JS name
+    func = disassemble(jse(instructions=100))
+    constants = func.getConstants().constants
+    doubles = [i for i in range(0, len(constants)) if isinstance(constants[i], float)]
+    for i, value in zip(doubles, (float('nan'), float('inf'), float('-inf'))):
+        constants[i] = value
+    dump = []
+    func.writeOutputs(None, None, dump.append)
+
+    def reject(name):
+        raise ValueError(name)
+    constants = json.loads(''.join(dump), parse_constant=reject)['constants']
+    assert [constants[i] for i in doubles[:3]] == ['NaN', 'Infinity', '-Infinity']
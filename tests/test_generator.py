@@ -0,0 +1,37 @@
+import io
+
+from bench.generator import generate
+from bench.suite import DISABLE_GROUPING
+from duk.function import DukFunction
+from util.filereader import FileReader
+
+def disassemble(data):
+    reader = FileReader(io.BytesIO(data))
+    assert reader.uint8() == 0xbf
+    DukFunction.COUNT = 0
+    func = DukFunction.disassemble(reader)
+    for inner in func.getFunctions():
+        inner.getConstants()
+    assert reader.remaining() == b''
+    return func
+
+def test_deterministic():
+    assert generate(seed=3) == generate(seed=3)
+    assert generate(seed=3) != generate(seed=4)
+
+def test_options():
+    func = disassemble(generate(instructions=300, depth=2, fanout=3, constants=10))
+    functions = func.getFunctions()
+    assert len(functions) == 13
+    assert all(f.instructionCount >= 300 and f.constantCount == 10 for f in functions)
+    assert [f.getLine(0) for f in functions] == [1] * 13
+
+def getDepth(text):
+    return max(len(line) - len(line.lstrip(' ')) for line in text.split('\n') if line.strip() == '{') // 4
+
+def test_nesting():
+    # Shapes are written inside the bodies of other shapes
+    for nesting in (0, 1, 3):
+        func = disassemble(generate(seed=1, instructions=400, depth=0, nesting=nesting))
+        func.decompile(DISABLE_GROUPING)
+        assert getDepth(func.toString()) == nesting
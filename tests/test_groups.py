@@ -0,0 +1,216 @@
+import random
+import struct
+import pytest
+
+from bench.generator import BIAS, encodeBC
+from bench.suite import DISABLE_GROUPING
+from duk.category import DukCategory
+from duk.function import DukFunction
+from duk.groups.chains import DukChains
+from duk.groups.groups import DukGroup, DukGroupForItems
+from duk.instructions.block import DukInstructionBlock
+from duk.instructions.lookup import DUK_OP_CLASSES
+from util.filereader import FileReader
+from util.logger import Logger, Verbosity
+
+class Item:
+    def __init__(self, category):
+        self.CATEGORY = category
+
+def getGroup(count):
+    # LDINT r1, i for every address
+    words = [encodeBC(4, 1, (BIAS >> 8) + i) for i in range(0, count)]
+    return DukGroup(0, list(DukInstructionBlock(struct.pack(f'>{count}I', *words))))
+
+def getLinearIndex(group, address):
+    for i in range(0, len(group.items)):
+        if group.items[i].containsAddress(address):
+            return i
+    return None
+
+def checkIndex(group, count):
+    for address in range(-1, count + 1):
+        assert group.getIndexFromAddress(address) == getLinearIndex(group, address)
+
+def disassemble(filepath):
+    with open(filepath, 'rb') as file:
+        reader = FileReader(file)
+        reader.uint8()
+        DukFunction.COUNT = 0
+        return DukFunction.disassemble(reader)
+
+def decompile(filepath, worklist = True, structuring = False):
+    func = disassemble(filepath)
+    func.decompile(DISABLE_GROUPING, worklist, structuring)
+    return func.toString()
+
+def test_index_follows_replace():
+    group = getGroup(12)
+    checkIndex(group, 12)
+
+    # Groups fitting between their neighbours update the index in place
+    group.replaceItems(DukGroup(2, list(group.items[2:5])), 2, 4)
+    assert group.isIndexed and group.starts == [0, 1, 2, 5, 6, 7, 8, 9, 10, 11]
+    checkIndex(group, 12)
+
+    group.replaceItems(DukGroup(0, list(group.items[0:4])), 0, 3)
+    assert group.isIndexed and group.starts == [0, 6, 7, 8, 9, 10, 11]
+    checkIndex(group, 12)
+
+    # Nested groups keep the outer addresses
+    group.replaceItemsByAddress(DukGroup(6, list(group.items[1:3])), 6, 7)
+    assert group.isIndexed and group.reach == [5, 7, 8, 9, 10, 11]
+    checkIndex(group, 12)
+
+def test_index_follows_remove():
+    group = getGroup(12)
+    checkIndex(group, 12)
+
+    # Removed addresses are no longer found
+    group.removeItemsByAddress(3, 2)
+    assert group.isIndexed and group.starts == [0, 1, 2, 5, 6, 7, 8, 9, 10, 11]
+    checkIndex(group, 12)
+
+    group.replaceItems(DukGroup(5, list(group.items[3:6])), 3, 5)
+    group.removeItemsByAddress(5, 3)
+    assert group.isIndexed
+    checkIndex(group, 12)
+
+def test_index_rebuilds_when_groups_overlap():
+    group = getGroup(8)
+    checkIndex(group, 8)
+
+    # A group reaching over its neighbour cannot be bisected, lookups fall back to a linear scan
+    group.replaceItems(DukGroup(2, list(group.items[2:5])), 2, 2)
+    assert not group.isIndexed
+    checkIndex(group, 8)
+    assert group.starts == None
+
+def test_index_random_rewrites():
+    rng = random.Random(0)
+    for seed in range(0, 20):
+        group = getGroup(40)
+        for i in range(0, 15):
+            if len(group.items) < 2:
+                break
+            start = rng.randrange(0, len(group.items) - 1)
+            end = rng.randrange(start, min(start + 4, len(group.items)))
+            if rng.random() < 0.3:
+                address = group.items[start].getStartAddress()
+                group.removeItemsByAddress(address, group.items[end].getStartAddress() - address)
+            else:
+                group.replaceItems(DukGroup(group.items[start].getStartAddress(), list(group.items[start:end + 1])), start, end)
+            checkIndex(group, 40)
+
+@pytest.mark.parametrize('structuring', [False, True])
+def test_worklist_matches_full_rescan(jse, structuring):
+    for seed in range(0, 6):
+        filepath = jse(f'{seed}.jse', seed=seed, instructions=400, nesting=2)
+        assert decompile(filepath, True, structuring) == decompile(filepath, False, structuring)
+
+def test_worklist_groups_fewer_items(jse, monkeypatch):
+    calls = []
+    decompileItem = DukGroup.decompileItem
+    def countItem(self, *args):
+        calls[-1] += 1
+        return decompileItem(self, *args)
+    monkeypatch.setattr(DukGroup, 'decompileItem', countItem)
+
+    filepath = jse(instructions=1000, nesting=2)
+    for worklist in (True, False):
+        calls.append(0)
+        decompile(filepath, worklist)
+    assert 0 < calls[0] < calls[1]
+
+def test_dispatch():
+    # Items only try the enabled rules their category can start
+    enabled = DukGroup.getEnabledRules(dict(DISABLE_GROUPING, call=True))
+    for category in (DukCategory.LABEL, DukCategory.CALL, DukCategory.GET_VAR, DukCategory.LD_REG, DukCategory.RET_REG, DukCategory.NONE):
+        names = [rule.__name__ for position, rule in DukGroup.getRules(category, enabled)]
+        assert names == [name for trigger, keys, name in DukGroup.RULES if trigger & category and 'call' not in keys]
+    assert [rule.__name__ for position, rule in DukGroup.getRules(DukCategory.LABEL, enabled)] == ['decompileFor', 'decompileWhile']
+
+    # The jump option disables every control flow rule
+    enabled = DukGroup.getEnabledRules(dict(DISABLE_GROUPING, jump=True))
+    assert DukGroup.getRules(DukCategory.LABEL, enabled) == []
+
+def test_chains():
+    a = DukCategory.LABEL
+    b = DukCategory.JUMP
+    c = DukCategory.CALL
+    chains = DukChains([(1, [a, b]), (2, [a, b, c]), (4, [a | b, c]), (8, [b])])
+    assert chains.depth == 3
+    assert chains.match([Item(a), Item(b), Item(c)], 0) == 1 | 2
+    assert chains.match([Item(b), Item(c)], 0) == 4 | 8
+    assert chains.match([Item(a), Item(c)], 0) == 4
+    assert chains.match([Item(a), Item(b)], 0) == 1
+    assert chains.match([Item(c), Item(a), Item(b), Item(c)], 1) == 1 | 2
+    assert chains.match([Item(c)], 0) == 0
+    assert chains.match([], 0) == 0
+
+def countRenders(monkeypatch):
+    calls = []
+    renderString = DukGroup.renderString
+    def countRender(self, *args):
+        calls.append(self)
+        return renderString(self, *args)
+    monkeypatch.setattr(DukGroup, 'renderString', countRender)
+    return calls
+
+def test_renders_are_kept_until_items_change(monkeypatch):
+    group = getGroup(8)
+    inner = group.replaceItems(DukGroup(2, list(group.items[2:5])), 2, 4)
+    calls = countRenders(monkeypatch)
+
+    # Groups render once, other indentations are derived from the kept render
+    text = group.toString([], [], {}, [], '    ')
+    assert calls == [group, inner]
+    assert group.toString([], [], {}, [], '    ') == text
+    assert group.toString([], [], {}, [], '\t') == text.replace('    ', '\t')
+    assert calls == [group, inner]
+
+    # A change in a group clears the renders of the groups containing it
+    inner.toString([], [], {}, [])
+    inner.removeItemsByAddress(3, 1)
+    assert inner.renders == None and group.renders == None
+    assert group.toString([], [], {}, [], '    ') == text.replace('    r1 = 3;\n', '')
+
+def test_renders_are_reused(monkeypatch):
+    group = getGroup(4)
+    inner = group.replaceItems(DukGroup(1, list(group.items[1:3])), 1, 2)
+    forItems = DukGroupForItems([inner])
+    calls = countRenders(monkeypatch)
+    inner.toString([], [], {}, [])
+    assert forItems.toString([], [], {}, []) == 'r1 = 1;\nr1 = 2;\n'
+    group.toString([], [], {}, [])
+    assert calls == [inner, group]
+
+    # Written text is reused but not kept
+    chunks = []
+    inner.writeString(chunks.append, [], [], {}, [], '    ')
+    assert ''.join(chunks) == '    r1 = 1;\n    r1 = 2;\n'
+    assert calls == [inner, group]
+    assert list(inner.renders) == [(DukGroup.INDENTATION, False), ('', False)]
+
+def test_renders_do_not_change_the_output(jse):
+    # Debug dumps render the groups while they are built, the output is the same as without them
+    filepath = jse(instructions=300, nesting=2)
+    text = decompile(filepath)
+    Logger.VERBOSITY = Verbosity.DEBUG
+    Logger.capture()
+    try:
+        assert decompile(filepath) == text
+    finally:
+        Logger.release()
+
+def test_slots():
+    # Instructions and groups are created for every address, none of them carry a __dict__
+    group = getGroup(2)
+    assert not hasattr(group, '__dict__')
+    for cls in set(DUK_OP_CLASSES.values()):
+        assert not hasattr(cls(0, 0), '__dict__'), cls.__name__
+    classes = [DukGroup]
+    for cls in classes:
+        assert '__dict__' not in dir(cls), cls.__name__
+        classes += cls.__subclasses__()
+    assert len(classes) > 20
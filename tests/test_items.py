@@ -0,0 +1,63 @@
+import random
+import pytest
+
+from duk.groups.items import DukItems
+
+@pytest.fixture(autouse=True)
+def smallChunks(monkeypatch):
+    # Small chunks so splices cross, split and drop chunks
+    monkeypatch.setattr(DukItems, 'CHUNK_SIZE', 4)
+
+def check(items, expected):
+    assert len(items) == len(expected)
+    assert list(items) == expected
+    assert [items[i] for i in range(0, len(expected))] == expected
+    assert all(0 < len(chunk) <= 2 * DukItems.CHUNK_SIZE for chunk in items.chunks)
+
+def test_splice_matches_list():
+    rng = random.Random(0)
+    expected = list(range(0, 40))
+    items = DukItems(expected)
+    check(items, expected)
+
+    counter = 100
+    for i in range(0, 500):
+        start = rng.randrange(0, len(expected) + 1)
+        stop = rng.randrange(start, min(start + 12, len(expected)) + 1)
+        count = rng.choice((0, 1, 1, 1, 2, 20))
+        replacement = list(range(counter, counter + count))
+        counter += count
+        items.splice(start, stop, replacement)
+        expected[start:stop] = replacement
+        check(items, expected)
+
+def test_splice_empty():
+    items = DukItems()
+    items.splice(0, 0, [1, 2])
+    check(items, [1, 2])
+    items.splice(0, 2, [])
+    check(items, [])
+    items.splice(0, 0, [])
+    check(items, [])
+
+def test_index():
+    items = DukItems(range(0, 10))
+    assert items[-1] == 9
+    with pytest.raises(IndexError):
+        items[10]
+    with pytest.raises(IndexError):
+        items[-11]
+
+def test_views():
+    items = DukItems(range(0, 20))
+    view = items[3:15]
+    assert len(view) == 12
+    assert list(view) == list(range(3, 15))
+    assert view[0] == 3
+    assert view[-1] == 14
+    assert list(view[2:5]) == [5, 6, 7]
+    assert list(view[5:2]) == []
+    assert list(items[18:40]) == [18, 19]
+    assert list(items[:-17]) == [0, 1, 2]
+    with pytest.raises(IndexError):
+        view[12]
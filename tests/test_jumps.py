@@ -0,0 +1,121 @@
+import struct
+
+from bench.generator import BIAS, encode, encodeBC, encodeJump
+from bench.suite import DISABLE_GROUPING
+from duk.function import DukFunction
+from duk.groups.groups import DukGroup
+from duk.instructions.block import DukInstructionBlock
+from util.filereader import FileReader
+
+def getBlock(words):
+    return DukInstructionBlock(struct.pack(f'>{len(words)}I', *words))
+
+def getIfElse(entry):
+    # if (r3 == true) { r1 = 0; } else { r1 = 1; } r2 = 0; followed by a jump to the entry address
+    return [
+        encodeBC(48, 0, 3),                 # 0: IFTRUE_R r3
+        encodeJump(1, 4),                   # 1: JUMP 4
+        encodeBC(4, 1, BIAS >> 8),          # 2: LDINT r1, 0
+        encodeJump(3, 5),                   # 3: JUMP 5
+        encodeBC(4, 1, (BIAS >> 8) + 1),    # 4: LDINT r1, 1
+        encodeBC(4, 2, BIAS >> 8),          # 5: LDINT r2, 0
+        encodeJump(6, entry),               # 6: JUMP entry
+        encodeBC(158, 0, 0),                # 7: RETUNDEF
+    ]
+
+def getWhile(entry):
+    # while (r1 == r2) { r1 = 0; } followed by a jump to the entry address
+    return [
+        encodeBC(161, 0, 0),                # 0: LABEL 0
+        encodeJump(1, 8),                   # 1: JUMP 8 (break)
+        encodeJump(2, 3),                   # 2: JUMP 3 (continue)
+        encode(16, 3, 1, 2),                # 3: EQ r3, r1, r2
+        encodeBC(48, 0, 3),                 # 4: IFTRUE_R r3
+        encodeJump(5, 8),                   # 5: JUMP 8
+        encodeBC(4, 1, BIAS >> 8),          # 6: LDINT r1, 0
+        encodeJump(7, 3),                   # 7: JUMP 3
+        encodeBC(162, 0, 0),                # 8: ENDLABEL 0
+        encodeJump(9, entry),               # 9: JUMP entry
+        encodeBC(158, 0, 0),                # 10: RETUNDEF
+    ]
+
+def decompile(words, entryChecks = True):
+    block = getBlock(words)
+    group = DukGroup(0, list(block))
+    group.jumps = block.getJumpIndex() if entryChecks else None
+    group.decompile(['a', 'b'], [], {}, [], DISABLE_GROUPING)
+    return group.toString(['a', 'b'], [], {}, [])
+
+def test_edges():
+    jumps = getBlock(getIfElse(2)).getJumpIndex()
+    edges = sorted(zip(jumps.edgeTargets, jumps.edgeSources))
+    assert edges == [(2, 0), (2, 6), (4, 1), (5, 3)]
+
+def test_targets_and_sources():
+    jumps = getBlock(getIfElse(2)).getJumpIndex()
+    assert [address for address in range(-1, 9) if jumps.isTarget(address)] == [2, 4, 5]
+    assert jumps.getSources(2) == [0, 6]
+    assert jumps.getSources(5) == [3]
+    assert jumps.getSources(3) == []
+
+    # Branches leaving the function are edges but no target
+    jumps = getBlock(getIfElse(40)).getJumpIndex()
+    assert not jumps.isTarget(40)
+    assert jumps.getSources(40) == []
+    assert 40 in jumps.edgeTargets
+
+def test_is_entered():
+    jumps = getBlock(getIfElse(2)).getJumpIndex()
+    assert jumps.isEntered(0, 4)
+    assert jumps.isEntered(1, 2)
+
+    # Branches from inside the addresses and branches to the first address do not enter them
+    assert not jumps.isEntered(0, 6)
+    assert not jumps.isEntered(2, 3)
+    assert not jumps.isEntered(5, 7)
+    assert not getBlock(getIfElse(0)).getJumpIndex().isEntered(0, 5)
+
+def test_entered_if_is_not_grouped():
+    # A jump landing in the middle of the if body would be hidden by the group
+    text = decompile(getIfElse(2))
+    assert '{' not in text
+    assert 'jump 0002;' in text
+
+    assert 'if (r3 == true)\n{' in decompile(getIfElse(2), False)
+
+def test_if_entered_at_start_is_grouped():
+    assert 'if (r3 == true)\n{' in decompile(getIfElse(0))
+    assert 'if (r3 == true)\n{' in decompile(getIfElse(7))
+
+def test_entered_while_is_not_grouped():
+    text = decompile(getWhile(6))
+    assert 'while' not in text
+    assert 'jump 0006;' in text
+
+    assert 'while (r1 == r2)\n{' in decompile(getWhile(6), False)
+    assert 'while (r1 == r2)\n{' in decompile(getWhile(10))
+
+def test_groups_inherit_jumps():
+    # The jump index of the function is passed on to the groups created by the rules
+    block = getBlock(getIfElse(7))
+    group = DukGroup(0, list(block))
+    group.jumps = block.getJumpIndex()
+    group.decompile(['a', 'b'], [], {}, [], DISABLE_GROUPING)
+    children = [item for item in group.items if isinstance(item, DukGroup)]
+    assert len(children) > 0
+    assert all(child.jumps is group.jumps for child in children)
+
+def test_entry_checks_are_opt_in(jse):
+    filepath = jse(instructions=100)
+    for entryChecks in (False, True):
+        with open(filepath, 'rb') as file:
+            reader = FileReader(file)
+            reader.uint8()
+            DukFunction.COUNT = 0
+            func = DukFunction.disassemble(reader)
+        if entryChecks:
+            func.decompile(DISABLE_GROUPING, entryChecks=True)
+            assert func.getGroup().jumps is func.getInstructions().getJumpIndex()
+        else:
+            func.decompile(DISABLE_GROUPING)
+            assert func.getGroup().jumps == None
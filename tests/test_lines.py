@@ -0,0 +1,61 @@
+import random
+import struct
+
+from bench.generator import encodePc2line
+from bench.suite import DISABLE_GROUPING
+from duk.function import DukFunction
+from duk.lines import DukLineIndex
+from util.filereader import FileReader
+
+def test_decode():
+    # Every difference encoding, a line set outright and chunks of 64 instructions
+    rng = random.Random(0)
+    lines = [10]
+    for i in range(1, 300):
+        lines.append(max(0, lines[-1] + rng.choice((0, 0, 1, 4, -3, 100, -128, 127, 5000))))
+    lines[150] = 0xfffffff0
+    index = DukLineIndex(encodePc2line(lines))
+    assert index.length == 300
+    assert [index.getLine(address) for address in range(0, 300)] == lines
+    assert index.getLine(-1) == None
+    assert index.getLine(300) == None
+
+    # Only the addresses where the line changes are kept
+    assert len(index.addresses) == sum(1 for i in range(0, 300) if i == 0 or lines[i] != lines[i - 1])
+
+def test_invalid():
+    assert DukLineIndex(b'').getLine(0) == None
+    assert DukLineIndex(struct.pack('<I', 10)).getLine(0) == None
+
+    # A bitstream ending early or an offset past the end leaves the index empty
+    data = encodePc2line([1, 2, 3, 4])
+    assert DukLineIndex(data).getLine(3) == 4
+    assert DukLineIndex(data[:-1]).getLine(0) == None
+    assert DukLineIndex(data[:8] + struct.pack('<I', 100) + data[12:]).getLine(0) == None
+
+def test_annotate():
+    index = DukLineIndex(encodePc2line([3, 3, 7]))
+    assert index.annotate('r1 = 0;', 0) == 'r1 = 0; // line 3'
+    assert index.annotate('if (r1)\n{\n}\n', 2) == 'if (r1) // line 7\n{\n}\n'
+    assert index.annotate('   \n', 1) == '   \n'
+    assert index.annotate('r1 = 0;', 3) == 'r1 = 0;'
+
+def test_function_annotates_statements(jse):
+    with open(jse(instructions=200), 'rb') as file:
+        reader = FileReader(file)
+        reader.uint8()
+        DukFunction.COUNT = 0
+        func = DukFunction.disassemble(reader)
+    func.decompile(DISABLE_GROUPING)
+
+    # Stripping the annotations gives the plain output
+    text = func.toString(True, True)
+    assert ' // line ' in text
+    assert '\n'.join(line.split(' // line ')[0] for line in text.split('\n')) == func.toString()
+
+    # Instructions are annotated with the line of their address
+    inner = func.functions[0]
+    for line in inner.toAsm(True).split('\n'):
+        if ': ' in line and ' // line ' in line:
+            address = int(line.split(':')[0], 16)
+            assert line.endswith(f' // line {inner.getLine(address)}')
@@ -0,0 +1,71 @@
+import io
+import threading
+
+from util.logger import Logger, LogSink, Verbosity
+
+def test_deferred_messages_are_not_built():
+    calls = []
+    def message():
+        calls.append(1)
+        return 'built'
+
+    Logger.capture()
+    Logger.info(Verbosity.DEBUG, message)
+    Logger.info(Verbosity.DEBUG, '{} {}', 'not', 'built')
+    Logger.VERBOSITY = Verbosity.DEBUG
+    Logger.useColor(False)
+    Logger.info(Verbosity.DEBUG, message)
+    Logger.info(Verbosity.DEBUG, '{}: {:04x}', 'address', 10)
+    assert Logger.release() == '[*] built\n[*] address: 000a\n'
+    assert calls == [1]
+
+def test_sink_writes_in_order():
+    file = io.StringIO()
+    close = file.close
+    file.close = lambda: None
+    sink = LogSink(file)
+    for i in range(0, 5000):
+        sink.put(f'{i}\n')
+    sink.close()
+    assert file.getvalue() == ''.join(f'{i}\n' for i in range(0, 5000))
+    close()
+
+def test_sink_drops_lines_when_full():
+    # A file blocking the writer thread does not block the decompiler, the lines that did not fit are counted
+    class BlockedFile(io.StringIO):
+        def __init__(self):
+            super().__init__()
+            self.lines = []
+            self.entered = threading.Event()
+            self.released = threading.Event()
+
+        def write(self, text):
+            self.entered.set()
+            self.released.wait()
+            self.lines.append(text)
+
+        def close(self):
+            pass
+
+    file = BlockedFile()
+    sink = LogSink(file, 4)
+    sink.put('0\n')
+    file.entered.wait()
+    for i in range(1, 100):
+        sink.put(f'{i}\n')
+    file.released.set()
+    sink.close()
+    assert sink.dropped == 95
+    assert ''.join(file.lines) == '0\n1\n2\n3\n4\n[!] 95 log lines dropped, the log file could not keep up\n'
+
+def test_file(tmp_path):
+    path = tmp_path / 'log.txt'
+    path.write_text('old')
+    Logger.useColor(False)
+    Logger.setFile(str(path))
+    try:
+        Logger.error(Verbosity.NONE, 'first')
+        Logger.warning(Verbosity.NONE, 'second')
+    finally:
+        Logger.closeFile()
+    assert path.read_text() == '[-] first\n[!] second\n'
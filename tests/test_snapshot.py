@@ -0,0 +1,69 @@
+import io
+
+from bench.suite import DISABLE_GROUPING
+from decompiler import Decompiler
+from duk.function import DukFunction
+from duk.snapshot import DukSnapshot
+from util.filereader import FileReader
+
+def disassemble(filepath):
+    with open(filepath, 'rb') as file:
+        reader = FileReader(file)
+        reader.uint8()
+        DukFunction.COUNT = 0
+        return DukFunction.disassemble(reader)
+
+def save(func):
+    chunks = []
+    DukSnapshot.save(func, chunks.append)
+    return b''.join(chunks)
+
+def load(data):
+    reader = FileReader(io.BytesIO(data))
+    assert DukSnapshot.isSnapshot(reader)
+    DukFunction.COUNT = 0
+    func = DukSnapshot.load(reader)
+    assert reader.remaining() == b''
+    return func
+
+def test_round_trip(jse):
+    func = disassemble(jse(instructions=200, depth=2))
+    data = save(func)
+    loaded = load(data)
+
+    fields = ('index', 'instructionCount', 'constantCount', 'functionCount', 'numberOfRegs', 'numberOfArgs', 'startLine', 'endLine',
+              'flags', 'length', 'name', 'filename', 'varmap', 'formals', 'parentCount')
+    functions = func.getFunctions()
+    loadedFunctions = loaded.getFunctions()
+    assert len(loadedFunctions) == len(functions) == 7
+    for original, other in zip(functions, loadedFunctions):
+        for field in fields:
+            assert getattr(other, field) == getattr(original, field), field
+        assert bytes(other.pc2line) == bytes(original.pc2line)
+        assert list(other.getInstructions().words) == list(original.getInstructions().words)
+        assert list(other.getConstants()) == list(original.getConstants())
+
+    # The loaded tree saves to the same bytes and decompiles to the same output
+    assert save(loaded) == data
+    func.decompile(DISABLE_GROUPING)
+    loaded.decompile(DISABLE_GROUPING)
+    assert loaded.toString(True, True) == func.toString(True, True)
+    assert loaded.toAsm() == func.toAsm()
+
+def test_version_is_checked():
+    assert not DukSnapshot.isSnapshot(FileReader(io.BytesIO(b'DKIR\x00\x00\x00\x02')))
+    assert not DukSnapshot.isSnapshot(FileReader(io.BytesIO(b'\xbf')))
+
+def test_decompile_from_snapshot(jse, tmp_path):
+    filepath = jse(instructions=200)
+    snapshot = str(tmp_path / 'input.dkir')
+    output = str(tmp_path / 'output.js')
+    loadedOutput = str(tmp_path / 'loaded.js')
+    assert Decompiler.decompile(filepath, True, None, output, DISABLE_GROUPING, irOut=snapshot)
+    assert Decompiler.decompile(snapshot, True, None, loadedOutput, DISABLE_GROUPING, irIn=True)
+    with open(output) as file, open(loadedOutput) as loadedFile:
+        assert loadedFile.read() == file.read()
+
+    # Bytecode is not a snapshot and a snapshot is not bytecode
+    assert not Decompiler.decompile(filepath, True, None, loadedOutput, DISABLE_GROUPING, irIn=True)
+    assert not Decompiler.decompile(snapshot, True, None, loadedOutput, DISABLE_GROUPING)
@@ -0,0 +1,108 @@
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+
+class OutputCache:
+    # Names of the cached ASM, JavaScript, dump and IR snapshot outputs inside an entry
+    NAMES = ('output.asm.js', 'output.js', 'output.json', 'output.dkir')
+    META = 'meta.json'
+
+    # Lookups, hits and seconds saved by the hits in this process
+    LOOKUPS = 0
+    HITS = 0
+    SAVED = 0
+
+    def __init__(self, directory):
+        self.directory = directory
+
+    @staticmethod
+    def getKey(filepath, options):
+        # Entries are addressed by the input bytes and every option that changes the outputs
+        digest = hashlib.sha256()
+        with open(filepath, 'rb') as file:
+            for chunk in iter(lambda: file.read(1 << 20), b''):
+                digest.update(chunk)
+        digest.update(json.dumps(options, sort_keys=True).encode())
+        return digest.hexdigest()
+
+    @staticmethod
+    def count(hit, saved = 0):
+        OutputCache.LOOKUPS += 1
+        if hit:
+            OutputCache.HITS += 1
+            OutputCache.SAVED += saved
+
+    @staticmethod
+    def detach():
+        # Forget the counts inherited by a forked process, they belong to the parent
+        OutputCache.LOOKUPS = 0
+        OutputCache.HITS = 0
+        OutputCache.SAVED = 0
+
+    @staticmethod
+    def release():
+        # Counts of a worker process, handed back to the parent
+        counts = (OutputCache.LOOKUPS, OutputCache.HITS, OutputCache.SAVED)
+        OutputCache.detach()
+        return counts
+
+    @staticmethod
+    def merge(counts):
+        OutputCache.LOOKUPS += counts[0]
+        OutputCache.HITS += counts[1]
+        OutputCache.SAVED += counts[2]
+
+    def getEntry(self, key):
+        return os.path.join(self.directory, key[:2], key)
+
+    def restore(self, key, outputs):
+        # Copy the cached outputs to the requested paths, returns the seconds the outputs took to create or None
+        entry = self.getEntry(key)
+        try:
+            with open(os.path.join(entry, OutputCache.META), 'r') as file:
+                meta = json.load(file)
+        except (OSError, ValueError):
+            return None
+
+        for i in range(0, len(outputs)):
+            if outputs[i] != None and OutputCache.NAMES[i] not in meta['outputs']:
+                return None
+
+        try:
+            for i in range(0, len(outputs)):
+                if outputs[i] != None:
+                    if os.path.dirname(outputs[i]) != '':
+                        os.makedirs(os.path.dirname(outputs[i]), exist_ok=True)
+                    shutil.copyfile(os.path.join(entry, OutputCache.NAMES[i]), outputs[i])
+        except OSError:
+            return None
+        return meta['seconds']
+
+    def store(self, key, outputs, seconds):
+        # Only complete results are stored, a missing output means the input failed or was ignored
+        for output in outputs:
+            if output != None and not os.path.isfile(output):
+                return
+
+        # Build the entry aside and move it in place so readers never see a partial entry
+        entry = self.getEntry(key)
+        os.makedirs(os.path.dirname(entry), exist_ok=True)
+        temp = tempfile.mkdtemp(dir=os.path.dirname(entry))
+        try:
+            names = []
+            for i in range(0, len(outputs)):
+                if outputs[i] != None:
+                    shutil.copyfile(outputs[i], os.path.join(temp, OutputCache.NAMES[i]))
+                    names.append(OutputCache.NAMES[i])
+            with open(os.path.join(temp, OutputCache.META), 'w') as file:
+                json.dump({'seconds': seconds, 'outputs': names}, file)
+
+            shutil.rmtree(entry, ignore_errors=True)
+            os.rename(temp, entry)
+        except OSError:
+            # Another process stored the same entry first
+            pass
+        finally:
+            shutil.rmtree(temp, ignore_errors=True)
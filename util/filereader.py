@@ -1,42 +1,79 @@
+import copy
+import io
+import mmap
 import struct
 
 class FileReader:
+    UINT8 = struct.Struct('>B')
+    UINT16 = struct.Struct('>H')
+    UINT32 = struct.Struct('>I')
+    DOUBLE = struct.Struct('>d')
+
+    # Control, non-ASCII and quote bytes are written as hex escapes
+    ESCAPES = {c: f'\\x{c:02x}' for c in range(0x100) if c < 0x20 or c > 0x7e or chr(c) in '\'"'}
+
     def __init__(self, file):
         self.file = file
+        self.offset = 0
+
+        # Map the file so values are unpacked in place rather than read piece by piece
+        try:
+            self.data = memoryview(mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ))
+        except (ValueError, OSError, io.UnsupportedOperation):
+            # Empty files and streams without a descriptor cannot be mapped
+            self.data = memoryview(file.read())
+        self.length = len(self.data)
 
-    def unpack(self, format, length):
-        data = self.file.read(length)
-        if len(data) != length:
+    def fork(self, offset):
+        # Independent cursor over the same mapped data
+        reader = copy.copy(self)
+        reader.offset = offset
+        return reader
+
+    def unpack(self, format):
+        offset = self.offset
+        if offset + format.size > self.length:
             return None
-        return struct.unpack(format, data)[0]
+        self.offset = offset + format.size
+        return format.unpack_from(self.data, offset)
 
     def uint8(self):
-        return self.unpack('>B', 1)
+        value = self.unpack(FileReader.UINT8)
+        return None if value == None else value[0]
 
     def uint16(self):
-        return self.unpack('>H', 2)
+        value = self.unpack(FileReader.UINT16)
+        return None if value == None else value[0]
 
     def uint32(self):
-        return self.unpack('>I', 4)
+        value = self.unpack(FileReader.UINT32)
+        return None if value == None else value[0]
 
     def double(self):
-        return self.unpack('>d', 8)
+        value = self.unpack(FileReader.DOUBLE)
+        return None if value == None else value[0]
+
+    def slice(self, length):
+        start = self.offset
+        self.offset = min(start + length, self.length)
+        return self.data[start:self.offset]
+
+    def remaining(self):
+        return self.slice(self.length - self.offset)
 
     def rawString(self):
         length = self.uint32()
         if length == None:
             return None
-        return self.file.read(length)
+        return self.slice(length)
 
     def string(self):
         rawString = self.rawString()
         if rawString == None:
             return None
+        return FileReader.escape(rawString)
 
-        rStr = ''
-        for c in rawString:
-            if c < 0x20 or c > 0x7e or chr(c) in '\'"':
-                rStr += f'\\x{c:02x}'
-                continue
-            rStr += chr(c)
-        return rStr
\ No newline at end of file
+    @staticmethod
+    def escape(rawString):
+        # Bytes map one to one onto latin-1 characters, so a single translate escapes the whole string
+        return str(rawString, 'latin-1').translate(FileReader.ESCAPES)
@@ -1,5 +1,8 @@
+import atexit
 import sys
 import os
+import queue
+import threading
 from enum import IntEnum
 
 class Verbosity(IntEnum):
@@ -7,10 +10,62 @@ class Verbosity(IntEnum):
     NORMAL = 1
     DEBUG = 2
 
+class LogSink:
+    # Lines waiting to be written before new lines are dropped
+    QUEUE_SIZE = 65536
+
+    def __init__(self, file, queueSize = QUEUE_SIZE):
+        self.file = file
+        self.queue = queue.Queue(queueSize)
+        self.dropped = 0
+        self.thread = threading.Thread(target=self.drain, daemon=True)
+        self.thread.start()
+
+    def put(self, text):
+        # Never block the decompiler on a slow file, lines that do not fit are counted instead
+        try:
+            self.queue.put_nowait(text)
+        except queue.Full:
+            self.dropped += 1
+
+    def drain(self):
+        # Write the queued lines in batches until the sink is closed
+        while True:
+            lines = [self.queue.get()]
+            while len(lines) < 1024:
+                try:
+                    lines.append(self.queue.get_nowait())
+                except queue.Empty:
+                    break
+
+            isClosed = lines[-1] == None
+            if isClosed:
+                lines.pop()
+
+            try:
+                self.file.write(''.join(lines))
+            except OSError:
+                pass
+
+            if isClosed:
+                return
+
+    def close(self):
+        self.queue.put(None)
+        self.thread.join()
+        try:
+            if self.dropped > 0:
+                self.file.write(f'[!] {self.dropped} log lines dropped, the log file could not keep up\n')
+            self.file.close()
+        except OSError:
+            pass
+
 class Logger:
     VERBOSITY = Verbosity.NORMAL
     FILEPATH = None
+    SINK = None
     USE_COLOR = True
+    BUFFER = None
 
     # Colors
     DEFAULT = '\033[0m'
@@ -46,33 +101,77 @@ class Logger:
             Logger.warning(Verbosity.NORMAL, 'Output text parameter must be a file, ignoring')
             return
 
-        # Create/Open the file
+        # Create/Open the file, it is kept open and written by a background thread
         try:
             f = open(filepath, 'w+')
-            f.close()
         except OSError:
             Logger.warning(Verbosity.NORMAL, f'Failed to create or open {filepath}.')
             return
 
+        Logger.closeFile()
         Logger.FILEPATH = filepath
+        Logger.SINK = LogSink(f)
+        atexit.register(Logger.closeFile)
+
+    @staticmethod
+    def closeFile():
+        # Flush every queued line and close the file
+        if Logger.SINK != None:
+            sink = Logger.SINK
+            Logger.SINK = None
+            sink.close()
+        Logger.FILEPATH = None
+
+    @staticmethod
+    def detachFile():
+        # Forget the file without flushing it, a forked process does not own the parent's file
+        Logger.SINK = None
+        Logger.FILEPATH = None
 
     @staticmethod
     def useColor(toggle):
         Logger.USE_COLOR = toggle
 
+    @staticmethod
+    def capture():
+        Logger.BUFFER = []
+
+    @staticmethod
+    def release():
+        # Stop capturing and return everything written since capture()
+        text = ''.join(Logger.BUFFER)
+        Logger.BUFFER = None
+        return text
+
+    @staticmethod
+    def enabled(verbosity):
+        return Logger.VERBOSITY >= verbosity
+
+    @staticmethod
+    def format(message, args = ()):
+        # Messages given as a callable or a format string with arguments are only built once they are written
+        if callable(message):
+            return message()
+        if len(args) > 0:
+            return message.format(*args)
+        return message
+
     @staticmethod
     def write(verbosity, message = '', end='\n'):
         if Logger.VERBOSITY >= verbosity:
+            message = Logger.format(message)
+
+            # Capture output
+            if Logger.BUFFER != None:
+                Logger.BUFFER.append(message + end)
+                return
+
             # Print to screen
             print(message, end=end)
 
             # Write to file
-            if Logger.FILEPATH != None:
-                try:
-                    with open(Logger.FILEPATH, 'a+') as f:
-                        f.write(message + end)
-                except OSError:
-                    pass
+            if Logger.SINK != None:
+                Logger.SINK.put(message + end)
 
     @staticmethod
     def space(verbosity):
@@ -83,12 +182,17 @@ class Logger:
         Logger.write(verbosity, '-' * 75)
     
     @staticmethod
-    def fatal(verbosity, error, message = ''):
-        Logger.error(verbosity, message)
+    def fatal(verbosity, error, message = '', *args):
+        Logger.error(verbosity, message, *args)
+        Logger.closeFile()
         sys.exit(error)
 
     @staticmethod
-    def writePrefix(verbosity, prefix, message, color, fullColor = False):
+    def writePrefix(verbosity, prefix, message, color, fullColor = False, args = ()):
+        if Logger.VERBOSITY < verbosity:
+            return
+
+        message = Logger.format(message, args)
         builder = ''
         if Logger.USE_COLOR:
             builder += color
@@ -108,17 +212,17 @@ class Logger:
         Logger.write(verbosity, builder)
 
     @staticmethod
-    def error(verbosity, message = ''):
-        Logger.writePrefix(verbosity, '[-]', message, Logger.RED, True)
+    def error(verbosity, message = '', *args):
+        Logger.writePrefix(verbosity, '[-]', message, Logger.RED, True, args)
 
     @staticmethod
-    def warning(verbosity, message = ''):
-        Logger.writePrefix(verbosity, '[!]', message, Logger.ORANGE, True)
+    def warning(verbosity, message = '', *args):
+        Logger.writePrefix(verbosity, '[!]', message, Logger.ORANGE, True, args)
 
     @staticmethod
-    def info(verbosity, message = ''):
-        Logger.writePrefix(verbosity, '[*]', message, Logger.CYAN)
+    def info(verbosity, message = '', *args):
+        Logger.writePrefix(verbosity, '[*]', message, Logger.CYAN, False, args)
 
     @staticmethod
-    def success(verbosity, message = ''):
-        Logger.writePrefix(verbosity, '[+]', message, Logger.GREEN)
+    def success(verbosity, message = '', *args):
+        Logger.writePrefix(verbosity, '[+]', message, Logger.GREEN, False, args)
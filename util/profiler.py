@@ -0,0 +1,125 @@
+import json
+import time
+from contextlib import contextmanager
+from util.logger import Logger, Verbosity
+
+class Profiler:
+    ENABLED = False
+    PHASES = ('read', 'disassemble', 'group', 'render', 'write', 'cache')
+
+    # Records of the profiled files, the file being profiled and the open phases
+    FILES = []
+    CURRENT = None
+    STACK = []
+
+    @staticmethod
+    def enable(toggle):
+        Profiler.ENABLED = toggle
+
+    @staticmethod
+    def startFile(filepath):
+        if not Profiler.ENABLED:
+            return
+
+        Profiler.CURRENT = {'file': filepath, 'phases': {}, 'functions': []}
+        Profiler.FILES.append(Profiler.CURRENT)
+
+    @staticmethod
+    def stopFile():
+        Profiler.CURRENT = None
+        Profiler.STACK = []
+
+    @staticmethod
+    def detach():
+        # Forget the records inherited by a forked process, they belong to the parent
+        Profiler.FILES = []
+        Profiler.stopFile()
+
+    @staticmethod
+    def release():
+        # Records of a worker process, handed back to the parent
+        files = Profiler.FILES
+        Profiler.FILES = []
+        return files
+
+    @staticmethod
+    def merge(files):
+        # Functions grouped by worker processes belong to the file being profiled, the worker phases overlap the
+        # group phase of this process and are not added
+        if Profiler.CURRENT == None:
+            return
+        for record in files:
+            Profiler.CURRENT['functions'] += record['functions']
+
+    @staticmethod
+    @contextmanager
+    def phase(name):
+        # Phases only count their own time, a phase opened inside another is taken out of the outer phase
+        if Profiler.CURRENT == None:
+            yield
+            return
+
+        entry = [time.perf_counter(), time.process_time(), 0, 0]
+        Profiler.STACK.append(entry)
+        try:
+            yield
+        finally:
+            Profiler.STACK.pop()
+            wall = time.perf_counter() - entry[0]
+            cpu = time.process_time() - entry[1]
+            if len(Profiler.STACK) > 0:
+                Profiler.STACK[-1][2] += wall
+                Profiler.STACK[-1][3] += cpu
+
+            phases = Profiler.CURRENT['phases']
+            if name not in phases:
+                phases[name] = {'wall': 0, 'cpu': 0}
+            phases[name]['wall'] += wall - entry[2]
+            phases[name]['cpu'] += cpu - entry[3]
+
+    @staticmethod
+    @contextmanager
+    def function(func):
+        if Profiler.CURRENT == None:
+            yield
+            return
+
+        wall = time.perf_counter()
+        cpu = time.process_time()
+        try:
+            yield
+        finally:
+            Profiler.CURRENT['functions'].append({
+                'index': func.index,
+                'name': func.getName(),
+                'instructions': func.instructionCount,
+                'wall': time.perf_counter() - wall,
+                'cpu': time.process_time() - cpu,
+            })
+
+    @staticmethod
+    def getTotal(record, key):
+        return sum(phase[key] for phase in record['phases'].values())
+
+    @staticmethod
+    def report(top):
+        files = sorted(Profiler.FILES, key=lambda record: Profiler.getTotal(record, 'wall'), reverse=True)
+        Logger.bar(Verbosity.NONE)
+        Logger.write(Verbosity.NONE, f'Slowest files (wall seconds per phase, {len(files)} profiled)')
+        Logger.write(Verbosity.NONE, f'{"Wall":>8} {"CPU":>8} ' + ' '.join(f'{phase[:8]:>8}' for phase in Profiler.PHASES) + '  File')
+        for record in files[:top]:
+            phases = ' '.join(f'{record["phases"].get(phase, {"wall": 0})["wall"]:8.3f}' for phase in Profiler.PHASES)
+            Logger.write(Verbosity.NONE, f'{Profiler.getTotal(record, "wall"):8.3f} {Profiler.getTotal(record, "cpu"):8.3f} {phases}  {record["file"]}')
+
+        functions = sorted(((record['file'], func) for record in Profiler.FILES for func in record['functions']), key=lambda item: item[1]['wall'], reverse=True)
+        if len(functions) > 0:
+            Logger.bar(Verbosity.NONE)
+            Logger.write(Verbosity.NONE, 'Slowest functions to group (wall seconds, inner functions excluded)')
+            Logger.write(Verbosity.NONE, f'{"Wall":>8} {"CPU":>8} {"Instr":>8}  Function')
+            for filepath, func in functions[:top]:
+                Logger.write(Verbosity.NONE, f'{func["wall"]:8.3f} {func["cpu"]:8.3f} {func["instructions"]:8}  {filepath}: {func["name"]} (#{func["index"]})')
+
+    @staticmethod
+    def save(filepath):
+        with open(filepath, 'w') as file:
+            json.dump({'phases': list(Profiler.PHASES), 'files': Profiler.FILES}, file, indent=4)